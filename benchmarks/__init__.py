@@ -0,0 +1,15 @@
+"""
+Performance benchmarks of the robot fleet lifecycle.
+
+Measures DinD cold and warm starts, the registry proxy CA mounts, compose up per
+service, display_daemon_status latency, whole-fleet bring-up and the Gazebo
+spawn/remove round-trip at one or more fleet sizes. Every run is appended to
+benchmarks/results/history.jsonl and compared against
+benchmarks/results/baseline.json.
+
+Needs Docker, and Gazebo for the spawn/remove benchmarks. Robots are created
+in a scratch SDK_ROOT, so the SDK's own robots are left alone:
+
+    uv run python -m benchmarks --fleet 1,4,8 --rounds 5
+    uv run python -m benchmarks --fleet 8 --save-baseline
+"""
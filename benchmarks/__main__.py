@@ -0,0 +1,127 @@
+import argparse, asyncio, os, shutil, sys, tempfile
+
+from pathlib import Path
+from loguru import logger
+
+from benchmarks.stats import REPO_ROOT, append_history, compare, load_baseline, metric_key, run_record, save_baseline, summarize
+
+RESULTS_DIR = Path(__file__).parent / "results"
+# spiriSdk.utils.leases.MAX_SYS_ID, spiriSdk can't be imported before SDK_ROOT points at the scratch root
+MAX_FLEET = 254
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the robot fleet lifecycle.")
+    parser.add_argument("--fleet", default="1,4", help=f"Comma separated fleet sizes, at most {MAX_FLEET} (default: 1,4)")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds of the repeatable benchmarks (default: 5)")
+    parser.add_argument("--robot-type", default="spiri_mu", help="Robot type of the fleet (default: spiri_mu)")
+    parser.add_argument("--first-sys-id", type=int, default=200,
+                        help=f"System ID the robots' IDs are allocated from, skipping used ones and wrapping around to 1 after {MAX_FLEET} (default: 200)")
+    parser.add_argument("--skip", default="", help="Comma separated benchmarks to skip, e.g. gazebo,compose_up")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Slowdown of p50 flagged as a regression (default: 0.2)")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--fail-on-regression", action="store_true", help="Exit with status 1 if a metric regressed")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch SDK_ROOT for inspection")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.fleet.split(",")]
+    if not all(1 <= size <= MAX_FLEET for size in sizes):
+        parser.error(f"fleet sizes must be between 1 and {MAX_FLEET}, one system ID per robot")
+    if not 1 <= args.first_sys_id <= MAX_FLEET:
+        parser.error(f"--first-sys-id must be between 1 and {MAX_FLEET}")
+    return args
+
+
+def scratch_root() -> Path:
+    """A fresh SDK_ROOT sharing robots, worlds and the registry proxy's state with the repository's."""
+    root = Path(tempfile.mkdtemp(prefix="spirisdk-bench-"))
+    for name in ("robots", "worlds"):
+        (root / name).symlink_to(REPO_ROOT / name)
+    # The proxy container is shared with the SDK, so its CA and image cache must be too
+    (root / "cache").mkdir()
+    for name in ("cacert", "certs", "docker_images"):
+        (REPO_ROOT / "cache" / name).mkdir(parents=True, exist_ok=True)
+        (root / "cache" / name).symlink_to(REPO_ROOT / "cache" / name)
+    if (REPO_ROOT / ".env").exists():
+        shutil.copy(REPO_ROOT / ".env", root / ".env")
+    return root
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from benchmarks import lifecycle
+
+    skip = set(filter(None, args.skip.split(",")))
+    results = {}
+
+    def record(benchmark: str, fleet_size: int, samples: lifecycle.Samples) -> None:
+        for metric, values in samples.items():
+            if values:
+                results[metric_key(f"{benchmark}/{metric}", fleet_size)] = summarize(values)
+
+    if "ca_trust" not in skip:
+        record("ca_trust", 1, lifecycle.ca_trust(args.rounds))
+
+    for size in sorted({int(size) for size in args.fleet.split(",")}):
+        logger.info(f"Benchmarking a fleet of {size} {args.robot_type}")
+        fleet = lifecycle.Fleet(size, args.first_sys_id, args.robot_type)
+        try:
+            fleet.create()
+            record("dind_cold_start", size, await fleet.start())
+            if "compose_up" not in skip:
+                record("compose_up", size, await fleet.compose_up())
+            if "display_daemon_status" not in skip:
+                record("display_daemon_status", size, await fleet.status_latency(args.rounds * 20))
+            if "gazebo" not in skip:
+                record("gazebo", size, await lifecycle.gazebo_round_trip(fleet, args.rounds))
+            record("shutdown", size, await fleet.stop())
+            # The robots' image stores are populated now
+            record("dind_warm_start", size, await fleet.start())
+        finally:
+            await fleet.destroy()
+    return results
+
+
+def report(results: dict) -> None:
+    width = max(map(len, results), default=0)
+    print(f"{'metric':<{width}}  {'n':>5}  {'p50':>9}  {'p90':>9}  {'p99':>9}  {'max':>9}")
+    for key, summary in results.items():
+        print(f"{key:<{width}}  {summary['count']:>5}  " + "  ".join(f"{summary[stat] * 1000:>7.1f}ms" for stat in ("p50", "p90", "p99", "max")))
+
+
+def main() -> int:
+    args = parse_args()
+    root = scratch_root()
+    os.environ["SDK_ROOT"] = str(root)
+    # Otherwise the SDK reaps every spirisdk_ container on exit, the user's robots included
+    os.environ["ADOPT_RUNNING_ROBOTS"] = "true"
+    # Some modules write next to the working directory on import
+    os.chdir(root)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if args.keep:
+            logger.info(f"Scratch SDK_ROOT kept at {root}")
+        else:
+            # DinD stores hold files owned by root, whatever can't be removed is left in /tmp
+            shutil.rmtree(root, ignore_errors=True)
+
+    report(results)
+    record = run_record(results, {key: value for key, value in vars(args).items() if key not in ("save_baseline", "keep")})
+    append_history(RESULTS_DIR / "history.jsonl", record)
+
+    baseline = load_baseline(RESULTS_DIR / "baseline.json")
+    regressions = compare(results, baseline, args.tolerance) if baseline is not None else []
+    for regression in regressions:
+        logger.warning(f"Regression: {regression}")
+    if baseline is None:
+        logger.info("No baseline yet, store one with --save-baseline")
+    elif not regressions:
+        logger.success("No regressions against the baseline")
+
+    if args.save_baseline:
+        save_baseline(RESULTS_DIR / "baseline.json", record)
+        logger.info(f"Saved baseline to {RESULTS_DIR / 'baseline.json'}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
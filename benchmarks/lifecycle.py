@@ -0,0 +1,191 @@
+"""
+Fleet lifecycle benchmarks, driven through the same DockerInDocker,
+daemon_utils and World APIs the app uses.
+
+SDK_ROOT is read when spiriSdk is imported, so import this module only once it
+points at the benchmark's scratch root (see benchmarks.__main__).
+"""
+
+import asyncio, docker, shutil, time
+
+from typing import Callable, Dict, List
+from loguru import logger
+
+from spiriSdk.docker.dindocker import DEFAULT_REGISTRY_PROXY, DockerInDocker, shutdown_fleet
+from spiriSdk.settings import MAX_PARALLEL_STARTS, SDK_ROOT
+from spiriSdk.utils.daemon_utils import daemons, display_daemon_status, lease_robot, start_service, startup_progress
+from spiriSdk.utils.leases import MAX_SYS_ID, leases
+from spiriSdk.utils.robot_config import config_for
+from spiriSdk.utils.service_catalog import service_catalog, startup_order
+
+# Samples in seconds, by metric name
+Samples = Dict[str, List[float]]
+
+
+def timed(function: Callable, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def free_sys_ids(count: int, first: int = 200) -> List[int]:
+    """count system IDs for benchmark robots, from first up and wrapping around to 1 after MAX_SYS_ID.
+
+    IDs that are leased, or used by an existing spirisdk_ container of any robot
+    type, are skipped.
+
+    Raises:
+        ValueError: If fewer than count system IDs are free
+    """
+    containers = docker.from_env().containers.list(all=True, filters={"name": "^/?spirisdk_"})
+    used = {int(suffix) for suffix in (container.name.rsplit("_", 1)[-1] for container in containers) if suffix.isdigit()}
+    candidates = [*range(first, MAX_SYS_ID + 1), *range(1, first)]
+    free = [sys_id for sys_id in candidates if sys_id not in used and leases.sys_id_free(sys_id)]
+    if len(free) < count:
+        raise ValueError(f"Only {len(free)} of the {MAX_SYS_ID} system IDs are free, a fleet of {count} doesn't fit")
+    return free[:count]
+
+
+class Fleet:
+    """Robots of one type created for a benchmark run.
+
+    Args:
+        size: Number of robots, at most MAX_SYS_ID
+        first_sys_id: System ID to allocate the robots' free IDs from (default: 200)
+        robot_type: Folder under robots/ (default: spiri_mu)
+    """
+
+    def __init__(self, size: int, first_sys_id: int = 200, robot_type: str = "spiri_mu"):
+        self.robot_type = robot_type
+        self.names = [f"{robot_type}_{sys_id}" for sys_id in free_sys_ids(size, first_sys_id)]
+
+    def create(self) -> None:
+        """Write the robots' configs and leases, like the new robot dialog does.
+
+        Raises:
+            RuntimeError: If a container with one of the robots' names already exists
+        """
+        for name in self.names:
+            config_for(SDK_ROOT / "data" / name / "config.env").update({"ROBOT_NAME": name})
+            lease_robot(name, int(name.rsplit("_", 1)[1]))
+            daemons[name] = DockerInDocker("docker:dind", name)
+            if daemons[name].adopt():
+                daemons[name].container = None
+                raise RuntimeError(f"Container spirisdk_{name} already exists, pick other system IDs")
+
+    async def start(self) -> Samples:
+        """Start every robot's DinD, MAX_PARALLEL_STARTS at a time like init_daemons.
+
+        init_daemons itself isn't timed: it reaps every spirisdk_ container on the
+        host that isn't one of its robots, which would stop the user's own fleet.
+
+        Returns:
+            Samples: Time to reach each start phase per robot, and the fleet's total
+        """
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_STARTS)
+        samples: Samples = {}
+
+        async def start_one(name: str) -> None:
+            async with semaphore:
+                await asyncio.to_thread(daemons[name].ensure_started)
+            for phase, elapsed in daemons[name].timings.items():
+                samples.setdefault(phase, []).append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(start_one(name) for name in self.names))
+        samples["fleet_total"] = [time.perf_counter() - started]
+        return samples
+
+    async def compose_up(self) -> Samples:
+        """Start every robot's autostart services in dependency order.
+
+        Returns:
+            Samples: Time of each service's compose up per robot, and the fleet's total
+        """
+        services = [service for service in service_catalog.services(self.robot_type) if service.autostart]
+        levels = startup_order(services)
+        semaphore = asyncio.Semaphore(MAX_PARALLEL_STARTS)
+        samples: Samples = {}
+
+        async def up(name: str, service, progress: dict) -> None:
+            started = time.perf_counter()
+            await start_service(name, service, progress)
+            samples.setdefault(service.name, []).append(time.perf_counter() - started)
+
+        async def up_all(name: str) -> None:
+            progress = {}
+            async with semaphore:
+                for level in levels:
+                    await asyncio.gather(*(up(name, service, progress) for service in level))
+            startup_progress.pop(name, None)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(up_all(name) for name in self.names))
+        samples["fleet_total"] = [time.perf_counter() - started]
+        return samples
+
+    async def status_latency(self, rounds: int, ready_timeout: float = 30) -> Samples:
+        """Time display_daemon_status for every robot, once the status caches are seeded."""
+        deadline = time.monotonic() + ready_timeout
+        while not all(isinstance(display_daemon_status(name), dict) for name in self.names):
+            if time.monotonic() > deadline:
+                logger.warning(f"Status caches not ready after {ready_timeout}s, timing them anyway")
+                break
+            await asyncio.sleep(0.1)
+        return {"call": [timed(display_daemon_status, name) for _ in range(rounds) for name in self.names]}
+
+    async def stop(self) -> Samples:
+        """Stop the whole fleet at once, like the SDK does on exit."""
+        containers = [daemons[name].container for name in self.names if daemons[name].container is not None]
+        elapsed = await asyncio.to_thread(shutdown_fleet, containers)
+        for name in self.names:
+            daemons[name].container = None
+        return {"fleet_total": [elapsed]}
+
+    async def destroy(self) -> None:
+        """Remove the fleet's containers and release its leases."""
+        await self.stop()
+        for name in self.names:
+            daemons.pop(name, None)
+            leases.release(name)
+
+
+def ca_trust(rounds: int) -> Samples:
+    """Time preparing the registry proxy CA mounts every DinD is created with."""
+    return {"trust_files": [timed(DEFAULT_REGISTRY_PROXY.trust_files) for _ in range(rounds)]}
+
+
+async def gazebo_round_trip(fleet: Fleet, rounds: int) -> Samples:
+    """Time spawning and removing the fleet's models in a headless isolated world.
+
+    Returns:
+        Samples: Empty if Gazebo isn't installed
+    """
+    if shutil.which("gz") is None:
+        logger.warning("gz not found, skipping the Gazebo benchmarks")
+        return {}
+    from spiriSdk.utils.gazebo_utils import launch_isolated_world, stop_isolated_world
+
+    samples: Samples = {"spawn": [], "remove": [], "spawn_many": [], "remove_many": []}
+    started = time.perf_counter()
+    world = await launch_isolated_world("empty_world", headless=True)
+    try:
+        await world.ready()
+        samples["world_ready"] = [time.perf_counter() - started]
+        for _ in range(rounds):
+            for name in fleet.names:
+                started = time.perf_counter()
+                await world.prep_bot(name, fleet.robot_type)
+                samples["spawn"].append(time.perf_counter() - started)
+                started = time.perf_counter()
+                await world.models[name].kill_model()
+                samples["remove"].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await world.spawn_many(fleet.names)
+            samples["spawn_many"].append(time.perf_counter() - started)
+            started = time.perf_counter()
+            await world.remove_many(fleet.names)
+            samples["remove_many"].append(time.perf_counter() - started)
+    finally:
+        await stop_isolated_world(world)
+    return samples
@@ -0,0 +1,106 @@
+"""
+Percentiles, run history and baseline comparison for the benchmark suite.
+
+Kept free of SDK imports so it can be used (and tested) without Docker.
+"""
+
+import json, math, os, platform, socket, subprocess, time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# The benchmarks run from a scratch SDK_ROOT, the commit is read from here
+REPO_ROOT = Path(__file__).parents[1]
+
+# Percentiles recorded for every metric
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    """q-th percentile of samples, linearly interpolated between the closest ranks."""
+    if not samples:
+        raise ValueError("No samples")
+    ordered = sorted(samples)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    """Count, mean, max and the PERCENTILES of a metric's samples, in seconds."""
+    summary = {"count": len(samples), "mean": sum(samples) / len(samples), "max": max(samples)}
+    summary.update({f"p{q}": percentile(samples, q) for q in PERCENTILES})
+    return summary
+
+
+def metric_key(name: str, fleet_size: int) -> str:
+    """Key of a metric measured at a fleet size, e.g. dind_cold_start@8."""
+    return f"{name}@{fleet_size}"
+
+
+def run_record(results: Dict[str, Dict[str, float]], params: Dict[str, object]) -> Dict[str, object]:
+    """A benchmark run as stored in the history: when, where, on which commit and what was measured."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+
+
+def append_history(path: Path, record: Dict[str, object]) -> None:
+    """Append a run to a JSON lines history file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as history:
+        history.write(json.dumps(record) + "\n")
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Dict[str, float]]]:
+    """Results of the baseline run, or None if there is no baseline yet."""
+    try:
+        return json.loads(path.read_text())["results"]
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path: Path, record: Dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(record, indent=2))
+    tmp_path.replace(path)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float = 0.2,
+    stat: str = "p50",
+    min_delta: float = 0.005,
+) -> List[str]:
+    """Metrics that got slower than the baseline.
+
+    Args:
+        results: Summaries of this run, by metric key
+        baseline: Summaries of the baseline run, by metric key
+        tolerance: Relative slowdown allowed before a metric is flagged (default: 0.2)
+        stat: Statistic compared (default: p50)
+        min_delta: Absolute slowdown in seconds below which a metric is never
+            flagged, so sub-millisecond metrics don't flag on noise (default: 0.005)
+
+    Returns:
+        List[str]: One line per regression, metrics missing from either run are skipped
+    """
+    regressions = []
+    for key in sorted(results.keys() & baseline.keys()):
+        current, previous = results[key][stat], baseline[key][stat]
+        if current - previous > max(previous * tolerance, min_delta):
+            change = (current / previous - 1) * 100 if previous else math.inf
+            regressions.append(f"{key} {stat} {previous * 1000:.1f}ms -> {current * 1000:.1f}ms (+{change:.0f}%)")
+    return regressions
@@ -0,0 +1,308 @@
+"""
+Asyncio variants of Container and DockerInDocker built on aiodocker.
+
+They share their configuration and setup with the blocking classes in
+dindocker.py, but every Docker round-trip is a coroutine, so hundreds of
+daemons can be driven from the event loop without a thread per call.
+
+Typical usage:
+    dind = AsyncDockerInDocker("docker:dind", "spiri_mu_1")
+    await dind.ensure_started()
+    exit_code, output = await dind.exec("docker ps")
+    await dind.cleanup()
+"""
+
+import aiodocker, asyncio, docker, shlex, time
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+from loguru import logger
+
+from spiriSdk.docker.dindocker import Container, DockerInDocker, _create_tar_archive
+
+# Clients by event loop and daemon URL, an aiodocker client can't outlive its loop
+_clients: Dict[Tuple[asyncio.AbstractEventLoop, str], aiodocker.Docker] = {}
+
+
+def get_async_client(url: Optional[str] = None) -> aiodocker.Docker:
+    """Get the shared aiodocker client for a daemon URL.
+
+    Must be called from a running event loop.
+
+    Args:
+        url: Docker daemon URL, or None for DOCKER_HOST / the default socket
+
+    Returns:
+        aiodocker.Docker: A client bound to the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    for stale in [key for key in _clients if key[0].is_closed()]:
+        del _clients[stale]
+    key = (loop, url or "")
+    client = _clients.get(key)
+    if client is None or client.session.closed:
+        client = _clients[key] = aiodocker.Docker(url=url)
+    return client
+
+
+async def evict_async_client(url: Optional[str] = None) -> None:
+    """Close and forget the running event loop's shared aiodocker client for a daemon URL."""
+    client = _clients.pop((asyncio.get_running_loop(), url or ""), None)
+    if client is not None:
+        await client.close()
+
+
+async def _backoff(timeout: float, initial: float = 0.05, maximum: float = 1.0):
+    """Async counterpart of dindocker._backoff, yielding attempt numbers until timeout elapses."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = initial
+    attempt = 0
+    while True:
+        yield attempt
+        attempt += 1
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, maximum)
+
+
+@dataclass
+class AsyncContainer(Container):
+    """Container whose lifecycle methods are coroutines running on aiodocker.
+
+    ``container`` holds an aiodocker DockerContainer instead of a docker-py one.
+    """
+
+    # No docker-py client, making one connects and negotiates the API version on the event loop
+    client: Optional[docker.DockerClient] = field(default=None, init=False)
+    docker_url: Optional[str] = field(default=None)
+
+    @property
+    def aclient(self) -> aiodocker.Docker:
+        """Shared aiodocker client for the daemon this container runs on."""
+        return get_async_client(self.docker_url)
+
+    def _engine_config(self) -> Dict[str, Any]:
+        """Translate the container settings into an Engine API create request."""
+        def as_list(value: Union[str, List[str]]) -> List[str]:
+            return shlex.split(value) if isinstance(value, str) else list(value)
+
+        ports = {port if "/" in port else f"{port}/tcp": host for port, host in self.ports.items()}
+        config: Dict[str, Any] = {
+            "Image": self.image_name,
+            "Env": [key if value is None else f"{key}={value}" for key, value in self.environment.items()],
+            "ExposedPorts": {port: {} for port in ports},
+            "HostConfig": {
+                "Privileged": self.privileged,
+                "AutoRemove": self.auto_remove,
+                "Binds": [f"{src}:{bind['bind']}:{bind.get('mode', 'rw')}" for src, bind in self.volumes.items()],
+                "PortBindings": {port: [{"HostPort": "" if host is None else str(host)}] for port, host in ports.items()},
+            },
+        }
+        if self.command is not None:
+            config["Cmd"] = as_list(self.command)
+        if self.entrypoint is not None:
+            config["Entrypoint"] = as_list(self.entrypoint)
+        return config
+
+    async def ensure_started(self) -> None:
+        """Ensure container is running, starting it if needed.
+
+        Raises:
+            RuntimeError: If container fails to start
+        """
+        self._started_at = time.monotonic()
+        self.timings = {}
+        name = f"spirisdk_{self.container_name}"
+        # Subscribe before acting so the start event can't slip past
+        events = self.aclient.events.subscribe(filters='{"type": ["container"]}')
+        try:
+            try:
+                self.container = await self.aclient.containers.get(name)
+                if self.container["State"]["Running"]:
+                    logger.info(f"Container {name} is already running.")
+                    return
+                logger.info(f"Starting existing container {name}.")
+                await self.container.start()
+            except aiodocker.DockerError as e:
+                if e.status != 404:
+                    raise
+                logger.info(f"Starting container {name} using image {self.image_name} and ports {self.ports}")
+                self.container = await self.aclient.containers.run(self._engine_config(), name=name)
+            self._mark_phase("create")
+
+            await self._wait_until_running(events)
+            self._mark_phase("running")
+        except aiodocker.DockerError as e:
+            raise RuntimeError(f"Failed to start container: {e.message}")
+        finally:
+            del events
+
+    async def _wait_until_running(self, events) -> None:
+        """Wait for the engine to report the container as running.
+
+        Raises:
+            RuntimeError: If the container dies or isn't running within ready_timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.ready_timeout
+        while loop.time() < deadline:
+            info = await self.container.show()
+            if info["State"]["Running"]:
+                return
+            try:
+                # Re-check at least once a second in case the event stream wasn't connected yet
+                event = await asyncio.wait_for(events.get(), timeout=min(1.0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                continue
+            if event is None or event.get("id") != self.container.id:
+                continue
+            if event.get("Action") in ("die", "oom", "destroy"):
+                raise RuntimeError(f"Container spirisdk_{self.container_name} exited during startup ({event['Action']})")
+
+        raise RuntimeError(f"Container not running after {self.ready_timeout} seconds")
+
+    def get_ip(self) -> str:
+        """Get the container's IP address as of the last inspection.
+
+        Raises:
+            RuntimeError: If container isn't running or has no IP
+        """
+        if self.container is None:
+            raise RuntimeError("Container not running")
+
+        ip = self.container["NetworkSettings"]["IPAddress"]
+        if not ip:
+            raise RuntimeError("Container has no IP address assigned")
+        return ip
+
+    async def cleanup(self) -> None:
+        """Clean up container resources."""
+        logger.debug(f"Cleaning up container spirisdk_{self.container_name}")
+        if self.container is not None:
+            try:
+                await self.container.stop(t=5)
+            except aiodocker.DockerError as e:
+                if e.status != 404:
+                    logger.error(f"Error during cleanup: {e.message}")
+            self.container = None
+
+    async def exec(self, cmd: Union[str, List[str]], workdir: Optional[str] = None) -> Tuple[int, bytes]:
+        """Run a command inside the container and collect its output.
+
+        Args:
+            cmd: Command to run, as a string or argument list
+            workdir: Working directory for the command (default: the image's)
+
+        Returns:
+            Tuple[int, bytes]: Exit code and combined stdout/stderr
+
+        Raises:
+            RuntimeError: If container isn't running
+        """
+        if self.container is None:
+            raise RuntimeError("Container not running")
+
+        execution = await self.container.exec(cmd, workdir=workdir)
+        output = bytearray()
+        async with execution.start(detach=False) as stream:
+            while (message := await stream.read_out()) is not None:
+                output += message.data
+        info = await execution.inspect()
+        return info["ExitCode"], bytes(output)
+
+    async def inject_file(self, content: str, container_path: str, mode: int = 0o644) -> None:
+        """Inject a file with given content into the container.
+
+        Raises:
+            RuntimeError: If container isn't running or injection fails
+        """
+        await self.inject_files({container_path: content}, mode=mode)
+
+    async def inject_files(
+        self,
+        files: Dict[str, Union[str, bytes]],
+        mode: int = 0o644,
+        modes: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Inject several files into the container with a single put_archive call.
+
+        Args:
+            files: Mapping of absolute container path to file content
+            mode: File permissions used when a path has no entry in modes (default: 0o644)
+            modes: Optional per-path file permissions
+
+        Raises:
+            RuntimeError: If container isn't running or injection fails
+        """
+        if self.container is None:
+            raise RuntimeError("Container not running")
+
+        modes = modes or {}
+        archive = _create_tar_archive([
+            (container_path, content.encode() if isinstance(content, str) else content, modes.get(container_path, mode))
+            for container_path, content in files.items()
+        ])
+        try:
+            await self.container.put_archive("/", archive)
+        except aiodocker.DockerError as e:
+            raise RuntimeError(f"Failed to inject files: {e.message}")
+
+
+@dataclass
+class AsyncDockerInDocker(DockerInDocker, AsyncContainer):
+    """DockerInDocker whose lifecycle methods are coroutines running on aiodocker.
+
+    Blocking preparation (config files, CA bundle, image store seeding) runs in
+    a worker thread, everything that talks to Docker runs on the event loop.
+    """
+
+    # DockerInDocker's fields come after AsyncContainer's, so its docker-py client is overridden again
+    client: Optional[docker.DockerClient] = field(default=None, init=False)
+
+    async def ensure_started(self) -> None:
+        """Start the Docker-in-Docker container and wait for its inner daemon.
+
+        Raises:
+            RuntimeError: If the container or its daemon doesn't come up within ready_timeout
+        """
+        await asyncio.to_thread(self._prepare_start)
+        await AsyncContainer.ensure_started(self)
+
+        async for _ in _backoff(self.ready_timeout):
+            if self.socket_path.exists():
+                break
+        else:
+            raise RuntimeError(f"Docker daemon socket {self.socket_path} not created after {self.ready_timeout} seconds")
+        self._mark_phase("socket")
+
+        last_error = None
+        async for _ in _backoff(self.ready_timeout):
+            try:
+                # Re-applied on every attempt, the socket found above may be a stale one
+                await self.exec(self._socket_permissions_command())
+                await self.get_async_client().version()
+                break
+            except Exception as e:
+                last_error = e
+        else:
+            raise RuntimeError(
+                f"Docker daemon not ready after {self.ready_timeout} seconds: {str(last_error)}"
+            )
+        self._mark_phase("ping")
+
+        phases = ", ".join(f"{phase} {elapsed:.2f}s" for phase, elapsed in self.timings.items())
+        logger.success(f"Docker-in-Docker container started successfully ({phases})")
+
+    def get_async_client(self) -> aiodocker.Docker:
+        """Get the shared aiodocker client connected to this DinD container."""
+        if self.container is None:
+            raise RuntimeError("Container not running")
+        return get_async_client(self.docker_host)
+
+    async def cleanup(self) -> None:
+        """Clean up container resources and close the clients for the inner daemon."""
+        await evict_async_client(self.docker_host)
+        await AsyncContainer.cleanup(self)
@@ -0,0 +1,85 @@
+"""
+Shared registry of Docker clients keyed by daemon socket.
+"""
+
+import docker, threading, time
+from typing import Dict
+from loguru import logger
+
+
+class ClientPool:
+    """Keeps one Docker client per daemon URL so HTTP keep-alive connections are reused.
+
+    Cached clients are pinged again once they are older than ``health_check_interval``
+    seconds and rebuilt if the daemon stopped answering.
+
+    Typical usage:
+        client = client_pool.get("unix:///tmp/dind-sockets/spirisdk_spiri_mu_1.socket")
+        client_pool.evict("unix:///tmp/dind-sockets/spirisdk_spiri_mu_1.socket")
+    """
+
+    def __init__(self, health_check_interval: float = 10.0):
+        self.health_check_interval = health_check_interval
+        self._clients: Dict[str, docker.DockerClient] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, base_url: str) -> docker.DockerClient:
+        """Get the shared client for a daemon, creating or replacing it if needed.
+
+        Args:
+            base_url: Docker daemon URL, e.g. unix:///path/to/docker.sock
+
+        Returns:
+            docker.DockerClient: A client known to have reached the daemon recently
+
+        Raises:
+            docker.errors.DockerException: If the daemon can't be reached
+        """
+        with self._lock:
+            client = self._clients.get(base_url)
+            checked_at = self._checked_at.get(base_url, 0.0)
+
+        if client is not None:
+            if time.monotonic() - checked_at < self.health_check_interval:
+                return client
+            try:
+                client.ping()
+                with self._lock:
+                    self._checked_at[base_url] = time.monotonic()
+                return client
+            except Exception as e:
+                logger.debug(f"Docker client for {base_url} failed its health check: {e}")
+                self.evict(base_url)
+
+        # Creating a client negotiates the API version, so keep it outside the lock
+        client = docker.DockerClient(base_url=base_url)
+        with self._lock:
+            existing = self._clients.get(base_url)
+            if existing is None:
+                self._clients[base_url] = client
+                self._checked_at[base_url] = time.monotonic()
+                return client
+        client.close()
+        return existing
+
+    def evict(self, base_url: str) -> None:
+        """Close and forget the client for a daemon, e.g. once the daemon is removed."""
+        with self._lock:
+            client = self._clients.pop(base_url, None)
+            self._checked_at.pop(base_url, None)
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Error closing Docker client for {base_url}: {e}")
+
+    def close_all(self) -> None:
+        """Close every cached client."""
+        with self._lock:
+            base_urls = list(self._clients)
+        for base_url in base_urls:
+            self.evict(base_url)
+
+
+client_pool = ClientPool()
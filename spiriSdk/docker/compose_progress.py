@@ -0,0 +1,162 @@
+"""
+Structured progress events parsed from docker compose output.
+"""
+
+import re
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+_UNITS = {"B": 1, "kB": 1000, "KB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4}
+
+_LAYER_PROGRESS = re.compile(
+    r"^(?P<layer>[0-9a-f]{12})\s+(?P<phase>Downloading|Extracting)\s+(?:\[[=> ]*\]\s+)?"
+    r"(?P<current>[\d.]+\s*[kKMGT]?B)/(?P<total>[\d.]+\s*[kKMGT]?B)"
+)
+_LAYER_STATUS = re.compile(
+    r"^(?P<layer>[0-9a-f]{12})\s+(?P<phase>Pulling fs layer|Waiting|Verifying Checksum|Download complete|Pull complete|Already exists)\b"
+)
+_SERVICE_STATUS = re.compile(r"^(?P<service>[\w.-]+)\s+(?P<phase>Pulling|Pulled|Skipped|Error|Interrupted)\b")
+_RESOURCE_STATUS = re.compile(
+    r"^(?P<kind>Container|Network|Volume)\s+(?P<name>\S+)\s+"
+    r"(?P<phase>Creating|Created|Recreate|Recreated|Starting|Started|Running|Waiting|Healthy|Stopping|Stopped|Removing|Removed|Error)\b"
+)
+
+
+def parse_size(text: str) -> int:
+    """Convert a size as printed by docker, e.g. '12.5MB', to bytes."""
+    match = re.match(r"([\d.]+)\s*([kKMGT]?B)", text.strip())
+    if match is None:
+        return 0
+    return int(float(match.group(1)) * _UNITS.get(match.group(2), 1))
+
+
+@dataclass
+class ComposeEvent:
+    """A single line of compose output with whatever progress information it carries."""
+
+    stream: str
+    line: str
+    service: Optional[str] = None
+    phase: Optional[str] = None
+    layer: Optional[str] = None
+    bytes_pulled: Optional[int] = None
+    bytes_total: Optional[int] = None
+    percent: Optional[float] = None
+
+    def __str__(self) -> str:
+        return f"{self.stream}: {self.line}"
+
+
+@dataclass
+class _ServicePull:
+    """Byte counts of the layers pulled for one service."""
+
+    layers: Dict[str, tuple] = field(default_factory=dict)
+
+    def update(self, layer: str, current: int, total: int) -> None:
+        self.layers[layer] = (current, total)
+
+    def complete(self, layer: str) -> None:
+        _, total = self.layers.get(layer, (0, 0))
+        self.layers[layer] = (total, total)
+
+    @property
+    def pulled(self) -> int:
+        return sum(current for current, _ in self.layers.values())
+
+    @property
+    def total(self) -> int:
+        return sum(total for _, total in self.layers.values())
+
+
+class ComposeProgress:
+    """Turns raw compose output lines into ComposeEvents.
+
+    Compose prints layer progress by layer ID only, so layers are attributed to
+    the service that most recently started pulling. When several services pull
+    at once the split between them is approximate, the totals are not.
+
+    Args:
+        project: Compose project name, used to map container names to services
+    """
+
+    def __init__(self, project: Optional[str] = None):
+        self.project = project
+        self._pulls: Dict[str, _ServicePull] = {}
+        self._layer_owner: Dict[str, str] = {}
+        self._pulling: list = []
+
+    def parse(self, stream: str, line: str) -> ComposeEvent:
+        """Parse one line of compose output.
+
+        Args:
+            stream: 'stdout' or 'stderr'
+            line: The line, without its trailing newline
+
+        Returns:
+            ComposeEvent: The event, with only stream and line set if nothing was recognised
+        """
+        event = ComposeEvent(stream=stream, line=line)
+        # Drop the status glyphs compose prints in front of lines
+        text = re.sub(r"^[^\w]+", "", line.strip())
+
+        match = _LAYER_PROGRESS.match(text)
+        if match:
+            event.layer, event.phase = match.group("layer"), match.group("phase").lower()
+            event.service = self._owner(event.layer)
+            if event.service is not None:
+                pull = self._pulls[event.service]
+                if event.phase == "downloading":
+                    pull.update(event.layer, parse_size(match.group("current")), parse_size(match.group("total")))
+                self._fill_bytes(event, pull)
+            return event
+
+        match = _LAYER_STATUS.match(text)
+        if match:
+            event.layer, event.phase = match.group("layer"), match.group("phase").lower()
+            event.service = self._owner(event.layer)
+            if event.service is not None:
+                pull = self._pulls[event.service]
+                if event.phase in ("download complete", "pull complete", "already exists"):
+                    pull.complete(event.layer)
+                self._fill_bytes(event, pull)
+            return event
+
+        match = _RESOURCE_STATUS.match(text)
+        if match:
+            event.phase = match.group("phase").lower()
+            if match.group("kind") == "Container":
+                event.service = self._service_of_container(match.group("name"))
+            return event
+
+        match = _SERVICE_STATUS.match(text)
+        if match:
+            event.service, event.phase = match.group("service"), match.group("phase").lower()
+            pull = self._pulls.setdefault(event.service, _ServicePull())
+            if event.phase == "pulling":
+                self._pulling.append(event.service)
+            elif event.service in self._pulling:
+                self._pulling.remove(event.service)
+            if event.phase == "pulled":
+                event.percent = 100.0
+                event.bytes_pulled = event.bytes_total = pull.total
+            return event
+
+        return event
+
+    def _owner(self, layer: str) -> Optional[str]:
+        if layer not in self._layer_owner and self._pulling:
+            self._layer_owner[layer] = self._pulling[-1]
+        return self._layer_owner.get(layer)
+
+    @staticmethod
+    def _fill_bytes(event: ComposeEvent, pull: _ServicePull) -> None:
+        event.bytes_pulled, event.bytes_total = pull.pulled, pull.total
+        if pull.total:
+            event.percent = round(100.0 * pull.pulled / pull.total, 1)
+
+    def _service_of_container(self, container_name: str) -> str:
+        if self.project and container_name.startswith(f"{self.project}-"):
+            container_name = container_name[len(self.project) + 1:]
+        return container_name.rsplit("-", 1)[0]
@@ -2,31 +2,126 @@
 Container management classes including base Container and DockerInDocker implementations.
 """
 
-import docker.errors, docker.models.containers, atexit, subprocess, time, os, uuid, asyncio, requests
+import docker.errors, docker.models.containers, atexit, subprocess, time, os, uuid, asyncio, requests, io, tarfile, posixpath, ssl, certifi
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple, Union
 from loguru import logger
 from dataclasses import dataclass, field
-from spiriSdk.settings import CURRENT_PRIMARY_GROUP, SDK_ROOT, SIM_ADDRESS, GROUND_CONTROL_ADDRESS
+from spiriSdk.settings import CURRENT_PRIMARY_GROUP, SDK_ROOT, SIM_ADDRESS, GROUND_CONTROL_ADDRESS, ADOPT_RUNNING_ROBOTS, SHUTDOWN_TIMEOUT, DIND_SOCKET_DIR
+from spiriSdk.docker.client_pool import client_pool
+from spiriSdk.docker.compose_progress import ComposeProgress
+from spiriSdk.docker.image_store import seed_store
+from spiriSdk.utils.robot_config import config_for
 import dotenv
 
 
-def cleanup_docker_resources():
-    """Cleanup function to remove all stopped containers and unused images."""
-    client = docker.from_env()
-    #Find all containers that start with "spirisdk_" and remove them
-    containers = client.containers.list(all=True, filters={"name": "spirisdk_"})
-    logger.info(f"Cleaning up {len(containers)} containers...")
-    for container in containers:
+def shutdown_fleet(containers: Optional[List[docker.models.containers.Container]] = None, timeout: float = SHUTDOWN_TIMEOUT) -> float:
+    """Stop and remove containers concurrently under one global deadline.
+
+    Every container gets SIGTERM at once, containers still running when the
+    deadline passes get SIGKILL, then all of them are removed.
+
+    Args:
+        containers: Containers to shut down (default: all spirisdk_ containers)
+        timeout: Seconds the whole fleet gets to exit gracefully
+
+    Returns:
+        float: Seconds the shutdown took
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    if containers is None:
+        containers = docker.from_env().containers.list(all=True, filters={"name": "^/?spirisdk_"})
+    if not containers:
+        return 0.0
+    logger.info(f"Shutting down {len(containers)} containers...")
+
+    def terminate(container) -> None:
+        try:
+            container.kill(signal="SIGTERM")
+        except docker.errors.APIError:
+            # Not running (or already gone), nothing to signal
+            pass
+
+    def wait_or_kill(container) -> bool:
+        try:
+            container.wait(timeout=max(deadline - time.monotonic(), 0.1))
+            return False
+        except docker.errors.NotFound:
+            return False
+        except Exception:
+            pass
+        try:
+            container.kill(signal="SIGKILL")
+        except docker.errors.APIError:
+            pass
+        return True
+
+    def remove(container) -> None:
         try:
-            logger.info(f"Removing container {container.name} ({container.id})")
             container.remove(force=True)
+        except docker.errors.NotFound:
+            pass
         except docker.errors.APIError as e:
             logger.error(f"Failed to remove container {container.name}: {e}")
 
-cleanup_docker_resources()
+    with ThreadPoolExecutor(max_workers=min(len(containers), 32)) as pool:
+        list(pool.map(terminate, containers))
+        killed = sum(pool.map(wait_or_kill, containers))
+        list(pool.map(remove, containers))
+
+    elapsed = time.monotonic() - started
+    logger.info(f"Shut down {len(containers)} containers in {elapsed:.1f}s ({killed} killed after {timeout}s)")
+    return elapsed
+
+def cleanup_docker_resources(keep: Iterable[str] = ()):
+    """Remove all spirisdk_ containers except the ones named in keep.
+
+    Args:
+        keep: Container names, without the spirisdk_ prefix, to leave running
+    """
+    keep = {f"spirisdk_{name}" for name in keep}
+    client = docker.from_env()
+    #Find all containers that start with "spirisdk_" and remove them
+    containers = client.containers.list(all=True, filters={"name": "^/?spirisdk_"})
+    shutdown_fleet([container for container in containers if container.name not in keep])
+
+if not ADOPT_RUNNING_ROBOTS:
+    atexit.register(cleanup_docker_resources)
+
+async def _read_line(stream: asyncio.StreamReader) -> bytes:
+    """Read the next line of a subprocess stream, skipping lines over the reader's limit.
 
-atexit.register(cleanup_docker_resources)
+    Returns:
+        bytes: The line, empty at the end of the stream
+    """
+    while True:
+        try:
+            return await stream.readline()
+        except ValueError as e:
+            # readline already dropped the oversized line from its buffer
+            logger.debug(f"Skipping overlong output line: {e}")
+
+def _backoff(timeout: float, initial: float = 0.05, maximum: float = 1.0):
+    """Yield attempt numbers until timeout elapses, sleeping with exponential backoff in between.
+
+    Args:
+        timeout: Total time budget in seconds
+        initial: First delay between attempts in seconds (default: 0.05)
+        maximum: Upper bound for the delay between attempts in seconds (default: 1.0)
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial
+    attempt = 0
+    while True:
+        yield attempt
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, maximum)
 
 @dataclass
 class Container:
@@ -45,10 +140,12 @@ class Container:
     sdk_root: Path = field(default_factory=lambda: SDK_ROOT)
     command: Optional[str] = field(default=None)
     entrypoint: Optional[str] = field(default=None)
+    timings: Dict[str, float] = field(default_factory=dict, init=False)
+    # Whether the container was found already existing rather than created by us
+    adopted: bool = field(default=False, init=False)
 
     def __post_init__(self):
-        """Register cleanup handler after initialization."""
-        atexit.register(self.cleanup)
+        """Prepare the certificate cache after initialization."""
         # Ensure cache directory exists
         cache_dir = SDK_ROOT / "cache" / "certs"
         cache_dir.mkdir(parents=True, exist_ok=True)
@@ -60,23 +157,25 @@ class Container:
     def ensure_started(self) -> None:
         """Ensure container is running, starting it if needed.
 
+        Readiness is driven by the Docker events stream rather than polling, and
+        the time taken to reach each phase is recorded in ``timings``.
+
         Raises:
             RuntimeError: If container fails to start
         """
         #print(f"Ensuring container {self.container_name} is started with image {self.image_name}")
+        self._started_at = time.monotonic()
+        self.timings = {}
         try:
             # Check if a container with the same name already exists
             if self.container is None:
-                existing_containers = self.client.containers.list(all=True, filters={"name": "spirisdk_"+self.container_name})
-                if existing_containers:
-                    self.container = existing_containers[0]
+                if self.adopt():
                     if self.container.status == "running":
                         logger.info(f"Container spirisdk_{self.container_name} is already running.")
                         return
                     else:
                         logger.info(f"Starting existing container spirisdk_{self.container_name}.")
                         self.container.start()
-                        return
                 else:
                     logger.info(f"Starting container spirisdk_{self.container_name} using image {self.image_name} and ports {self.ports}")
                     docker_args = {
@@ -110,22 +209,61 @@ class Container:
                     return self.ensure_started()  # retry from beginning
         except Exception as e:
             raise RuntimeError(f"Failed to start container: {str(e)}")
+        self._mark_phase("create")
 
         logger.debug("Waiting for container to be ready...")
-        # Wait for container to be ready
-        for attempt in range(self.ready_timeout):
-            try:
-                # Get fresh container info
-                self.container = self.client.containers.get(self.container.id)
-                if self.container.status != "running":
-                    time.sleep(1)
-                    continue
+        self._wait_until_running()
+        self._mark_phase("running")
+
+    def adopt(self) -> bool:
+        """Re-attach to an existing container with this container's name, e.g. after an SDK restart.
+
+        Returns:
+            bool: True if a container was found and attached
+        """
+        existing_containers = self.client.containers.list(all=True, filters={"name": f"^/?spirisdk_{self.container_name}$"})
+        self.adopted = bool(existing_containers)
+        if not existing_containers:
+            return False
+        self.container = existing_containers[0]
+        logger.info(f"Attached to existing container spirisdk_{self.container_name} ({self.container.status})")
+        return True
+
+    def _mark_phase(self, phase: str) -> None:
+        """Record the seconds elapsed since ensure_started began for a startup phase."""
+        self.timings[phase] = time.monotonic() - self._started_at
+        logger.debug(f"spirisdk_{self.container_name} reached '{phase}' after {self.timings[phase]:.3f}s")
+
+    def _wait_until_running(self) -> None:
+        """Block until the Docker engine reports the container as running.
+
+        The event subscription is opened before the state is re-checked, so a
+        start that lands in between the two is never missed.
+
+        Raises:
+            RuntimeError: If the container dies or isn't running within ready_timeout seconds
+        """
+        events = self.client.events(
+            decode=True,
+            until=int(time.time()) + self.ready_timeout,
+            filters={"type": "container", "container": self.container.id},
+        )
+        try:
+            self.container.reload()
+            if self.container.status == "running":
                 return
-            except Exception:
-                time.sleep(1)
+            for event in events:
+                action = event.get("Action", event.get("status"))
+                if action == "start":
+                    self.container.reload()
+                    return
+                if action in ("die", "oom", "destroy"):
+                    raise RuntimeError(f"Container spirisdk_{self.container_name} exited during startup ({action})")
+        finally:
+            events.close()
 
         raise RuntimeError(
-            f"Failed to start container after {self.ready_timeout} attempts"
+            f"Container not running after {self.ready_timeout} seconds"
         )
 
     def __enter__(self):
@@ -174,6 +312,69 @@ class Container:
             container_path: Absolute path where file should be created in container
             mode: File permissions (default: 0o644)
             
+        Raises:
+            RuntimeError: If container isn't running or injection fails
+        """
+        self.inject_files({container_path: content}, mode=mode)
+
+    def inject_files(
+        self,
+        files: Dict[str, Union[str, bytes]],
+        mode: int = 0o644,
+        modes: Optional[Dict[str, int]] = None,
+    ) -> None:
+        """Inject several files into the container with a single put_archive call.
+
+        The archive is built in memory and carries each file's permissions, so no
+        temp files or extra exec round-trips are needed. Missing parent directories
+        are created by the Docker engine while it extracts the archive.
+
+        Args:
+            files: Mapping of absolute container path to file content
+            mode: File permissions used when a path has no entry in modes (default: 0o644)
+            modes: Optional per-path file permissions
+
+        Raises:
+            RuntimeError: If container isn't running or injection fails
+        """
+        modes = modes or {}
+        self._put_entries([
+            (container_path, content.encode() if isinstance(content, str) else content, modes.get(container_path, mode))
+            for container_path, content in files.items()
+        ])
+
+    def inject_tree(self, host_dir: Path, container_dir: str) -> None:
+        """Inject a host directory tree into the container with a single put_archive call.
+
+        Files and directories keep their host permission bits.
+
+        Args:
+            host_dir: Directory on the host to copy from
+            container_dir: Absolute path in the container the tree is copied to
+
+        Raises:
+            RuntimeError: If container isn't running or injection fails
+        """
+        host_dir = Path(host_dir)
+        if not host_dir.is_dir():
+            raise RuntimeError(f"{host_dir} is not a directory")
+
+        entries = [(container_dir, None, host_dir.stat().st_mode & 0o7777)]
+        for path in sorted(host_dir.rglob("*")):
+            dest = f"{container_dir.rstrip('/')}/{path.relative_to(host_dir).as_posix()}"
+            file_mode = path.stat().st_mode & 0o7777
+            if path.is_dir():
+                entries.append((dest, None, file_mode))
+            elif path.is_file():
+                entries.append((dest, path.read_bytes(), file_mode))
+        self._put_entries(entries)
+
+    def _put_entries(self, entries: List[Tuple[str, Optional[bytes], int]]) -> None:
+        """Deliver archive entries to the container in one put_archive call.
+
+        Args:
+            entries: (container path, file content or None for a directory, mode) tuples
+
         Raises:
             RuntimeError: If container isn't running or injection fails
         """
@@ -181,54 +382,37 @@ class Container:
             raise RuntimeError("Container not running")
 
         try:
-            # Ensure path is absolute
-            if not container_path.startswith('/'):
-                container_path = f'/{container_path}'
-
-            # Create parent directories if needed
-            dir_path = str(Path(container_path).parent)
-            self.container.exec_run(f"mkdir -p {dir_path}")
-            
-            # Create a temporary file with the content
-            temp_file = Path(f"/tmp/inject_{uuid.uuid4().hex[:8]}")
-            temp_file.write_text(content)
-            
-            try:
-                # Copy file into container
-                self.container.put_archive(
-                    path="/",  # Always use root as base path
-                    data=self._create_tar_archive(temp_file, container_path)
-                )
-                
-                # Set permissions
-                self.container.exec_run(f"chmod {oct(mode)[2:]} {container_path}")
-            finally:
-                temp_file.unlink()  # Clean up temp file
-                
+            # Always use root as base path
+            if not self.container.put_archive(path="/", data=_create_tar_archive(entries)):
+                raise RuntimeError("put_archive was rejected by the Docker engine")
         except Exception as e:
-            raise RuntimeError(f"Failed to inject file: {str(e)}")
+            raise RuntimeError(f"Failed to inject files: {str(e)}")
 
-    def _create_tar_archive(self, src_path: Path, dest_path: str) -> bytes:
-        """Create a tar archive containing a single file.
-        
-        Args:
-            src_path: Path to source file on host
-            dest_path: Destination path in container
-            
-        Returns:
-            bytes: Tar archive data
-        """
-        import io
-        import tarfile
-        
-        tar_stream = io.BytesIO()
-        with tarfile.open(fileobj=tar_stream, mode='w') as tar:
-            tarinfo = tar.gettarinfo(str(src_path), arcname=dest_path)
-            with src_path.open('rb') as f:
-                tar.addfile(tarinfo, f)
-        
-        tar_stream.seek(0)
-        return tar_stream.read()
+def _create_tar_archive(entries: List[Tuple[str, Optional[bytes], int]]) -> bytes:
+    """Create an in-memory tar archive from file and directory entries.
+
+    Args:
+        entries: (container path, file content or None for a directory, mode) tuples
+
+    Returns:
+        bytes: Tar archive data, with paths relative to the container root
+    """
+    tar_stream = io.BytesIO()
+    now = time.time()
+    with tarfile.open(fileobj=tar_stream, mode='w') as tar:
+        for container_path, content, mode in entries:
+            arcname = posixpath.normpath(f"/{container_path}").lstrip("/")
+            tarinfo = tarfile.TarInfo(arcname)
+            tarinfo.mode = mode
+            tarinfo.mtime = now
+            if content is None:
+                tarinfo.type = tarfile.DIRTYPE
+                tar.addfile(tarinfo)
+            else:
+                tarinfo.size = len(content)
+                tar.addfile(tarinfo, io.BytesIO(content))
+
+    return tar_stream.getvalue()
 
 @dataclass
 class DockerRegistryProxy(Container):
@@ -251,6 +435,63 @@ class DockerRegistryProxy(Container):
             str(SDK_ROOT / "cache" / "cacert"): {"bind": "/ca", "mode": "rw"},
         }
     )
+    ca_dir: Path = field(default_factory=lambda: SDK_ROOT / "cache" / "cacert")
+    trust_dir: Path = field(default_factory=lambda: SDK_ROOT / "cache" / "certs")
+
+    def load_cacert(self, timeout: int = 120) -> str:
+        """Read the proxy's CA certificate from its persisted CA volume on the host.
+
+        The proxy generates the CA once and keeps it in ca_dir, so after the very
+        first start this is a plain disk read with no HTTP round-trip.
+
+        Args:
+            timeout: Seconds to wait for a freshly started proxy to write the CA (default: 120)
+
+        Returns:
+            str: The PEM encoded CA certificate
+
+        Raises:
+            RuntimeError: If no valid certificate shows up within timeout
+        """
+        cacert_path = self.ca_dir / "ca.crt"
+        for _ in _backoff(timeout, maximum=2.0):
+            try:
+                cacert = cacert_path.read_text()
+                # Rejects missing, truncated or half-written certificates
+                ssl.PEM_cert_to_DER_cert(cacert.strip())
+                return cacert
+            except (OSError, ValueError) as e:
+                logger.debug(f"CA certificate at {cacert_path} not usable yet: {e}")
+
+        raise RuntimeError(f"No valid CA certificate at {cacert_path} after {timeout} seconds")
+
+    def trust_files(self) -> Dict[str, Dict[str, str]]:
+        """Prepare volume mounts that make a new container trust the proxy's CA.
+
+        Writes the CA and a trust bundle (certifi's roots plus the CA) under
+        trust_dir, rewriting them only when the CA changes. Mounting the bundle
+        over the system bundle means nothing has to run inside the container.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Volume mappings to add to a container's volumes
+        """
+        cacert = self.load_cacert()
+        self.trust_dir.mkdir(parents=True, exist_ok=True)
+        ca_path = self.trust_dir / "registry-proxy-ca.crt"
+        bundle_path = self.trust_dir / "ca-certificates.crt"
+
+        if not ca_path.exists() or ca_path.read_text() != cacert or not bundle_path.exists():
+            logger.info(f"Registry proxy CA changed, rebuilding trust bundle at {bundle_path}")
+            bundle = Path(certifi.where()).read_text().rstrip("\n") + "\n" + cacert
+            for path, content in ((bundle_path, bundle), (ca_path, cacert)):
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_text(content)
+                tmp_path.replace(path)
+
+        return {
+            str(ca_path): {"bind": "/usr/local/share/ca-certificates/registry-proxy-ca.crt", "mode": "ro"},
+            str(bundle_path): {"bind": "/etc/ssl/certs/ca-certificates.crt", "mode": "ro"},
+        }
 
     def get_cacert(self) -> str:
         """Get the CA certificate for the registry mirror.
@@ -311,7 +552,7 @@ class DockerInDocker(Container):
     """
 
     image_name: str = "docker:dind"
-    socket_dir: Path = field(default_factory=lambda: Path("/tmp/dind-sockets"))
+    socket_dir: Path = field(default_factory=lambda: DIND_SOCKET_DIR)
 
     container_name: str = field(default_factory=lambda: f"dind_{uuid.uuid4().hex[:8]}")
     privileged: bool = field(default=True, init=False)
@@ -327,25 +568,27 @@ class DockerInDocker(Container):
             "2375/tcp": None},  # Publish Docker port
         init=False
     )
-    robot_data_root: Path = field(init=False)
+    robot_data_root: Optional[Path] = field(default=None)
     robot_root: Path = field(init=False)
     robot_type: str = field(init=False)
     registry_proxy: Optional[DockerRegistryProxy] = field(default_factory=lambda: DEFAULT_REGISTRY_PROXY)
     #registry_proxy: Optional[DockerRegistryProxy] = field(default=None)
+    docker_store: Optional[Path] = field(default=None)
 
     def __post_init__(self):
         """Initialize DinD-specific paths and settings."""
         super().__post_init__()
-        atexit.register(self.cleanup)
         self.robot_type = "-".join(self.image_name.split('-')[:-1])
-        self.robot_data_root = self.sdk_root / "data" / self.container_name
+        if self.robot_data_root is None:
+            self.robot_data_root = self.sdk_root / "data" / self.container_name
         self.robot_data_root.mkdir(parents=True, exist_ok=True)
         self.robot_root = self.sdk_root / "robots" / self.robot_type
         
         # Create socket directory if it doesn't exist
         self.socket_dir.mkdir(mode=0o777, parents=True, exist_ok=True)
-        lib_docker_cache = self.sdk_root / "cache" / "dind-cache" / self.container_name / "docker"
-        lib_docker_cache.mkdir(parents=True, exist_ok=True)
+        if self.docker_store is None:
+            self.docker_store = self.sdk_root / "cache" / "dind-cache" / self.container_name / "docker"
+        self.docker_store.mkdir(parents=True, exist_ok=True)
         self.volumes.update({
             str(self.robot_data_root): {"bind": "/data", "mode": "rw"},
             str(self.socket_dir): {"bind": "/dind-sockets", "mode": "rw"},
@@ -353,7 +596,7 @@ class DockerInDocker(Container):
             #Host docker socket
             "/var/run/docker.sock": {"bind": "/var/run/docker-host.sock", "mode": "rw"},
             # Cache directory for Docker-in-Docker
-            str(lib_docker_cache): {"bind": "/var/lib/docker", "mode": "rw"},
+            str(self.docker_store): {"bind": "/var/lib/docker", "mode": "rw"},
         })
                 
         self.command = [
@@ -361,17 +604,64 @@ class DockerInDocker(Container):
         ]
         
         self.robot_env = Path(self.robot_data_root) / "config.env"
+        self.config = config_for(self.robot_env)
 
-        
+    def cleanup(self) -> None:
+        """Clean up container resources and drop the pooled client for the inner daemon."""
+        client_pool.evict(self.docker_host)
+        super().cleanup()
+
+    @property
+    def socket_path(self) -> Path:
+        """Host path of the unix socket the inner Docker daemon listens on."""
+        return self.socket_dir / f"spirisdk_{self.container_name}.socket"
+
+    @property
+    def docker_host(self) -> str:
+        """DOCKER_HOST style URL of the inner Docker daemon."""
+        return f"unix://{self.socket_path}"
 
     def ensure_started(self) -> None:
         """Start the Docker-in-Docker container with specialized configuration."""
-        
-        dotenv.set_key(self.robot_env, "SIM_ADDRESS", SIM_ADDRESS)
-        dotenv.set_key(self.robot_env, "GROUND_CONTROL_ADDRESS", GROUND_CONTROL_ADDRESS)
-        sysid = int(self.env_get('MAVLINK_SYS_ID', '0'))
-        
-        self.env_set('ARDUPILOT_PORT', str(5760 + 10 * sysid))
+        self._prepare_start()
+        super().ensure_started()  # Use base class implementation
+
+        # Additional DinD-specific readiness check
+        logger.debug("Checking Docker daemon readiness...")
+        for _ in _backoff(self.ready_timeout):
+            if self.socket_path.exists():
+                break
+        else:
+            raise RuntimeError(f"Docker daemon socket {self.socket_path} not created after {self.ready_timeout} seconds")
+        self._mark_phase("socket")
+
+        last_error = None
+        for _ in _backoff(self.ready_timeout):
+            try:
+                # Set ownership and permissions of socket file inside container, on every attempt
+                # since the socket found above may be a stale one dockerd hasn't replaced yet
+                self.container.exec_run(self._socket_permissions_command())
+                self.get_client().ping()
+                break
+            except Exception as e:
+                last_error = e
+        else:
+            raise RuntimeError(
+                f"Docker daemon not ready after {self.ready_timeout} seconds: {str(last_error)}"
+            )
+        self._mark_phase("ping")
+
+        phases = ", ".join(f"{phase} {elapsed:.2f}s" for phase, elapsed in self.timings.items())
+        logger.success(f"Docker-in-Docker container started successfully ({phases})")
+
+    def _prepare_start(self) -> None:
+        """Write the robot's runtime config and prepare everything the container is created with."""
+        runtime = {"SIM_ADDRESS": SIM_ADDRESS, "GROUND_CONTROL_ADDRESS": GROUND_CONTROL_ADDRESS}
+        # Robots with a lease already have their ports, older configs derive them from the system ID
+        if self.config.exists and self.config.get('SITL_INSTANCE') is None:
+            sysid = self.config.sys_id
+            runtime.update({"SITL_INSTANCE": sysid, "ARDUPILOT_PORT": 5760 + 10 * sysid})
+        self.config.update(runtime)
         
         # Debug: Verify volumes before starting
         logger.debug(f"Volume mounts before start: {self.volumes}")
@@ -390,43 +680,20 @@ class DockerInDocker(Container):
                 "NO_PROXY": "localhost,127.0.0.1"
             })
 
-        super().ensure_started()  # Use base class implementation
-
-        if self.registry_proxy:
-            # Inject the CA certificate into the container
+            # Trust the proxy's CA from creation time on, no injection needed afterwards
             try:
-                cacert = self.registry_proxy.get_cacert()
-                self.inject_file(
-                    content=cacert,
-                    container_path="/usr/local/share/ca-certificates/registry-proxy-ca.crt",
-                    mode=0o644
-                )
-                # Update CA certificates
-                self.container.exec_run("update-ca-certificates")
+                self.volumes.update(self.registry_proxy.trust_files())
             except Exception as e:
-                logger.error(f"Failed to inject CA certificate: {e}")
-
+                logger.error(f"Failed to prepare CA certificate: {e}")
 
+        if self.container is None:
+            seed_store(self.container_name, self.docker_store)
 
+    def _socket_permissions_command(self) -> List[str]:
+        """Command run inside the container to make the daemon socket usable from the host."""
+        inner_socket = f"/dind-sockets/{self.socket_path.name}"
+        return ["sh", "-c", f"chown :{CURRENT_PRIMARY_GROUP} {inner_socket} && chmod 666 {inner_socket}"]
 
-        # Additional DinD-specific readiness check
-        logger.debug("Checking Docker daemon readiness...")
-        for attempt in range(self.ready_timeout):
-            try:
-                # Set ownership and permissions of socket file inside container
-                self.container.exec_run(f"chown :{CURRENT_PRIMARY_GROUP} /dind-sockets/spirisdk_{self.container_name}.socket")
-                self.container.exec_run(f"chmod 666 /dind-sockets/spirisdk_{self.container_name}.socket")
-                
-                self.get_client().ping()
-                logger.success("Docker-in-Docker container started successfully")
-                return
-            except Exception as e:
-                if attempt == self.ready_timeout - 1:
-                    raise RuntimeError(
-                        f"Docker daemon not ready after {self.ready_timeout} attempts: {str(e)}"
-                    )
-                time.sleep(1)
-                
     def env_get(self, key: str, default: Optional[str] = None) -> str:
         """Get an environment variable from the robot's config.env file.
         Args:
@@ -435,12 +702,7 @@ class DockerInDocker(Container):
         Returns:
             str: Environment variable value or default
         """
-        if not self.robot_env.exists():
-            raise RuntimeError(f"Config file {self.robot_env} does not exist")
-        
-        # Load environment variables from the config file
-        env_vars = dotenv.dotenv_values(self.robot_env)
-        return env_vars.get(key, default)
+        return self.config.get(key, default)
     
     def env_set(self, key: str, value: str) -> None:
         """Set an environment variable in the robot's config.env file.
@@ -449,24 +711,16 @@ class DockerInDocker(Container):
             key: Environment variable name
             value: Value to set for the variable
         """
-        if not self.robot_env.exists():
+        if not self.config.exists:
             raise RuntimeError(f"Config file {self.robot_env} does not exist")
-        
-        # Load existing variables
-        env_vars = dotenv.dotenv_values(self.robot_env)
-        
-        # Update or add the variable
-        env_vars[key] = value
-        
-        # Write back to the config file
-        dotenv.set_key(self.robot_env, key, value)
+        self.config.set(key, value)
         
 
     def get_client(self) -> docker.DockerClient:
-        """Get a Docker client connected to this DinD container."""
+        """Get the shared Docker client connected to this DinD container."""
         if self.container is None:
             raise RuntimeError("Container not running")
-        return docker.DockerClient(base_url=f"unix:///tmp/dind-sockets/spirisdk_{self.container_name}.socket")
+        return client_pool.get(self.docker_host)
         #return docker.DockerClient(base_url=f"tcp://{self.container_ip()}:2375")
 
     def _prepare_service_paths(self, compose_file: str) -> Dict[str, Any]:
@@ -489,18 +743,28 @@ class DockerInDocker(Container):
             "project_dir": f"/data/{service_name}",  # Project dir in container
         }
 
-    async def run_compose(self, compose_file: str, max_attempts: int = 3):
+    async def run_compose(
+        self,
+        compose_file: str,
+        max_attempts: int = 3,
+        buffer_lines: int = 256,
+        env_file: Optional[Union[str, Path]] = None,
+    ):
         """Run docker compose with retry logic for network issues.
+
+        stdout and stderr are read concurrently, so a quiet stream never holds
+        back the other one, and lines are yielded in the order they arrive.
         
         Args:
             compose_file: Path to docker-compose.yaml file
             max_attempts: Maximum number of retry attempts (default: 3)
+            buffer_lines: Lines buffered before the readers wait for the consumer (default: 256)
+            env_file: Host path of an env file used for variable interpolation,
+                its values take precedence over the SDK's own environment
 
         Yields:
-            str: Lines of output from the compose process
-
-        Yields:
-            str: Lines of output from the compose process
+            ComposeEvent: One event per line of output, with pull and container
+                progress parsed out where the line carries any
 
         Raises:
             RuntimeError: If compose fails after all retry attempts
@@ -508,7 +772,7 @@ class DockerInDocker(Container):
         logger.info(f"Running compose file: {compose_file}")
         
         paths = self._prepare_service_paths(compose_file)
-        docker_host = f"unix://{self.socket_dir}/spirisdk_{self.container_name}.socket"
+        docker_host = self.docker_host
         logger.debug(f"Docker host: {docker_host}")
         env = os.environ.copy()
         env.update({
@@ -516,6 +780,10 @@ class DockerInDocker(Container):
             "HOST_DATA_DIR": paths["host_path"],
             "CONTAINER_DATA_DIR": paths["container_path"]
         })
+        env_file_args = []
+        if env_file is not None:
+            env_file_args = ["--env-file", str(env_file)]
+            env.update({key: value for key, value in dotenv.dotenv_values(env_file).items() if value is not None})
 
         last_exception = None
         for attempt in range(1, max_attempts + 1):
@@ -525,6 +793,7 @@ class DockerInDocker(Container):
                     "compose",
                     "--file", paths["compose_file"],
                     "--project-directory", paths["project_dir"],
+                    *env_file_args,
                     "up",
                     "--detach",
                     env=env,
@@ -533,28 +802,45 @@ class DockerInDocker(Container):
                 )
 
                 # Stream stdout and stderr
-                while True:
-                    stdout_line = await proc.stdout.readline()
-                    stderr_line = await proc.stderr.readline()
-                    
-                    if not stdout_line and not stderr_line:
-                        break
-                        
-                    if stdout_line:
-                        line = stdout_line.decode().strip()
-                        if line:
-                            yield f"stdout: {line}"
-                    if stderr_line:
-                        line = stderr_line.decode().strip()
-                        if line:
-                            yield f"stderr: {line}"
+                progress = ComposeProgress(project=Path(paths["project_dir"]).name)
+                queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_lines)
+
+                async def pump(stream: asyncio.StreamReader, name: str) -> None:
+                    try:
+                        while raw_line := await _read_line(stream):
+                            line = raw_line.decode(errors="replace").strip()
+                            if line:
+                                await queue.put((name, line))
+                    except Exception as e:
+                        logger.warning(f"Reading compose {name} failed: {e}")
+                    # Always mark the stream done, or the consumer waits for it forever
+                    await queue.put((name, None))
+
+                readers = [
+                    asyncio.create_task(pump(proc.stdout, "stdout")),
+                    asyncio.create_task(pump(proc.stderr, "stderr")),
+                ]
+                try:
+                    open_streams = len(readers)
+                    while open_streams:
+                        name, line = await queue.get()
+                        if line is None:
+                            open_streams -= 1
+                            continue
+                        yield progress.parse(name, line)
+                finally:
+                    for reader in readers:
+                        reader.cancel()
+                    if proc.returncode is None and open_streams:
+                        # Consumer went away, don't leave compose blocked on a full pipe
+                        proc.kill()
 
                 # Check return code
                 return_code = await proc.wait()
                 if return_code == 0:
                     return
                 else:
-                    raise subprocess.CalledProcessError(return_code, proc.args)
+                    raise subprocess.CalledProcessError(return_code, "docker compose up")
 
             except subprocess.CalledProcessError as e:
                 last_exception = e
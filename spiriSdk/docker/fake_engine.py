@@ -0,0 +1,665 @@
+"""
+Fake Docker Engine API server, for load testing the orchestration layer without real containers.
+
+Serves the endpoints Container, DockerInDocker and the status caches use on a
+unix socket: ping and version, container create/start/stop/kill/restart/pause/
+wait/remove/inspect/list (with filters), exec, put_archive and the events
+stream. Containers only exist in memory and change state instantly, after the
+configured latency. Execs succeed without output, except cat, which reads
+the files put into the container. Requests can be made to fail at random to
+exercise the retry and error paths.
+
+A started container whose command is `--host=unix://<path>`, like a robot's
+DinD, gets its own fake engine on the host side of that socket, so per-robot
+clients, status caches and robot cards work as with real DinD daemons. Images
+are never pulled and docker compose isn't emulated.
+
+Typical usage, from a shell:
+    uv run python -m spiriSdk.docker.fake_engine --socket /tmp/fake-docker.sock --latency 0.01
+    DOCKER_HOST=unix:///tmp/fake-docker.sock DIND_SOCKET_DIR=/tmp/fake-dind-sockets \\
+        SDK_ROOT=/tmp/fake-sdk WARM_REGISTRY_PROXY=false uv run python -m spiriSdk.main
+
+Or in-process:
+    engine = FakeEngine("/tmp/fake-docker.sock", failure_rate=0.01)
+    await engine.start()
+"""
+
+import argparse, asyncio, io, json, random, re, secrets, signal, tarfile, time
+
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from aiohttp import web
+from loguru import logger
+
+API_VERSION = "1.45"
+
+# A placeholder CA for the registry proxy, in the PEM framing DockerRegistryProxy.load_cacert checks
+FAKE_CA = "-----BEGIN CERTIFICATE-----\nZmFrZSBlbmdpbmUgQ0E=\n-----END CERTIFICATE-----\n"
+
+_VERSION_PREFIX = re.compile(r"^/v[0-9.]+(?=/)")
+_DIND_HOST = re.compile(r"^--host=unix://(/.+)$")
+
+
+class _ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z", time.gmtime())
+
+
+@dataclass
+class FakeContainer:
+    """A container of the fake engine."""
+
+    id: str
+    name: str
+    config: Dict[str, Any]
+    ip: str
+    status: str = "created"
+    exit_code: int = 0
+    pid: int = 0
+    created: float = field(default_factory=time.time)
+    started_at: str = "0001-01-01T00:00:00Z"
+    finished_at: str = "0001-01-01T00:00:00Z"
+    # Paths and contents of the archives put into the container
+    files: Dict[str, bytes] = field(default_factory=dict)
+    stopped: asyncio.Event = field(default_factory=asyncio.Event)
+    inner: Optional["FakeEngine"] = None
+
+    @property
+    def image(self) -> str:
+        return self.config.get("Image", "")
+
+    @property
+    def host_config(self) -> Dict[str, Any]:
+        return self.config.get("HostConfig") or {}
+
+    def labels(self) -> Dict[str, str]:
+        return self.config.get("Labels") or {}
+
+    def host_path(self, path: str) -> Optional[Path]:
+        """Host path of a path inside the container, through the container's bind mounts."""
+        for bind in self.host_config.get("Binds") or []:
+            source, target = bind.split(":")[:2]
+            if path == target or path.startswith(target.rstrip("/") + "/"):
+                return Path(source) / path[len(target):].lstrip("/")
+        return None
+
+    def inspect(self) -> Dict[str, Any]:
+        return {
+            "Id": self.id,
+            "Name": f"/{self.name}",
+            "Created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.created)),
+            "Image": self.image,
+            "State": {
+                "Status": self.status,
+                "Running": self.status in ("running", "paused"),
+                "Paused": self.status == "paused",
+                "Restarting": False,
+                "OOMKilled": False,
+                "Dead": False,
+                "Pid": self.pid,
+                "ExitCode": self.exit_code,
+                "StartedAt": self.started_at,
+                "FinishedAt": self.finished_at,
+            },
+            "Config": {
+                "Image": self.image,
+                "Env": self.config.get("Env") or [],
+                "Cmd": self.config.get("Cmd"),
+                "Entrypoint": self.config.get("Entrypoint"),
+                "Labels": self.labels(),
+            },
+            "HostConfig": self.host_config,
+            "Mounts": [],
+            "NetworkSettings": {
+                "IPAddress": self.ip if self.status == "running" else "",
+                "Ports": {},
+                "Networks": {"bridge": {"IPAddress": self.ip if self.status == "running" else ""}},
+            },
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "Id": self.id,
+            "Names": [f"/{self.name}"],
+            "Image": self.image,
+            "Command": " ".join(self.config.get("Cmd") or []),
+            "Created": int(self.created),
+            "State": self.status,
+            "Status": "Up" if self.status == "running" else f"Exited ({self.exit_code})",
+            "Labels": self.labels(),
+        }
+
+
+class FakeEngine:
+    """Docker Engine API server keeping containers in memory.
+
+    Operations are named like containers.start, exec.create or events; see
+    the _ROUTES table for the full list.
+
+    Args:
+        socket_path: Unix socket to listen on
+        latency: Seconds every request takes before it is answered (default: 0)
+        jitter: Up to this many seconds are added to each request's latency at random (default: 0)
+        latencies: Latency per operation, overriding latency
+        failure_rate: Chance of a request failing with a 500 (default: 0)
+        failures: Failure chance per operation, overriding failure_rate
+        seed: Seed of the jitter and failure draws, for reproducible runs
+        dind_containers: Names of running containers every nested DinD engine starts with,
+            e.g. the compose containers of a robot's services
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        latencies: Optional[Mapping[str, float]] = None,
+        failure_rate: float = 0.0,
+        failures: Optional[Mapping[str, float]] = None,
+        seed: Optional[int] = None,
+        dind_containers: Sequence[str] = (),
+    ):
+        self.socket_path = Path(socket_path)
+        self.latency = latency
+        self.jitter = jitter
+        self.latencies = dict(latencies or {})
+        self.failure_rate = failure_rate
+        self.failures = dict(failures or {})
+        self.dind_containers = list(dind_containers)
+        self.containers: Dict[str, FakeContainer] = {}
+        self.requests: Dict[str, int] = {}
+        self._seed = seed
+        self._random = random.Random(seed)
+        self._execs: Dict[str, Dict[str, Any]] = {}
+        self._events: deque = deque(maxlen=10000)
+        self._subscribers: List[asyncio.Queue] = []
+        self._next_ip = 2
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        """Listen on the socket, replacing a stale socket file."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_route("*", "/{path:.*}", self._dispatch)
+        self._runner = web.AppRunner(app, handle_signals=False, access_log=None)
+        await self._runner.setup()
+        await web.UnixSite(self._runner, str(self.socket_path)).start()
+        self.socket_path.chmod(0o666)
+        logger.debug(f"Fake Docker engine listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        """Stop serving, along with every nested DinD engine."""
+        for container in self.containers.values():
+            if container.inner is not None:
+                await container.inner.stop()
+                container.inner = None
+        for queue in self._subscribers:
+            queue.put_nowait(None)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self.socket_path.unlink(missing_ok=True)
+
+    @property
+    def docker_host(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def add_container(self, name: str, image: str = "fake", status: str = "running", labels: Optional[Dict[str, str]] = None) -> FakeContainer:
+        """Create a container directly, without an event, e.g. to seed an engine."""
+        container = self._new_container(name, {"Image": image, "Labels": labels or {}})
+        container.status = status
+        if status == "running":
+            container.started_at = _now()
+        else:
+            container.stopped.set()
+        return container
+
+    # Request handling
+
+    async def _dispatch(self, request: web.Request) -> web.StreamResponse:
+        path = _VERSION_PREFIX.sub("", request.path)
+        for method, pattern, operation, handler in _ROUTES:
+            match = pattern.match(path)
+            if match is None or request.method not in method.split("|"):
+                continue
+            self.requests[operation] = self.requests.get(operation, 0) + 1
+            delay = self.latencies.get(operation, self.latency) + self._random.uniform(0, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self._random.random() < self.failures.get(operation, self.failure_rate):
+                return web.json_response({"message": f"injected failure in {operation}"}, status=500)
+            try:
+                return await handler(self, request, *match.groups())
+            except _ApiError as e:
+                return web.json_response({"message": str(e)}, status=e.status)
+        return web.json_response({"message": f"page not found: {request.method} {request.path}"}, status=404)
+
+    def _container(self, ref: str) -> FakeContainer:
+        container = self.containers.get(ref)
+        if container is None:
+            name = ref.lstrip("/")
+            matches = [c for c in self.containers.values() if c.name == name] or [
+                c for c in self.containers.values() if c.id.startswith(ref)
+            ]
+            if len(matches) != 1:
+                raise _ApiError(404, f"No such container: {ref}")
+            container = matches[0]
+        return container
+
+    def _new_container(self, name: str, config: Dict[str, Any]) -> FakeContainer:
+        if any(container.name == name for container in self.containers.values()):
+            raise _ApiError(409, f'Conflict. The container name "/{name}" is already in use')
+        ip = f"172.17.{self._next_ip // 254}.{self._next_ip % 254 + 1}"
+        self._next_ip += 1
+        container = FakeContainer(id=secrets.token_hex(32), name=name, config=config, ip=ip)
+        self.containers[container.id] = container
+        return container
+
+    def _emit(self, container: FakeContainer, action: str, **attributes) -> None:
+        now = time.time()
+        event = {
+            "Type": "container",
+            "Action": action,
+            "Actor": {"ID": container.id, "Attributes": {"name": container.name, "image": container.image, **container.labels(), **attributes}},
+            "status": action,
+            "id": container.id,
+            "from": container.image,
+            "scope": "local",
+            "time": int(now),
+            "timeNano": int(now * 1e9),
+        }
+        self._events.append(event)
+        for queue in self._subscribers:
+            queue.put_nowait(event)
+
+    async def _start(self, container: FakeContainer) -> None:
+        container.status = "running"
+        container.pid = self._random.randint(1000, 65000)
+        container.started_at = _now()
+        container.stopped.clear()
+        await self._run_image(container)
+        self._emit(container, "start")
+
+    async def _run_image(self, container: FakeContainer) -> None:
+        """What the container does as it starts: serve a nested engine, write the proxy CA."""
+        command = container.config.get("Cmd") or []
+        match = _DIND_HOST.match(command[0]) if command else None
+        socket_path = container.host_path(match.group(1)) if match else None
+        if socket_path is not None:
+            container.inner = FakeEngine(
+                socket_path,
+                latency=self.latency,
+                jitter=self.jitter,
+                latencies=self.latencies,
+                failure_rate=self.failure_rate,
+                failures=self.failures,
+                seed=None if self._seed is None else self._random.randrange(2 ** 32),
+            )
+            for name in self.dind_containers:
+                container.inner.add_container(name)
+            await container.inner.start()
+        if "docker-registry-proxy" in container.image:
+            ca_dir = container.host_path("/ca")
+            if ca_dir is not None and not (ca_dir / "ca.crt").exists():
+                ca_dir.mkdir(parents=True, exist_ok=True)
+                (ca_dir / "ca.crt").write_text(FAKE_CA)
+
+    async def _exit(self, container: FakeContainer, exit_code: int, action: Optional[str] = None) -> None:
+        if container.inner is not None:
+            await container.inner.stop()
+            container.inner = None
+        container.status = "exited"
+        container.exit_code = exit_code
+        container.pid = 0
+        container.finished_at = _now()
+        container.stopped.set()
+        self._emit(container, "die", exitCode=str(exit_code))
+        if action:
+            self._emit(container, action)
+        if container.host_config.get("AutoRemove"):
+            self._remove(container)
+
+    def _remove(self, container: FakeContainer) -> None:
+        if self.containers.pop(container.id, None) is not None:
+            self._emit(container, "destroy")
+
+    # Endpoints
+
+    async def _ping(self, request: web.Request) -> web.Response:
+        return web.Response(text="OK", headers={"Api-Version": API_VERSION})
+
+    async def _version(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "Version": "fake", "ApiVersion": API_VERSION, "MinAPIVersion": "1.24",
+            "Os": "linux", "Arch": "amd64", "KernelVersion": "fake",
+        })
+
+    async def _info(self, request: web.Request) -> web.Response:
+        running = sum(container.status == "running" for container in self.containers.values())
+        return web.json_response({
+            "ID": str(self.socket_path), "Name": "fake-engine", "ServerVersion": "fake",
+            "Containers": len(self.containers), "ContainersRunning": running,
+        })
+
+    async def _list(self, request: web.Request) -> web.Response:
+        show_all = request.query.get("all", "0").lower() in ("1", "true")
+        filters = _filters(request.query.get("filters"))
+        containers = [
+            container.summary() for container in self.containers.values()
+            if (show_all or container.status == "running") and _matches(container, filters)
+        ]
+        return web.json_response(containers)
+
+    async def _create(self, request: web.Request) -> web.Response:
+        config = await request.json()
+        name = request.query.get("name") or secrets.token_hex(6)
+        container = self._new_container(name.lstrip("/"), config)
+        self._emit(container, "create")
+        return web.json_response({"Id": container.id, "Warnings": []}, status=201)
+
+    async def _inspect(self, request: web.Request, ref: str) -> web.Response:
+        return web.json_response(self._container(ref).inspect())
+
+    async def _start_endpoint(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status in ("running", "paused"):
+            return web.Response(status=304)
+        await self._start(container)
+        return web.Response(status=204)
+
+    async def _stop(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status not in ("running", "paused"):
+            return web.Response(status=304)
+        self._emit(container, "kill", signal=str(int(signal.SIGTERM)))
+        await self._exit(container, 0, "stop")
+        return web.Response(status=204)
+
+    async def _kill(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status not in ("running", "paused"):
+            raise _ApiError(409, f"Container {ref} is not running")
+        name = request.query.get("signal", "SIGKILL")
+        number = int(name) if name.isdigit() else int(signal.Signals[name if name.startswith("SIG") else f"SIG{name}"])
+        self._emit(container, "kill", signal=str(number))
+        await self._exit(container, 128 + number)
+        return web.Response(status=204)
+
+    async def _restart(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status in ("running", "paused"):
+            await self._exit(container, 0, "stop")
+        await self._start(container)
+        self._emit(container, "restart")
+        return web.Response(status=204)
+
+    async def _pause(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status != "running":
+            raise _ApiError(409, f"Container {ref} is not running")
+        container.status = "paused"
+        self._emit(container, "pause")
+        return web.Response(status=204)
+
+    async def _unpause(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status != "paused":
+            raise _ApiError(409, f"Container {ref} is not paused")
+        container.status = "running"
+        self._emit(container, "unpause")
+        return web.Response(status=204)
+
+    async def _wait(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        await container.stopped.wait()
+        return web.json_response({"StatusCode": container.exit_code, "Error": None})
+
+    async def _delete(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status in ("running", "paused"):
+            if request.query.get("force", "0").lower() not in ("1", "true"):
+                raise _ApiError(409, f"You cannot remove a running container {container.id}. Stop the container before attempting removal or force remove")
+            self._emit(container, "kill", signal=str(int(signal.SIGKILL)))
+            container.config.setdefault("HostConfig", {})["AutoRemove"] = False
+            await self._exit(container, 137)
+        self._remove(container)
+        return web.Response(status=204)
+
+    async def _put_archive(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        data = await request.read()
+        base = request.query.get("path", "/")
+        try:
+            with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+                for member in archive.getmembers():
+                    if member.isfile():
+                        container.files[str(Path(base) / member.name)] = archive.extractfile(member).read()
+        except tarfile.TarError as e:
+            raise _ApiError(400, f"Invalid tar archive: {e}")
+        return web.Response(status=200)
+
+    async def _exec_create(self, request: web.Request, ref: str) -> web.Response:
+        container = self._container(ref)
+        if container.status != "running":
+            raise _ApiError(409, f"Container {container.id} is not running")
+        config = await request.json()
+        command = config.get("Cmd") or []
+        exec_id = secrets.token_hex(32)
+        self._execs[exec_id] = {
+            "ID": exec_id,
+            "ContainerID": container.id,
+            "Running": False,
+            "ExitCode": None,
+            "Pid": 0,
+            "OpenStdin": bool(config.get("AttachStdin")),
+            "OpenStdout": bool(config.get("AttachStdout")),
+            "OpenStderr": bool(config.get("AttachStderr")),
+            "ProcessConfig": {
+                "entrypoint": command[0] if command else "",
+                "arguments": command[1:],
+                "tty": bool(config.get("Tty")),
+                "privileged": bool(config.get("Privileged")),
+                "user": config.get("User", ""),
+            },
+        }
+        return web.json_response({"Id": exec_id}, status=201)
+
+    async def _exec_start(self, request: web.Request, exec_id: str) -> web.StreamResponse:
+        exec_ = self._execs.get(exec_id)
+        if exec_ is None:
+            raise _ApiError(404, f"No such exec instance: {exec_id}")
+        exec_["Pid"] = self._random.randint(1000, 65000)
+        container = self.containers.get(exec_["ContainerID"])
+        process = exec_["ProcessConfig"]
+        exit_code, stdout, stderr = _run_command(container, [process["entrypoint"], *process["arguments"]])
+        exec_["ExitCode"] = exit_code
+        body = await request.json() if request.can_read_body else {}
+        if body.get("Detach"):
+            return web.Response(status=200)
+
+        response = web.StreamResponse(status=101, headers={
+            "Content-Type": "application/vnd.docker.raw-stream", "Connection": "Upgrade", "Upgrade": "tcp",
+        })
+        response.force_close()
+        await response.prepare(request)
+        if not (stdout or stderr):
+            return response
+        # docker-py reads the upgraded stream from the raw socket, output sent along with
+        # the headers would be lost in its buffered reader, real commands take longer anyway
+        await asyncio.sleep(0.05)
+        if process["tty"]:
+            await response.write(stdout + stderr)
+        else:
+            # Multiplexed stream frames: stream type, three zero bytes, big-endian payload size
+            for stream, data in ((1, stdout), (2, stderr)):
+                if data:
+                    await response.write(bytes([stream, 0, 0, 0]) + len(data).to_bytes(4, "big") + data)
+        return response
+
+    async def _exec_inspect(self, request: web.Request, exec_id: str) -> web.Response:
+        exec_ = self._execs.get(exec_id)
+        if exec_ is None:
+            raise _ApiError(404, f"No such exec instance: {exec_id}")
+        return web.json_response(exec_)
+
+    async def _pull(self, request: web.Request) -> web.Response:
+        image = request.query.get("fromImage", "")
+        tag = request.query.get("tag", "latest")
+        return web.Response(
+            text=json.dumps({"status": f"Status: Image is up to date for {image}:{tag}"}) + "\n",
+            content_type="application/json",
+        )
+
+    async def _image_inspect(self, request: web.Request, image: str) -> web.Response:
+        return web.json_response({"Id": f"sha256:{secrets.token_hex(32)}", "RepoTags": [image]})
+
+    async def _events(self, request: web.Request) -> web.StreamResponse:
+        filters = _filters(request.query.get("filters"))
+        since = float(request.query["since"]) if request.query.get("since") else None
+        until = float(request.query["until"]) if request.query.get("until") else None
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        await response.prepare(request)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        try:
+            if since is not None:
+                for event in list(self._events):
+                    at = event["timeNano"] / 1e9
+                    if at >= since and (until is None or at <= until) and _event_matches(event, filters):
+                        await response.write(json.dumps(event).encode() + b"\n")
+            while True:
+                timeout = None if until is None else until - time.time()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if event is None:
+                    break
+                if _event_matches(event, filters):
+                    await response.write(json.dumps(event).encode() + b"\n")
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._subscribers.remove(queue)
+        return response
+
+
+def _run_command(container: Optional[FakeContainer], command: List[str]) -> Tuple[int, bytes, bytes]:
+    """Exit code, stdout and stderr of an exec. Only cat is emulated, from the archives put into the container."""
+    if container is None or not command or command[0] != "cat":
+        return 0, b"", b""
+    stdout, stderr = b"", b""
+    for path in command[1:]:
+        if path in container.files:
+            stdout += container.files[path]
+        else:
+            stderr += f"cat: can't open '{path}': No such file or directory\n".encode()
+    return (1 if stderr else 0), stdout, stderr
+
+
+def _filters(raw: Optional[str]) -> Dict[str, List[str]]:
+    """Decode a filters query argument, in either the list or the legacy map form."""
+    if not raw:
+        return {}
+    return {key: list(values) if isinstance(values, list) else [value for value, on in values.items() if on] for key, values in json.loads(raw).items()}
+
+
+def _matches(container: FakeContainer, filters: Dict[str, List[str]]) -> bool:
+    for key, values in filters.items():
+        if key == "name" and not any(re.search(value, name) for value in values for name in (container.name, f"/{container.name}")):
+            return False
+        if key == "id" and not any(container.id.startswith(value) for value in values):
+            return False
+        if key == "status" and container.status not in values:
+            return False
+        if key == "label":
+            labels = container.labels()
+            for value in values:
+                label, _, expected = value.partition("=")
+                if label not in labels or (expected and labels[label] != expected):
+                    return False
+    return True
+
+
+def _event_matches(event: Dict[str, Any], filters: Dict[str, List[str]]) -> bool:
+    for key, values in filters.items():
+        if key == "type" and event["Type"] not in values:
+            return False
+        if key == "event" and event["Action"] not in values:
+            return False
+        if key == "container":
+            actor = event["Actor"]
+            if not any(actor["ID"].startswith(value) or actor["Attributes"].get("name") == value.lstrip("/") for value in values):
+                return False
+    return True
+
+
+_CONTAINER = r"/containers/([^/]+)"
+_ROUTES = [
+    (method, re.compile(f"^{pattern}$"), operation, handler)
+    for method, pattern, operation, handler in (
+        ("GET|HEAD", r"/_ping", "ping", FakeEngine._ping),
+        ("GET", r"/version", "version", FakeEngine._version),
+        ("GET", r"/info", "info", FakeEngine._info),
+        ("GET", r"/events", "events", FakeEngine._events),
+        ("GET", r"/containers/json", "containers.list", FakeEngine._list),
+        ("POST", r"/containers/create", "containers.create", FakeEngine._create),
+        ("GET", f"{_CONTAINER}/json", "containers.inspect", FakeEngine._inspect),
+        ("POST", f"{_CONTAINER}/start", "containers.start", FakeEngine._start_endpoint),
+        ("POST", f"{_CONTAINER}/stop", "containers.stop", FakeEngine._stop),
+        ("POST", f"{_CONTAINER}/kill", "containers.kill", FakeEngine._kill),
+        ("POST", f"{_CONTAINER}/restart", "containers.restart", FakeEngine._restart),
+        ("POST", f"{_CONTAINER}/pause", "containers.pause", FakeEngine._pause),
+        ("POST", f"{_CONTAINER}/unpause", "containers.unpause", FakeEngine._unpause),
+        ("POST", f"{_CONTAINER}/wait", "containers.wait", FakeEngine._wait),
+        ("DELETE", _CONTAINER, "containers.remove", FakeEngine._delete),
+        ("PUT", f"{_CONTAINER}/archive", "containers.archive", FakeEngine._put_archive),
+        ("POST", f"{_CONTAINER}/exec", "exec.create", FakeEngine._exec_create),
+        ("POST", r"/exec/([^/]+)/start", "exec.start", FakeEngine._exec_start),
+        ("GET", r"/exec/([^/]+)/json", "exec.inspect", FakeEngine._exec_inspect),
+        ("POST", r"/images/create", "images.create", FakeEngine._pull),
+        ("GET", r"/images/(.+)/json", "images.inspect", FakeEngine._image_inspect),
+    )
+]
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    engine = FakeEngine(
+        Path(args.socket),
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+        dind_containers=[name for name in args.dind_containers.split(",") if name],
+    )
+    await engine.start()
+    logger.info(f"Fake Docker engine ready, use DOCKER_HOST={engine.docker_host}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await engine.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m spiriSdk.docker.fake_engine", description="Serve a fake Docker Engine API.")
+    parser.add_argument("--socket", default="/tmp/fake-docker.sock", help="Unix socket to listen on (default: /tmp/fake-docker.sock)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds every request takes (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency, up to this many seconds (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Chance of a request failing with a 500 (default: 0)")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible jitter and failures")
+    parser.add_argument("--dind-containers", default="", help="Comma separated containers every DinD engine starts with")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,224 @@
+"""
+Golden DinD image stores and copy-on-write cloning of /var/lib/docker for new robots.
+
+A golden store is a /var/lib/docker prepared once per robot type with every image
+its services reference already pulled. New robots start from a clone of it, so
+their services come up without pulling and unpacking images again.
+"""
+
+import docker, shutil, subprocess
+
+from pathlib import Path
+from typing import Optional
+from loguru import logger
+
+from spiriSdk.settings import SDK_ROOT
+from spiriSdk.utils.service_catalog import service_catalog
+
+DIND_CACHE_ROOT = SDK_ROOT / "cache" / "dind-cache"
+GOLDEN_ROOT = SDK_ROOT / "cache" / "dind-golden"
+
+# Container, network and mount state of the daemon that used a store, left out of clones
+DAEMON_STATE = ("containers", "network", "image/*/layerdb/mounts")
+
+
+def robot_type_of(robot_name: str) -> str:
+    """Get the robot type from a robot name such as spiri_mu_3."""
+    return "_".join(robot_name.split("_")[:-1])
+
+
+def robot_store_path(robot_name: str) -> Path:
+    """Host path of a robot's /var/lib/docker."""
+    return DIND_CACHE_ROOT / robot_name / "docker"
+
+
+def golden_store_path(robot_type: str) -> Path:
+    """Host path of the golden /var/lib/docker for a robot type."""
+    return GOLDEN_ROOT / robot_type / "docker"
+
+
+def golden_store_ready(robot_type: str) -> bool:
+    """Whether a complete golden store exists for a robot type."""
+    return (GOLDEN_ROOT / robot_type / "ready").exists()
+
+
+def store_is_empty(store: Path) -> bool:
+    """Whether an image store has never been used by a Docker daemon.
+
+    dockerd makes the stores it uses root-only, so a store the SDK can't list
+    counts as used.
+    """
+    try:
+        return not any(store.iterdir())
+    except FileNotFoundError:
+        return True
+    except PermissionError:
+        return False
+
+
+def clone_store(source: Path, target: Path) -> str:
+    """Clone an image store, sharing data blocks with the source where possible.
+
+    Reflinks are used on filesystems that support them (btrfs, xfs, zfs, bcachefs),
+    otherwise the files are copied. Hardlinks are never used, since the Docker
+    daemon rewrites its metadata databases and container layers in place, which
+    would leak into the source. Files written by the daemon are owned by root, so
+    if the SDK can't read them the copy is done from a throwaway container instead.
+
+    Only the images are kept: the source's containers and networks (DAEMON_STATE)
+    are left out, so a clone of a robot's store doesn't start the source's
+    restart: always containers, with the source's config, before compose
+    recreates them. Their writable layers stay behind as unused data.
+
+    Args:
+        source: Image store to clone, must not be in use by a running daemon
+        target: Empty or missing directory to clone into
+
+    Returns:
+        str: The method used, 'reflink', 'copy' or 'container copy'
+
+    Raises:
+        RuntimeError: If the store can't be cloned
+    """
+    if not store_is_empty(target):
+        raise RuntimeError(f"Refusing to clone into non-empty image store {target}")
+    target.parent.mkdir(parents=True, exist_ok=True)
+    staging = target.with_name(f"{target.name}.clone")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    method: Optional[str] = None
+    for candidate, reflink in (("reflink", "always"), ("copy", "auto")):
+        result = subprocess.run(
+            ["cp", "-a", f"--reflink={reflink}", str(source), str(staging)],
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode == 0:
+            method = candidate
+            break
+        logger.debug(f"Cloning {source} with {candidate} failed: {result.stderr.strip()}")
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Every daemon should identify itself with its own engine ID, and start without the source's containers
+    state = " ".join(f"/staging/{staging.name}/{path}" for path in ("engine-id", *DAEMON_STATE))
+    if method is None:
+        method = "container copy"
+        try:
+            # The copy is owned by root, so the daemon state is removed from inside the container too
+            docker.from_env().containers.run(
+                "docker:dind",
+                entrypoint=["sh", "-c", f"cp -a /source /staging/{staging.name} && rm -rf {state}"],
+                volumes={
+                    str(source): {"bind": "/source", "mode": "ro"},
+                    str(staging.parent): {"bind": "/staging", "mode": "rw"},
+                },
+                remove=True,
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to clone image store {source}: {str(e)}")
+    else:
+        (staging / "engine-id").unlink(missing_ok=True)
+        for pattern in DAEMON_STATE:
+            for path in staging.glob(pattern):
+                shutil.rmtree(path)
+
+    if target.exists():
+        target.rmdir()
+    staging.rename(target)
+    logger.info(f"Cloned image store {source} to {target} ({method})")
+    return method
+
+
+def remove_store(store: Path) -> None:
+    """Delete an image store, from a throwaway container if it holds files the SDK can't remove.
+
+    Raises:
+        RuntimeError: If the store can't be removed
+    """
+    shutil.rmtree(store, ignore_errors=True)
+    if not store.exists():
+        return
+    try:
+        docker.from_env().containers.run(
+            "docker:dind",
+            entrypoint=["rm", "-rf", f"/stores/{store.name}"],
+            volumes={str(store.parent): {"bind": "/stores", "mode": "rw"}},
+            remove=True,
+        )
+    except Exception as e:
+        raise RuntimeError(f"Failed to remove image store {store}: {str(e)}")
+
+
+def seed_store(robot_name: str, store: Path) -> bool:
+    """Clone the golden store for a robot's type into its image store if it is still empty.
+
+    Args:
+        robot_name: Name of the robot, e.g. spiri_mu_3
+        store: The robot's /var/lib/docker on the host
+
+    Returns:
+        bool: True if the store was seeded from a golden store
+    """
+    robot_type = robot_type_of(robot_name)
+    if not store_is_empty(store) or not golden_store_ready(robot_type):
+        return False
+    try:
+        clone_store(golden_store_path(robot_type), store)
+        return True
+    except (RuntimeError, OSError) as e:
+        logger.warning(f"Starting {robot_name} without a golden image store: {e}")
+        return False
+
+
+def prepare_golden_store(robot_type: str) -> Path:
+    """Build the golden image store for a robot type by pulling all of its service images.
+
+    The store is filled by a temporary DinD daemon that is stopped before the
+    store is marked ready, so clones are always taken from a consistent store.
+
+    Args:
+        robot_type: Robot type folder name under SDK_ROOT/robots
+
+    Returns:
+        Path: The golden store
+
+    Raises:
+        RuntimeError: If the images can't be pulled
+    """
+    from spiriSdk.docker.dindocker import DockerInDocker
+
+    golden_root = GOLDEN_ROOT / robot_type
+    (golden_root / "ready").unlink(missing_ok=True)
+    builder = DockerInDocker(
+        container_name=f"golden_{robot_type}",
+        robot_data_root=golden_root / "data",
+        docker_store=golden_store_path(robot_type),
+    )
+    logger.info(f"Preparing golden image store for {robot_type}...")
+    try:
+        builder.ensure_started()
+        for service in service_catalog.services(robot_type):
+            inside_path = f"/robots/{robot_type}/services/{service.name}"
+            result = builder.container.exec_run(
+                ["docker", "compose", "--env-file=/data/config.env", "-f", f"{inside_path}/{service.compose_path.name}", "pull"],
+                workdir=inside_path,
+            )
+            if result.exit_code != 0:
+                raise RuntimeError(f"Pulling images for {service.compose_path} failed: {result.output.decode()}")
+    finally:
+        builder.cleanup()
+
+    (golden_root / "ready").touch()
+    logger.success(f"Golden image store for {robot_type} ready")
+    return golden_store_path(robot_type)
+
+
+def ensure_golden_stores() -> None:
+    """Prepare a golden image store for every robot type that doesn't have one yet."""
+    for robot_type in service_catalog.robot_types():
+        if not service_catalog.services(robot_type) or golden_store_ready(robot_type):
+            continue
+        try:
+            prepare_golden_store(robot_type)
+        except Exception as e:
+            logger.error(f"Failed to prepare golden image store for {robot_type}: {e}")
@@ -0,0 +1,329 @@
+"""
+Warm the registry proxy cache with every image referenced by the robot compose files.
+
+The proxy only caches what passes through it, so the first robot to pull an image
+pays for the upstream download and robots starting together race for the same
+layers. Fetching the manifests and blobs through the proxy once, in the background
+as the SDK starts, means DinDs mostly pull from a warm cache. Blobs the proxy
+already has are only checked with a HEAD request, so restarts download nothing.
+
+Robots started while the warm-up runs wait for it (see wait_for_warmup) before
+pulling, so each layer is fetched from upstream once.
+
+Typical usage:
+    report = warm_registry_proxy()
+    logger.info(report)
+"""
+
+import asyncio, os, platform, re, threading, time, requests
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+from nicegui import run
+
+from spiriSdk.settings import SDK_ROOT
+from spiriSdk.utils.service_catalog import ServiceCatalog, service_catalog
+
+DOCKER_HUB = "registry-1.docker.io"
+MANIFEST_TYPES = ", ".join([
+    "application/vnd.oci.image.index.v1+json",
+    "application/vnd.docker.distribution.manifest.list.v2+json",
+    "application/vnd.oci.image.manifest.v1+json",
+    "application/vnd.docker.distribution.manifest.v2+json",
+])
+# Set by the proxy's nginx on every response it serves
+CACHE_STATUS_HEADER = "X-Docker-Registry-Proxy-Cache-Upstream-Status"
+
+# Seconds a robot waits for the warm-up before pulling on its own
+WARMUP_WAIT_TIMEOUT = 300.0
+
+_ARCHITECTURES = {"x86_64": "amd64", "amd64": "amd64", "aarch64": "arm64", "arm64": "arm64", "armv7l": "arm"}
+
+
+def compose_images(robots_dir: Path = SDK_ROOT / "robots") -> Set[str]:
+    """Collect the images referenced by robots/*/services/*/docker-compose.y(a)ml.
+
+    Images with variables that can't be resolved from the environment are skipped.
+    """
+    catalog = service_catalog if robots_dir == service_catalog.robots_dir else ServiceCatalog(robots_dir)
+    images = set()
+    for image in catalog.images():
+        resolved = os.path.expandvars(image)
+        if "$" in resolved:
+            logger.debug(f"Not warming {image}, it depends on unset variables")
+            continue
+        images.add(resolved)
+    return images
+
+
+def parse_image_reference(image: str) -> Tuple[str, str, str]:
+    """Split an image reference into registry, repository and tag or digest.
+
+    Args:
+        image: Reference such as ghcr.io/spiri-robotics/ardupilot:spiri-master or alpine
+
+    Returns:
+        Tuple[str, str, str]: Registry host, repository path and reference
+    """
+    name, reference = image, "latest"
+    if "@" in name:
+        name, reference = name.split("@", 1)
+    elif ":" in name.rsplit("/", 1)[-1]:
+        name, reference = name.rsplit(":", 1)
+
+    first, _, rest = name.partition("/")
+    if rest and ("." in first or ":" in first or first == "localhost"):
+        registry, repository = first, rest
+    else:
+        registry, repository = DOCKER_HUB, name
+    if registry in ("docker.io", "index.docker.io"):
+        registry = DOCKER_HUB
+    if registry == DOCKER_HUB and "/" not in repository:
+        repository = f"library/{repository}"
+    return registry, repository, reference
+
+
+@dataclass
+class WarmupReport:
+    """Outcome of a warm-up run."""
+
+    images: int = 0
+    manifests: int = 0
+    blobs: int = 0
+    hits: int = 0
+    misses: int = 0
+    bytes_fetched: int = 0
+    failed: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Fraction of manifests and blobs that were already in the proxy cache."""
+        served = self.hits + self.misses
+        return self.hits / served if served else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"Warmed {self.images} images ({self.manifests} manifests, {self.blobs} blobs, "
+            f"{self.bytes_fetched / 1e6:.1f}MB) in {self.elapsed:.1f}s, "
+            f"cache hit ratio {self.hit_ratio:.0%}, {len(self.failed)} failed"
+        )
+
+
+class RegistryWarmup:
+    """Fetches manifests and blobs through the registry proxy so it caches them.
+
+    Layers shared between images are fetched once. Anonymous bearer tokens are
+    requested as registries ask for them, credentials for private registries are
+    added by the proxy itself (AUTH_REGISTRIES).
+
+    Args:
+        proxy_url: HTTP URL of the proxy, e.g. http://172.17.0.2:3128
+        ca_bundle: Trust bundle that includes the proxy's CA
+        max_workers: Number of parallel downloads (default: 8)
+    """
+
+    def __init__(self, proxy_url: str, ca_bundle: Path, max_workers: int = 8):
+        self.proxy_url = proxy_url
+        self.ca_bundle = ca_bundle
+        self.max_workers = max_workers
+        self.report = WarmupReport()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tokens: Dict[Tuple[str, str], str] = {}
+        self._seen: Set[str] = set()
+        self._os = "linux"
+        self._architecture = _ARCHITECTURES.get(platform.machine(), "amd64")
+
+    @property
+    def session(self) -> requests.Session:
+        """Session of the calling worker thread, routed through the proxy."""
+        if not hasattr(self._local, "session"):
+            session = requests.Session()
+            session.proxies = {"http": self.proxy_url, "https": self.proxy_url}
+            session.verify = str(self.ca_bundle)
+            self._local.session = session
+        return self._local.session
+
+    def run(self, images: Iterable[str]) -> WarmupReport:
+        """Warm the cache with the given images.
+
+        Returns:
+            WarmupReport: Counts, cache hit ratio and images that failed
+        """
+        started = time.monotonic()
+        images = sorted(set(images))
+        self.report.images = len(images)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            blob_lists = list(pool.map(self._resolve, images))
+            blobs = [blob for blob_list in blob_lists for blob in blob_list]
+            list(pool.map(lambda blob: self._fetch_blob(*blob), blobs))
+        self.report.elapsed = time.monotonic() - started
+        return self.report
+
+    def _resolve(self, image: str) -> List[Tuple[str, str, str]]:
+        """Fetch an image's manifests and return the blobs it references that weren't seen yet."""
+        registry, repository, reference = parse_image_reference(image)
+        try:
+            manifest = self._fetch_manifest(registry, repository, reference)
+            if "manifests" in manifest:
+                platform_manifest = self._pick_platform(manifest["manifests"])
+                if platform_manifest is None:
+                    raise RuntimeError(f"no {self._os}/{self._architecture} manifest")
+                manifest = self._fetch_manifest(registry, repository, platform_manifest["digest"])
+        except Exception as e:
+            logger.warning(f"Failed to warm {image}: {e}")
+            with self._lock:
+                self.report.failed.append(image)
+            return []
+
+        blobs = []
+        for descriptor in [manifest.get("config"), *manifest.get("layers", [])]:
+            if not descriptor:
+                continue
+            with self._lock:
+                if descriptor["digest"] in self._seen:
+                    continue
+                self._seen.add(descriptor["digest"])
+            blobs.append((registry, repository, descriptor["digest"]))
+        return blobs
+
+    def _pick_platform(self, manifests: List[dict]) -> Optional[dict]:
+        for entry in manifests:
+            target = entry.get("platform", {})
+            if target.get("os") == self._os and target.get("architecture") == self._architecture:
+                return entry
+        return None
+
+    def _fetch_manifest(self, registry: str, repository: str, reference: str) -> dict:
+        response = self._get(registry, repository, f"manifests/{reference}", headers={"Accept": MANIFEST_TYPES})
+        with self._lock:
+            self.report.manifests += 1
+        return response.json()
+
+    def _fetch_blob(self, registry: str, repository: str, digest: str) -> None:
+        """Fetch a blob through the proxy, unless a HEAD request shows the proxy already has it."""
+        try:
+            with self._request("HEAD", registry, repository, f"blobs/{digest}", count=False) as response:
+                cached = response.headers.get(CACHE_STATUS_HEADER, "").upper() == "HIT"
+            if cached:
+                self._count_cache_status(response)
+                size = 0
+            else:
+                with self._get(registry, repository, f"blobs/{digest}", stream=True) as response:
+                    size = sum(len(chunk) for chunk in response.iter_content(chunk_size=1 << 20))
+        except Exception as e:
+            logger.warning(f"Failed to warm blob {digest} of {registry}/{repository}: {e}")
+            with self._lock:
+                self.report.failed.append(f"{registry}/{repository}@{digest}")
+            return
+        with self._lock:
+            self.report.blobs += 1
+            self.report.bytes_fetched += size
+
+    def _get(self, registry: str, repository: str, path: str, **kwargs) -> requests.Response:
+        """GET a registry API path through the proxy, see _request."""
+        return self._request("GET", registry, repository, path, **kwargs)
+
+    def _request(self, method: str, registry: str, repository: str, path: str, count: bool = True, **kwargs) -> requests.Response:
+        """Request a registry API path through the proxy, authenticating once if the registry asks to.
+
+        Args:
+            count: Whether the response counts towards the report's cache hits and misses (default: True)
+        """
+        url = f"https://{registry}/v2/{repository}/{path}"
+        headers = dict(kwargs.pop("headers", {}))
+        token = self._tokens.get((registry, repository))
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        response = self.session.request(method, url, headers=headers, timeout=60, **kwargs)
+        if response.status_code == 401 and "Bearer" in response.headers.get("WWW-Authenticate", ""):
+            response.close()
+            headers["Authorization"] = f"Bearer {self._authenticate(registry, repository, response)}"
+            response = self.session.request(method, url, headers=headers, timeout=60, **kwargs)
+        response.raise_for_status()
+        if count:
+            self._count_cache_status(response)
+        return response
+
+    def _authenticate(self, registry: str, repository: str, challenge: requests.Response) -> str:
+        """Get an anonymous pull token for a repository from the realm in a 401 challenge."""
+        params = dict(re.findall(r'(\w+)="([^"]*)"', challenge.headers["WWW-Authenticate"]))
+        realm = params.pop("realm")
+        params.setdefault("scope", f"repository:{repository}:pull")
+        response = self.session.get(realm, params=params, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        token = body.get("token") or body.get("access_token")
+        self._tokens[(registry, repository)] = token
+        return token
+
+    def _count_cache_status(self, response: requests.Response) -> None:
+        status = response.headers.get(CACHE_STATUS_HEADER, "").upper()
+        with self._lock:
+            if status == "HIT":
+                self.report.hits += 1
+            elif status:
+                self.report.misses += 1
+
+
+def warm_registry_proxy(proxy=None, images: Optional[Iterable[str]] = None, max_workers: int = 8) -> WarmupReport:
+    """Start the registry proxy if needed and warm it with the robots' images.
+
+    Args:
+        proxy: DockerRegistryProxy to warm (default: the SDK's shared proxy)
+        images: Images to fetch (default: every image in the robot compose files)
+        max_workers: Number of parallel downloads (default: 8)
+
+    Returns:
+        WarmupReport: Counts, cache hit ratio and images that failed
+    """
+    from spiriSdk.docker.dindocker import DEFAULT_REGISTRY_PROXY
+
+    proxy = proxy or DEFAULT_REGISTRY_PROXY
+    proxy.ensure_started()
+    proxy.trust_files()
+    ca_bundle = proxy.trust_dir / "ca-certificates.crt"
+    images = compose_images() if images is None else images
+
+    warmup = RegistryWarmup(f"http://{proxy.get_ip()}:3128", ca_bundle, max_workers=max_workers)
+    report = warmup.run(images)
+    logger.info(str(report))
+    return report
+
+
+# Warm-up started with start_warmup, if any
+_warmup: Optional[asyncio.Task] = None
+
+
+def start_warmup() -> asyncio.Task:
+    """Warm the registry proxy in the background of the running event loop."""
+    global _warmup
+    _warmup = asyncio.get_running_loop().create_task(_warm())
+    return _warmup
+
+
+async def _warm() -> None:
+    try:
+        await run.io_bound(warm_registry_proxy)
+    except Exception as e:
+        logger.warning(f"Registry proxy warm-up failed, robots will pull from upstream: {e}")
+
+
+def warmup_pending() -> bool:
+    """Whether a warm-up started with start_warmup is still running."""
+    return _warmup is not None and not _warmup.done()
+
+
+async def wait_for_warmup(timeout: float = WARMUP_WAIT_TIMEOUT) -> None:
+    """Wait for a running warm-up to finish, at most timeout seconds. Returns at once if none is running."""
+    if not warmup_pending():
+        return
+    try:
+        # Shielded, a robot giving up doesn't cancel the warm-up for the others
+        await asyncio.wait_for(asyncio.shield(_warmup), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Registry proxy warm-up still running after {timeout}s, pulling anyway")
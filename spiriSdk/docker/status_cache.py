@@ -0,0 +1,169 @@
+"""
+Container status caches kept up to date by Docker event streams.
+
+Each cache lists a daemon's containers once, then follows its event stream, so
+reading a status never costs a Docker round-trip. If the stream drops (e.g. the
+DinD was stopped) the cache is marked not ready and re-seeded once the daemon
+is reachable again.
+
+Typical usage:
+    states = daemon_states("spiri_mu_1", dind.docker_host)
+    if states.ready:
+        counts = states.counts()
+"""
+
+import aiodocker, asyncio, json, time
+
+from typing import Dict, Optional
+from loguru import logger
+
+# Container states shown on the robot cards
+STATES = ("running", "restarting", "exited", "created", "paused", "dead")
+
+# Event action → resulting container state, actions not listed don't change the state
+_ACTION_STATES = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+}
+
+
+class ContainerStates:
+    """Statuses of the containers on one Docker daemon, keyed by container name.
+
+    The engine doesn't emit an event when a container enters the restarting
+    state, so containers being restarted by their restart policy show as exited
+    until they are running again.
+
+    Args:
+        url: Docker daemon URL, or None for the SDK's own daemon
+        name_prefix: Only track containers whose name starts with this
+    """
+
+    def __init__(self, url: Optional[str] = None, name_prefix: str = ""):
+        self.url = url
+        self.name_prefix = name_prefix
+        self.ready = False
+        self._states: Dict[str, str] = {}
+        self._names: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+        # A client of its own, the shared ones are used by in-flight calls when the stream is reset
+        self._client: Optional[aiodocker.Docker] = None
+
+    def start(self) -> None:
+        """Start following the daemon from the running event loop, if not already."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop following the daemon."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_client()
+        self.ready = False
+
+    def status(self, name: str) -> Optional[str]:
+        """Status of a container, or None if it doesn't exist."""
+        return self._states.get(name)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of containers in each state."""
+        counts = dict.fromkeys(STATES, 0)
+        for state in self._states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    async def _run(self) -> None:
+        delay = 0.5
+        while True:
+            try:
+                await self._follow()
+                delay = 0.5
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug(f"Lost event stream of {self.url or 'the host daemon'}: {e}")
+            self.ready = False
+            # A client's event runner doesn't restart once its stream has ended
+            await self._close_client()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+    async def _close_client(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    async def _follow(self) -> None:
+        if self._client is None:
+            self._client = aiodocker.Docker(url=self.url)
+        client = self._client
+        # The stream only connects once the listing is under way, so it replays
+        # everything since just before the listing: events are applied in order,
+        # and replaying ones the listing already reflects is harmless
+        since = f"{time.time() - 1:.3f}"
+        events = client.events.subscribe(since=since, filters=json.dumps({"type": ["container"]}))
+        try:
+            containers = await client.containers.list(all=True)
+            self._states.clear()
+            self._names.clear()
+            for container in containers:
+                name = container["Names"][0].lstrip("/")
+                if name.startswith(self.name_prefix):
+                    self._names[container.id] = name
+                    self._states[name] = container["State"]
+            self.ready = True
+
+            while (event := await events.get()) is not None:
+                self._apply(event)
+        finally:
+            del events
+
+    def _apply(self, event: dict) -> None:
+        actor = event.get("Actor", {})
+        container_id = actor.get("ID") or event.get("id")
+        name = actor.get("Attributes", {}).get("name") or self._names.get(container_id)
+        if not name or not name.startswith(self.name_prefix):
+            return
+
+        # e.g. "exec_start: sh" or "health_status: healthy"
+        action = event.get("Action", "").split(":", 1)[0]
+        if action == "destroy":
+            self._names.pop(container_id, None)
+            self._states.pop(name, None)
+        elif action == "rename":
+            old_name = actor.get("Attributes", {}).get("oldName", "").lstrip("/")
+            self._states[name] = self._states.pop(old_name, "created")
+            self._names[container_id] = name
+        elif action in _ACTION_STATES:
+            self._names[container_id] = name
+            self._states[name] = _ACTION_STATES[action]
+
+
+host_states = ContainerStates(name_prefix="spirisdk_")
+_daemon_states: Dict[str, ContainerStates] = {}
+
+
+def daemon_states(robot_name: str, docker_host: str) -> ContainerStates:
+    """Status cache of the containers inside a robot's DinD, started on first use."""
+    states = _daemon_states.get(robot_name)
+    if states is None:
+        states = _daemon_states[robot_name] = ContainerStates(docker_host)
+    states.start()
+    return states
+
+
+async def forget_daemon(robot_name: str) -> None:
+    """Stop following a robot's DinD, e.g. once the robot is deleted."""
+    states = _daemon_states.pop(robot_name, None)
+    if states is not None:
+        await states.stop()
@@ -1,10 +1,14 @@
 import os, asyncio
 
-from nicegui import app, ui
+from nicegui import app, ui, run
 from pathlib import Path
 from blinker import signal
+from loguru import logger
 
+from spiriSdk.docker.image_store import ensure_golden_stores
+from spiriSdk.docker.registry_warmup import start_warmup
 from spiriSdk.pages import home, settings
+from spiriSdk.settings import WARM_REGISTRY_PROXY
 from spiriSdk.utils.daemon_utils import init_daemons
 from spiriSdk.utils.new_robot_utils import ensure_options_yaml
 from spiriSdk.utils.signals import update_cards
@@ -15,9 +19,14 @@ favicon = """
 async def on_startup():
     ensure_options_yaml()
     asyncio.create_task(polling_loop())
+    if WARM_REGISTRY_PROXY:
+        # In the background, only robots that pull wait for it, adopted ones come up at once
+        start_warmup()
     await init_daemons()
+    # Later robots of each type start from a clone of a pre-pulled image store
+    await run.io_bound(ensure_golden_stores)
     
-    
+
 async def polling_loop():
     while True:
         await update_cards.send_async('polling_loop', visible=True)
@@ -6,7 +6,7 @@ from pathlib import Path
 from spiriSdk.pages.sidebar import sidebar
 from spiriSdk.pages.tools import tools
 from spiriSdk.ui.styles import styles
-from spiriSdk.utils.card_utils import addRobot, displayCards
+from spiriSdk.utils.card_utils import addRobot, add_all_to_world, displayCards, stop_all
 
 ENV_FILE_PATH = Path('.env')
 
@@ -28,6 +28,8 @@ async def home():
         ui.markdown('## Dashboard').classes('pb-2')
         ui.space()
         ui.button('Add Robot', on_click=addRobot, color='secondary')
+        ui.button('Add All to GZ Sim', on_click=add_all_to_world, color='secondary')
+        ui.button('Stop All Robots', on_click=stop_all, color='negative')
         await tools()
     
     ui.separator()
@@ -31,6 +31,7 @@ async def tools():
         w = ui.select(WORLD_NAMES, label='Select World*').classes('text-base w-full')
         select_check.add(w, False)
         w.on_value_change(lambda e, ch=select_check: ch.checkSelect(e.sender))
+        ui.switch('Headless (no GUI)').bind_value(gz_world, 'headless')
         ui.space()
         
         async def start_and_close(): 
@@ -21,3 +21,33 @@ SIM_ADDRESS = os.environ.get("SIM_ADDRESS")
 if not os.environ.get("SIM_ADDRESS"):
     SIM_ADDRESS = str(socket.gethostbyname(socket.gethostname()))
     logger.warning(f"SIM_ADDRESS not set, using {SIM_ADDRESS} as auto-detected default")
+
+# Number of robots brought up at the same time when the SDK starts
+MAX_PARALLEL_STARTS = int(os.environ.get("MAX_PARALLEL_STARTS", "8"))
+
+# Keep robot containers running across SDK restarts and re-attach to them on startup.
+# When off, every robot is shut down under SHUTDOWN_TIMEOUT as the SDK exits; when on,
+# the fleet is stopped that way from the dashboard's Stop All Robots button instead
+ADOPT_RUNNING_ROBOTS = os.environ.get("ADOPT_RUNNING_ROBOTS", "true").lower() in ("1", "true", "yes")
+
+# Seconds robots get to stop gracefully on shutdown before they are killed
+SHUTDOWN_TIMEOUT = float(os.environ.get("SHUTDOWN_TIMEOUT", "10"))
+
+# Prefetch every image in the robot compose files into the registry proxy before robots start
+WARM_REGISTRY_PROXY = os.environ.get("WARM_REGISTRY_PROXY", "true").lower() in ("1", "true", "yes")
+
+# Host directory the robots' DinD daemons put their sockets in
+DIND_SOCKET_DIR = Path(os.environ.get("DIND_SOCKET_DIR", "/tmp/dind-sockets"))
+
+# Interpreter with the gz-transport Python bindings, used when the SDK's own can't import them
+GZ_PYTHON = os.environ.get("GZ_PYTHON", "/usr/bin/python3")
+
+# Run Gazebo worlds server-only, without the GUI, e.g. on CI hosts without a GPU
+GZ_HEADLESS = os.environ.get("GZ_HEADLESS", "false").lower() in ("1", "true", "yes")
+
+# Render engine used by headless Gazebo servers for their sensors
+GZ_RENDER_ENGINE = os.environ.get("GZ_RENDER_ENGINE", "ogre2")
+
+# Number of Gazebo servers the world is split across, and how robots are assigned to them ("sys_id" or "load")
+GZ_SHARDS = int(os.environ.get("GZ_SHARDS", "1"))
+GZ_SHARD_POLICY = os.environ.get("GZ_SHARD_POLICY", "sys_id")
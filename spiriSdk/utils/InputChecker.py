@@ -1,6 +1,6 @@
 from nicegui import ui
 
-from spiriSdk.utils.daemon_utils import active_sys_ids
+from spiriSdk.utils.leases import leases
 
 class InputChecker:
     def __init__(self):
@@ -44,6 +44,6 @@ class InputChecker:
     def checkNumber(self, i: ui.input|None):
         self.inputs[i] = False
         if i.value:
-            if int(i.value) not in active_sys_ids and str(i.value).isdigit() and float(i.value) > 0 and float(i.value) < 255:
+            if leases.sys_id_free(int(i.value)) and str(i.value).isdigit() and float(i.value) > 0 and float(i.value) < 255:
                 self.inputs[i] = True
         self.update()
\ No newline at end of file
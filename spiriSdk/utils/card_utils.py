@@ -8,10 +8,11 @@ from pathlib import Path
 from spiriSdk.pages.new_robots import new_robots
 from spiriSdk.pages.tools import gz_world
 from spiriSdk.ui.ToggleButton import ToggleButton
-from spiriSdk.utils.daemon_utils import daemons, display_daemon_status, start_container, stop_container, restart_container
+from spiriSdk.utils.daemon_utils import daemons, display_daemon_status, is_daemon_running, start_container, stop_container, restart_container, stop_all_robots
 from spiriSdk.utils.gazebo_utils import get_running_worlds, is_robot_alive
 from spiriSdk.utils.InputChecker import InputChecker
-from spiriSdk.utils.new_robot_utils import delete_robot, save_robot_config
+from spiriSdk.utils.leases import leases
+from spiriSdk.utils.new_robot_utils import delete_robot, save_robot_config, clone_robot
 from spiriSdk.utils.signals import update_cards
 
 half = 'calc(50%-(var(--nicegui-default-gap)/2))'
@@ -62,6 +63,46 @@ async def addRobot():
     
     d.open()
     
+async def cloneRobot(robot):
+    with ui.dialog() as d, ui.card(align_items='stretch').classes('w-full'):
+        checker = InputChecker()
+        ui.label(f'Clone {robot}').classes('text-h5')
+        ui.label('The new robot starts with the same settings and images').classes('text-base italic text-gray-700 dark:text-gray-300')
+        sys_id = ui.input(
+            label='MAVLink System ID*',
+            on_change=lambda e: checker.checkNumber(e.sender),
+            validation={
+                'Value must be an integer between 1 and 254': lambda value: str(value).isdigit() and 1 <= int(value) <= 254,
+                'System ID already in use': lambda value: not str(value).isdigit() or leases.sys_id_free(int(value))
+            }
+        ).classes('w-full pb-1')
+        checker.add(sys_id, False)
+
+        async def submit(button):
+            button.props(add='loading')
+            n = ui.notification(message=f'Cloning {robot}...', spinner=True, timeout=None)
+            d.close()
+            try:
+                new_robot = await clone_robot(robot, int(sys_id.value))
+                n.message = f'{robot} cloned to {new_robot}'
+                n.type = 'positive'
+            except Exception as e:
+                logger.error(f'Error cloning {robot}: {e}')
+                n.message = f'Error cloning {robot}: {e}'
+                n.type = 'negative'
+            n.spinner = False
+            n.timeout = 4
+
+        with ui.card_actions().props('align=center'):
+            ui.button('Cancel', color='secondary', on_click=d.close)
+            ui.button(
+                'Clone',
+                color='secondary',
+                on_click=lambda e: submit(e.sender)
+            ).bind_enabled_from(checker, 'isValid')
+
+    d.open()
+
 async def add_to_world(robot):
     try:
         robotType = "_".join(str(robot).split('_')[0:-1])
@@ -76,9 +117,43 @@ async def add_to_world(robot):
         logger.warning(e)
         return False
 
+async def add_all_to_world():
+    if len(get_running_worlds()) == 0:
+        ui.notify('No world running', type='warning')
+        return
+    robots = [name for name, daemon in daemons.items() if daemon.container is not None and not is_robot_alive(name)]
+    if not robots:
+        ui.notify('All robots are already in the world')
+        return
+    n = ui.notification(message=f'Adding {len(robots)} robots to {gz_world.name}...', spinner=True, timeout=None)
+    try:
+        added = await gz_world.spawn_many(robots)
+        n.message = f'Added {len(added)} of {len(robots)} robots to {gz_world.name}'
+        n.type = 'positive' if len(added) == len(robots) else 'warning'
+    except Exception as e:
+        logger.warning(e)
+        n.message = f'Error adding robots to {gz_world.name}: {e}'
+        n.type = 'negative'
+    n.spinner = False
+    n.timeout = 4
+
+async def stop_all():
+    n = ui.notification(message='Stopping all robots...', spinner=True, timeout=None)
+    try:
+        stopped = await run.io_bound(stop_all_robots)
+        n.message = f'Stopped {stopped} robots'
+        n.type = 'positive'
+    except Exception as e:
+        logger.error(f"Error stopping robots: {e}")
+        n.message = f'Error stopping robots: {e}'
+        n.type = 'negative'
+    n.spinner = False
+    n.timeout = 4
+    displayCards.refresh()
+
 async def remove_from_world(robot):
     try:
-        gz_world.models[robot].kill_model()
+        await gz_world.models[robot].kill_model()
         ui.notify(f'Removed {robot} from world', type='positive')
         return True
     except Exception as e:
@@ -119,19 +194,13 @@ def displayCards():
 class RobotCard:
     def __init__(self, name, daemon):
         self.name = name
-        self.config_file = DATA_DIR / self.name / 'config.env'
-        self.desc = None
         self.daemon = daemon
+        self.desc = daemon.config.description
         self.gz_state = False
         self.gz_visible = False
+        self.gz_shard = ''
         self.on = False
         self.last_updated = 2
-        with open(self.config_file) as f:
-            for line in f:
-                if 'DESC' in line:
-                    self.desc = line.split('=', 1)
-                    self.desc = self.desc[1].strip()
-                    break
         self.ip = ''
         update_cards.connect(self.listen_to_polling)
     
@@ -158,11 +227,11 @@ class RobotCard:
                 self.update_status()
                 
                 if self.desc != None:
-                    ui.label(f'{self.desc[1:-1]}').classes('text-base font-normal italic text-gray-700 dark:text-gray-300')
+                    ui.label(f'{self.desc}').classes('text-base font-normal italic text-gray-700 dark:text-gray-300')
 
             # Docker host
             with ui.card_section().classes('w-full p-0 mb-2'):
-                command = f"DOCKER_HOST=unix:///tmp/dind-sockets/spirisdk_{self.name}.socket"
+                command = f"DOCKER_HOST={self.daemon.docker_host}"
                 docker_host = ui.code(command, language='bash').classes('text-gray-600 dark:text-gray-200')
                 docker_host.bind_visibility(self.__dict__, 'on')
 
@@ -186,9 +255,15 @@ class RobotCard:
                     
                     reboot_btn = ui.button('Reboot', color='secondary')
                     
+                    ui.button('Clone', color='secondary', on_click=lambda n=self.name: cloneRobot(n))
+                    
                     gz_toggle = ToggleButton(state=self.gz_state, on_label="remove from gz sim", off_label="add to gz sim")
                     bind_from(self_obj=gz_toggle, self_name='state', other_obj=self, other_name='gz_state', backward=lambda v: v)
                     gz_toggle.bind_visibility(self.__dict__, 'gz_visible')
+                    # Which Gazebo server the robot is on, when the world is sharded
+                    shard = ui.label().classes('text-base self-center')
+                    shard.bind_text_from(self.__dict__, 'gz_shard')
+                    shard.bind_visibility_from(self.__dict__, 'gz_shard', backward=bool)
                     
                     ui.space()
                     
@@ -217,14 +292,17 @@ class RobotCard:
                 self.chips[state].visible = False
             self.label_status.visible = True
             self.label_status.text = f'{status.title()}'
-        if status == 'stopped':
-            self.on = False
+        if status == 'stopped' or str(status).startswith(('failed', 'error')):
             self.label_status.classes('text-[#BF5234]')
-        else: #TEMPORARY FIX IN THE FUTURE
-            if self.ip == '':
-                self.ip = self.daemon.get_ip()
-            self.on = True
+        else:
             self.label_status.classes('text-[#609926]')
+        # Robots still queued or starting have no container to ask yet
+        self.on = is_daemon_running(self.name)
+        if self.on and self.ip == '':
+            try:
+                self.ip = self.daemon.get_ip()
+            except RuntimeError as e:
+                logger.debug(f"No IP for {self.name} yet: {e}")
     
     async def power_on(self, buttons: list):
         for button in buttons:
@@ -295,6 +373,11 @@ class RobotCard:
             self.gz_state = False
         else:
             self.gz_state = True
+        shard = gz_world.shard_of(self.name)
+        if shard is not None and len(gz_world.shards) > 1:
+            self.gz_shard = f'shard {shard + 1}/{len(gz_world.shards)}'
+        else:
+            self.gz_shard = ''
         if len(world_running) == 0:
-            gz_world.models = {}
+            gz_world.clear_models()
     
\ No newline at end of file
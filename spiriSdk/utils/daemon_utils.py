@@ -1,46 +1,107 @@
-import docker, docker.errors, yaml, time
+import docker, docker.errors, time, asyncio
 
 from nicegui import run
 from loguru import logger
 
-from spiriSdk.docker.dindocker import DockerInDocker
-from spiriSdk.settings import SDK_ROOT
+from spiriSdk.docker.client_pool import client_pool
+from spiriSdk.docker.registry_warmup import wait_for_warmup, warmup_pending
+from spiriSdk.docker.dindocker import DockerInDocker, DEFAULT_REGISTRY_PROXY, cleanup_docker_resources, shutdown_fleet
+from spiriSdk.docker.status_cache import STATES, daemon_states, host_states
+from spiriSdk.settings import SDK_ROOT, MAX_PARALLEL_STARTS, ADOPT_RUNNING_ROBOTS
+from spiriSdk.utils.leases import Lease, leases
+from spiriSdk.utils.robot_config import config_for
+from spiriSdk.utils.service_catalog import service_catalog, startup_order
 
 DATA_DIR = SDK_ROOT / 'data'
 ROBOTS_DIR = SDK_ROOT / 'robots'
 ROOT_DIR = SDK_ROOT
 
 daemons = {}
-active_sys_ids = []
+# Bring-up state of robots that are still starting (or failed to), shown on their cards
+startup_progress = {}
 
-async def init_daemons():
+async def init_daemons(max_parallel: int = MAX_PARALLEL_STARTS):
     global daemons
     from spiriSdk.utils.card_utils import displayCards
     logger.info(f"Initializing Docker daemons for robots...")
 
-    for robot_dir in DATA_DIR.iterdir():
-        robot_name = robot_dir.name
+    robot_names = [robot_dir.name for robot_dir in DATA_DIR.iterdir() if robot_dir.is_dir()]
+    if ADOPT_RUNNING_ROBOTS:
+        # Only reap containers that no longer belong to a robot, keep the rest running
+        await run.io_bound(cleanup_docker_resources, [*robot_names, DEFAULT_REGISTRY_PROXY.container_name])
+    else:
+        await run.io_bound(cleanup_docker_resources)
 
-        if robot_dir.exists():
-            logger.debug(f"Starting a daemon for: {robot_name}")
-            dind = DockerInDocker("docker:dind", robot_name)
-            daemons[robot_name] = dind
+    leases.retain(robot_names)
+    for robot_name in robot_names:
+        daemons[robot_name] = DockerInDocker("docker:dind", robot_name)
+        startup_progress[robot_name] = 'queued'
 
-            await run.io_bound(dind.ensure_started)
-            displayCards.refresh()
+        robot_sys = str(robot_name).rsplit('_', 1)
+        try:
+            await run.io_bound(lease_robot, robot_name, int(robot_sys[1]))
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"Can't lease a system ID and ports to {robot_name}: {e}")
+    displayCards.refresh()
 
-            robot_sys = str(robot_name).rsplit('_', 1)
-            active_sys_ids.append(int(robot_sys[1]))
-            
-    logger.debug(f"Starting services for {len(daemons)} robots...")
-    for robot_name in list(daemons.keys()):
-        message = await start_services(robot_name)
-        logger.info(message)
-        
-    logger.success("Docker daemons initialized.")
+    semaphore = asyncio.Semaphore(max_parallel)
+    finished = 0
+
+    async def bring_up(robot_name: str) -> bool:
+        nonlocal finished
+        async with semaphore:
+            try:
+                logger.debug(f"Starting a daemon for: {robot_name}")
+                startup_progress[robot_name] = 'starting daemon'
+                await run.io_bound(daemons[robot_name].ensure_started)
+
+                startup_progress[robot_name] = 'starting services'
+                message = await start_services(robot_name)
+                logger.info(message)
+                return robot_name not in startup_progress
+            except Exception as e:
+                startup_progress[robot_name] = f'failed: {e}'
+                logger.error(f"Failed to bring up {robot_name}: {e}")
+                return False
+            finally:
+                finished += 1
+                logger.info(f"[{finished}/{len(robot_names)}] {robot_name} {'ready' if robot_name not in startup_progress else 'failed'}")
+
+    logger.debug(f"Bringing up {len(robot_names)} robots, {max_parallel} at a time...")
+    results = await asyncio.gather(*(bring_up(robot_name) for robot_name in robot_names))
+    displayCards.refresh()
+
+    failed = results.count(False)
+    if failed:
+        logger.warning(f"Docker daemons initialized, {failed} of {len(robot_names)} robots failed to start.")
+    else:
+        logger.success("Docker daemons initialized.")
         
 
+def lease_robot(robot_name: str, sys_id: int) -> Lease:
+    """Lease a system ID and SITL ports to a robot and write them to its config.env.
+
+    Raises:
+        ValueError: If the system ID is out of range or used by another robot
+        RuntimeError: If no SITL ports are free
+    """
+    lease = leases.lease(robot_name, sys_id)
+    config_for(DATA_DIR / robot_name / 'config.env').update(lease.env())
+    return lease
+
 async def start_services(robot_name: str):
+    """Start a robot's autostart services in dependency order.
+
+    The robot's startup progress is cleared once this returns, unless services
+    failed, so its card shows which ones.
+    """
+    try:
+        return await _start_services(robot_name)
+    finally:
+        if not str(startup_progress.get(robot_name, '')).startswith('failed'):
+            startup_progress.pop(robot_name, None)
+
+async def _start_services(robot_name: str):
     if robot_name not in daemons:
         return f"No daemon found for {robot_name}."
 
@@ -57,81 +118,106 @@ async def start_services(robot_name: str):
     if container.status != "running":
         return f"Container {robot_name} is not running."
 
+    robot_type = "_".join(robot_name.split('_')[:-1])
+    services = [service for service in service_catalog.services(robot_type) if service.autostart]
+    if not services:
+        return f"No services to start in {ROBOTS_DIR / robot_type / 'services'} for {robot_name}."
     try:
-        robot_type = "_".join(robot_name.split('_')[:-1])
-        services_dir = ROBOTS_DIR / robot_type / 'services'
-        logger.debug(f"Checking services in {services_dir} for {robot_name}...")
-        if not services_dir.is_dir():
-            return f"Services directory {services_dir} does not exist for {robot_name}."
-
-        for service_path in services_dir.iterdir():
-            if not service_path.is_dir():
-                logger.debug(f"Skipping {service_path} as it is not a directory.")
-                continue
-
-            compose_path = service_path / 'docker-compose.yaml'
-            if not compose_path.exists():
-                compose_path = service_path / "docker-compose.yml"
-                if not compose_path.exists():
-                    logger.error(f"docker-compose file not found for {robot_name}/{service_path.name} at {compose_path}. Skipping.")
-                    continue
-
-            # Step 3: Load compose YAML
-            try:
-                with open(compose_path, 'r') as f:
-                    compose_data = yaml.safe_load(f)
-            except Exception as e:
-                logger.error(f"Error reading {compose_path.name}: {e}")
-                continue
-
-            # Step 4: Check x-spiri-sdk-autostart
-            if compose_data.get("x-spiri-sdk-autostart", True):
-                logger.info(f"Autostarting: {robot_name}/{service_path.name}")
-                # Step 5: Run `docker compose up -d` inside the DinD container
-                inside_path = f"/robots/{robot_type}/services/{service_path.name}"
-                command = f"docker compose --env-file=/data/config.env -f {inside_path}/{compose_path.name} up -d"
-                result = await run.io_bound(lambda r=robot_name, c=command, i=inside_path: daemons[r].container.exec_run(c, workdir=i))
-                logger.debug(result.output.decode())
-
-    except Exception as e:
+        levels = startup_order(services)
+    except ValueError as e:
+        startup_progress[robot_name] = f'failed: {e}'
         return f"Error starting services for {robot_name}: {str(e)}"
-    
+
+    if not daemons[robot_name].adopted and warmup_pending():
+        # Pull once the proxy has every layer, instead of racing the warm-up for them
+        startup_progress[robot_name] = 'waiting for registry proxy warm-up'
+        await wait_for_warmup()
+
+    # Services in a level don't depend on each other, so they start together
+    progress = {service.name: 'waiting' for service in services}
+    failed = set()
+    for level in levels:
+        runnable = []
+        for service in level:
+            if failed & set(service.depends_on):
+                progress[service.name] = 'skipped'
+                failed.add(service.name)
+            else:
+                runnable.append(service)
+        results = await asyncio.gather(*(start_service(robot_name, service, progress) for service in runnable), return_exceptions=True)
+        for service, result in zip(runnable, results):
+            if isinstance(result, BaseException):
+                progress[service.name] = f'failed: {result}'
+                failed.add(service.name)
+                logger.error(f"Failed to start {robot_name}/{service.name}: {result}")
+        _report_service_progress(robot_name, progress)
+
+    if failed:
+        startup_progress[robot_name] = 'failed: ' + ', '.join(sorted(failed))
+        return f"Services {', '.join(sorted(failed))} for {robot_name} failed to start."
     return f"Services for {robot_name} started successfully."
 
+async def start_service(robot_name: str, service, progress: dict):
+    """Bring up one service folder of a robot through its DinD daemon, reporting progress as it happens."""
+    daemon = daemons[robot_name]
+    logger.info(f"Autostarting: {robot_name}/{service.name}")
+    progress[service.name] = 'starting'
+    _report_service_progress(robot_name, progress)
+    async for event in daemon.run_compose(str(service.compose_path), env_file=daemon.robot_data_root / 'config.env'):
+        logger.debug(f"{robot_name}/{service.name} {event}")
+        if event.service and event.phase:
+            progress[service.name] = f"{event.service} {event.phase}" + (f" {event.percent:.0f}%" if event.percent is not None else '')
+            _report_service_progress(robot_name, progress)
+    progress[service.name] = 'started'
+    _report_service_progress(robot_name, progress)
+
+def _report_service_progress(robot_name: str, progress: dict):
+    startup_progress[robot_name] = ', '.join(f"{name}: {state}" for name, state in progress.items())
+
 def display_daemon_status(robot_name):
+    """Status of a robot for its card, read from the event-fed status caches without any Docker calls."""
     try:
-        container = daemons[robot_name].container
-        if container is None:
+        if robot_name in startup_progress:
+            return startup_progress[robot_name]
+        daemon = daemons[robot_name]
+        if daemon.container is None:
             return 'not created or removed'
-        container.reload()
-        status = container.status
-        if status == 'running':
-            socket_path = f'unix:///tmp/dind-sockets/spirisdk_{robot_name}.socket'
-            try:
-                client = docker.DockerClient(base_url=socket_path)
-                states = {
-                    "Running": len(client.containers.list(filters={'status': 'running'})),
-                    "Restarting": len(client.containers.list(filters={'status': 'restarting'})),
-                    "Exited": len(client.containers.list(filters={'status': 'exited'})),
-                    "Created": len(client.containers.list(filters={'status': 'created'})),
-                    "Paused": len(client.containers.list(filters={'status': 'paused'})),
-                    "Dead": len(client.containers.list(filters={'status': 'dead'})),
-                }
-                if all(count == 0 for count in states.values()):
-                    return 'Starting up'
-                else:
-                    return states
-            except Exception as e:
-                return 'Loading...'
-        else:
+        host_states.start()
+        if not host_states.ready:
+            return 'Loading...'
+        status = host_states.status(f"spirisdk_{robot_name}")
+        if status is None:
+            return 'stopped'
+        if status != 'running':
             return status
-    except docker.errors.NotFound:
-        return 'stopped'
+
+        states = daemon_states(robot_name, daemon.docker_host)
+        if not states.ready:
+            return 'Loading...'
+        counts = states.counts()
+        if not any(counts.values()):
+            return 'Starting up'
+        return {state.title(): counts[state] for state in STATES}
     except Exception as e:
         return f'error: {str(e)}'
 
+def is_daemon_running(robot_name) -> bool:
+    """Whether a robot's DinD container exists and is running.
+
+    Read from the status cache, or from the container's last known state until
+    the cache is seeded.
+    """
+    daemon = daemons.get(robot_name)
+    if daemon is None or daemon.container is None:
+        return False
+    if not host_states.ready:
+        return daemon.container.status == 'running'
+    return host_states.status(f"spirisdk_{robot_name}") == 'running'
+
 async def start_container(robot_name):
     logger.info(f'Starting container for {robot_name}...')
+    # A failure from an earlier start would hide the live status from now on
+    startup_progress.pop(robot_name, None)
     await run.io_bound(daemons[robot_name].ensure_started)
 
 
@@ -140,6 +226,7 @@ def stop_container(robot_name):
         return f"No daemon found for {robot_name}.", 'negative'
 
     container = daemons[robot_name].container
+    client_pool.evict(daemons[robot_name].docker_host)
     try:
         container.stop()
     except Exception as e:
@@ -166,7 +253,28 @@ def stop_container(robot_name):
     return f"Container {robot_name} stopped", 'positive'
 
 
+def stop_all_robots() -> int:
+    """Stop and remove every robot's DinD at once, under SHUTDOWN_TIMEOUT.
+
+    Robots are adopted across SDK restarts by default, so this is how the
+    whole fleet is stopped. Their data and image stores are kept, starting a
+    robot again creates a new container.
+
+    Returns:
+        int: Number of robots stopped
+    """
+    names = [name for name, daemon in daemons.items() if daemon.container is not None]
+    for name in names:
+        startup_progress.pop(name, None)
+        client_pool.evict(daemons[name].docker_host)
+    shutdown_fleet([daemons[name].container for name in names])
+    for name in names:
+        daemons[name].container = None
+    return len(names)
+
+
 async def restart_container(robot_name: str):
+    startup_progress.pop(robot_name, None)
     if daemons[robot_name].container.status == 'running':
         await run.io_bound(lambda: stop_container(robot_name))
     await start_container(robot_name)
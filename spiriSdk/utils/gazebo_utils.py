@@ -1,10 +1,15 @@
-import subprocess, time
+import asyncio, itertools, math, os, signal, subprocess, threading, time
 
+from nicegui import run
 from pathlib import Path
 from loguru import logger
-from typing import Optional
+from typing import Optional, Sequence
 
+from spiriSdk.settings import GZ_HEADLESS, GZ_RENDER_ENGINE, GZ_SHARDS, GZ_SHARD_POLICY
 from spiriSdk.utils.daemon_utils import daemons
+from spiriSdk.utils.gz_bridge import GzBridge, bridge_for
+from spiriSdk.utils.leases import leases
+from spiriSdk.utils.sdf_cache import render_sdf
 
 MODEL_PATHS = {
     'spiri_mu': 'robots/spiri_mu/models/spiri_mu',
@@ -16,81 +21,374 @@ WORLD_PATHS = {
     'citadel_hill': 'worlds/citadel_hill/worlds/citadel_hill',
     'yarmouth_airport': 'worlds/yarmouth_airport/worlds/yarmouth_airport'
 }
+
+# gz-transport's default discovery ports, isolated worlds use the next pairs up
+DISCOVERY_PORT_BASE = 10317
 def is_robot_alive(name):
     if name in gz_world.models.keys():
         return True
     else:
         return False
 
-def get_running_worlds() -> list:
-        """Get a list of running Gazebo world names."""
+class WorldProcesses:
+    """Registry of running Gazebo worlds.
+
+    Worlds started by the SDK are tracked through their Popen handles, keyed by
+    World.key so several instances of the same world file can run at once.
+    Worlds started outside the SDK are found by scanning /proc, and the scan is
+    cached for a short while so every card polling at once shares one scan.
+
+    Args:
+        ttl: Seconds a /proc scan stays valid (default: 1.0)
+        proc_root: Where procfs is mounted (default: /proc)
+    """
+
+    def __init__(self, ttl: float = 1.0, proc_root: Path = Path('/proc')):
+        self.ttl = ttl
+        self.proc_root = proc_root
+        self._procs: dict[str, subprocess.Popen] = {}
+        self._scan: list[tuple[int, str]] = []
+        self._scanned_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def start(self, key: str, cmd: list[str], env: Optional[dict[str, str]] = None) -> subprocess.Popen:
+        """Start a world in its own process group, so it can be stopped together with its children."""
+        proc = subprocess.Popen(cmd, start_new_session=True, env={**os.environ, **env} if env else None)
+        with self._lock:
+            self._procs[key] = proc
+            self._scanned_at = float('-inf')
+        return proc
+
+    def running(self) -> list[str]:
+        """Keys of the running worlds, SDK-started ones first, then names of the others."""
+        with self._lock:
+            for key, proc in list(self._procs.items()):
+                if proc.poll() is not None:
+                    del self._procs[key]
+            worlds = list(self._procs)
+            for _, world in self._external():
+                if world not in worlds:
+                    worlds.append(world)
+            return worlds
+
+    def stop(self, key: str, timeout: float = 5.0) -> None:
+        """Stop a world with SIGTERM, then SIGKILL whatever is left after timeout seconds."""
+        with self._lock:
+            proc = self._procs.pop(key, None)
+            pids = {pid for pid, world in self._external(force=True) if world == key}
+            self._scanned_at = float('-inf')
+
+        def signal_all(sig):
+            if proc is not None and proc.poll() is None:
+                try:
+                    os.killpg(proc.pid, sig)
+                except ProcessLookupError:
+                    pass
+            for pid in pids:
+                try:
+                    os.kill(pid, sig)
+                except ProcessLookupError:
+                    pass
+
+        signal_all(signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if (proc is None or proc.poll() is not None) and not any((self.proc_root / str(pid)).exists() for pid in pids):
+                return
+            time.sleep(0.1)
+        logger.warning(f"World {key} didn't stop within {timeout}s, killing it")
+        signal_all(signal.SIGKILL)
+        if proc is not None:
+            proc.wait()
+
+    def _external(self, force: bool = False) -> list[tuple[int, str]]:
+        """(pid, world key) of every gz sim process on the host not started by the SDK, cached for ttl seconds."""
+        if force or time.monotonic() - self._scanned_at > self.ttl:
+            self._scan = _scan_proc(self.proc_root)
+            self._scanned_at = time.monotonic()
+        # Our own worlds run in process groups led by their Popen
+        groups = {proc.pid for proc in self._procs.values()}
+        return [(pid, world) for pid, pgid, world in self._scan if pgid not in groups]
+
+
+def _scan_proc(proc_root: Path = Path('/proc')) -> list[tuple[int, int, str]]:
+    """(pid, process group, world key) of every gz sim process.
+
+    Worlds running in a GZ_PARTITION are keyed name@partition like World.key, so
+    isolated instances started by an earlier SDK run can be adopted again.
+    """
+    worlds = []
+    for cmdline_path in proc_root.glob('[0-9]*/cmdline'):
         try:
-            running_worlds = []
-            cmd = "ps aux | grep '[g]z sim'"
-            process = subprocess.Popen(cmd, shell=True, stdout=subprocess.PIPE)
-            output, _ = process.communicate()
-            output = output.decode('utf-8')
-            for line in output.strip().split('\n'):
-                if line:
-                    parts = line.split()
-                    command = ' '.join(parts[10:])
-                    for token in command.split():
-                        if token.endswith('.world'):
-                            world_name = Path(token).stem
-                            running_worlds.append(world_name)
-            return running_worlds
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Error running command: {e}")
+            args = cmdline_path.read_bytes().decode(errors='replace').split('\0')
+            if 'gz sim' not in ' '.join(args):
+                continue
+            # The process group is the third field after the parenthesised command name
+            pgid = int((cmdline_path.parent / 'stat').read_text().rsplit(')', 1)[1].split()[2])
+        except OSError:
+            # Process exited while scanning, or isn't ours to read
+            continue
+        pid = int(cmdline_path.parent.name)
+        partition = _partition_of(cmdline_path.parent)
+        for arg in args:
+            if arg.endswith('.world'):
+                name = Path(arg).stem
+                worlds.append((pid, pgid, name if partition is None else f'{name}@{partition}'))
+    return worlds
+
+
+def _partition_of(process_dir: Path) -> Optional[str]:
+    """GZ_PARTITION a process runs in, None if it has none or its environment can't be read."""
+    try:
+        environ = (process_dir / 'environ').read_bytes().decode(errors='replace').split('\0')
+    except OSError:
+        return None
+    for variable in environ:
+        if variable.startswith('GZ_PARTITION='):
+            return variable.split('=', 1)[1] or None
+    return None
+
+
+world_processes = WorldProcesses()
+
+def formation(count: int, layout: str = 'grid', spacing: float = 2.0,
+              occupied: Sequence[Sequence[float]] = ()) -> list[tuple[float, float]]:
+    """x, y positions for count robots, laid out on a square grid or in a line along x.
+
+    The formation starts spacing metres past the occupied positions, a grid
+    beyond their largest y and a line beyond their largest x, so it never
+    overlaps robots already in the world.
+    """
+    if layout == 'line':
+        x0 = max((position[0] for position in occupied), default=-spacing) + spacing
+        return [(x0 + index * spacing, 0.0) for index in range(count)]
+    y0 = max((position[1] for position in occupied), default=-spacing) + spacing
+    columns = math.ceil(math.sqrt(count))
+    return [((index % columns) * spacing, y0 + (index // columns) * spacing) for index in range(count)]
+
+def get_running_worlds() -> list:
+    """Get a list of running Gazebo world names."""
+    return world_processes.running()
 
 class World:
-    def __init__(self, name):
+    """A Gazebo world and the robots spawned into it.
+
+    Args:
+        name: World name, one of WORLD_PATHS
+        ready_timeout: Seconds the world gets to advertise its services after starting.
+            A world that misses it is reported as failed but, since it may still be
+            loading (e.g. downloading models from Fuel), gets as long again before
+            it is stopped
+        max_restarts: Times a crashed world is restarted before giving up
+        headless: Run the server only, without the GUI (default: GZ_HEADLESS)
+        render_engine: Render engine of the server's sensors (default: GZ_RENDER_ENGINE)
+        instance: Number of an isolated instance, 0 for the shared default one. Instance
+            n runs in GZ_PARTITION spirisdk_<n> with its own discovery ports, so any
+            number of worlds, including copies of the same world, can run side by side.
+    """
+
+    def __init__(self, name, ready_timeout: float = 60.0, max_restarts: int = 3,
+                 headless: bool = GZ_HEADLESS, render_engine: str = GZ_RENDER_ENGINE, instance: int = 0):
         self.name = name
         self.models: dict[str:Model]  = {}
+        self.headless = headless
+        self.render_engine = render_engine
+        self.instance = instance
+        # Supervision of the gz sim process started by run_world
+        self.ready_timeout = ready_timeout
+        self.max_restarts = max_restarts
+        self.restarts = 0
+        self.failure: Optional[str] = None
+        self._settled = asyncio.Event()
+        self._supervisor: Optional[asyncio.Task] = None
 
     def get_name(self) -> str:
         return self.name
+
+    @property
+    def key(self) -> str:
+        """Identifies this world among the running ones, e.g. empty_world or empty_world@spirisdk_2."""
+        return self.name if self.partition is None else f'{self.name}@{self.partition}'
+
+    @property
+    def partition(self) -> Optional[str]:
+        return None if self.instance == 0 else f'spirisdk_{self.instance}'
+
+    @property
+    def env(self) -> dict[str, str]:
+        """gz-transport environment isolating this world from the others."""
+        if self.partition is None:
+            return {}
+        return {
+            'GZ_PARTITION': self.partition,
+            'GZ_DISCOVERY_MSG_PORT': str(DISCOVERY_PORT_BASE + 2 * self.instance),
+            'GZ_DISCOVERY_SRV_PORT': str(DISCOVERY_PORT_BASE + 2 * self.instance + 1),
+        }
+
+    @property
+    def bridge(self) -> GzBridge:
+        return bridge_for(self.env)
     
     async def prep_bot(self, model_name: str ='bot', model_type: str='spiri_mu_no_gimbal', ip: str='127.0.0.1'):
-        
+        await self.ready()
         model = Model(self, model_name, model_type, ip, daemon=daemons[model_name])
         await model.launch_model()
         self.models.update({model_name:model})
         return
 
+    async def spawn_many(self, robot_names: list[str], layout: str = 'grid', spacing: float = 2.0) -> list[str]:
+        """Add several robots to the world with one create request.
+
+        Positions are assigned in sys_id order, on a square grid or in a line
+        along x, spacing metres apart and clear of the robots already in the
+        world. SDFs are rendered concurrently.
+
+        Args:
+            robot_names: Robots to add, robots already in the world are skipped
+            layout: 'grid' or 'line' (default: 'grid')
+            spacing: Distance between neighbouring robots in metres (default: 2.0)
+
+        Returns:
+            list[str]: Names of the robots that were added
+        """
+        await self.ready()
+        models = [
+            Model(self, name, "_".join(name.split('_')[:-1]), daemon=daemons[name])
+            for name in robot_names if name not in self.models
+        ]
+        if not models:
+            return []
+        models.sort(key=lambda model: model.sys_id)
+        occupied = [model.position for model in self.models.values()]
+        for index, (x, y) in enumerate(formation(len(models), layout, spacing, occupied)):
+            models[index].position[0], models[index].position[1] = x, y
+
+        sdf_files = await asyncio.gather(*(model.render() for model in models))
+        entities = [(model.name, str(sdf_file), model.position[:3]) for model, sdf_file in zip(models, sdf_files)]
+        if not await self.bridge.spawn_many(self.name, entities):
+            return []
+        self.models.update({model.name: model for model in models})
+        return [model.name for model in models]
+
+    async def remove_many(self, robot_names: list[str]) -> list[str]:
+        """Remove several robots from the world concurrently.
+
+        Gazebo has no multi-entity remove service, so this is one request per robot.
+
+        Returns:
+            list[str]: Names of the robots that were removed
+        """
+        models = [self.models[name] for name in robot_names if name in self.models]
+        removed = await asyncio.gather(*(model.kill_model() for model in models))
+        return [model.name for model, ok in zip(models, removed) if ok]
+
+    def command(self) -> list[str]:
+        """Command line that runs this world."""
+        world_file = f'{WORLD_PATHS[self.name]}.world'
+        if self.headless:
+            # Server only; sensors still render, offscreen
+            return ['gz', 'sim', '-s', '-r', '--headless-rendering', '--render-engine-server', self.render_engine, world_file]
+        return ['gz', 'sim', '-r', world_file]
+
     async def run_world(self) -> None:
-        """Run world in Gazebo simulator."""
+        """Run world in Gazebo simulator and supervise it until it is stopped."""
         try:
-            cmd = ['gz', 'sim', '-r', f'{WORLD_PATHS[self.name]}.world']
-            subprocess.Popen(cmd)
-            logger.success('world started')
+            proc = world_processes.start(self.key, self.command(), self.env)
         except FileNotFoundError:
             logger.error(f"File not found: {self.name}. Make sure it is installed and available in the PATH.")
+            self._fail("Gazebo is not installed")
+            return
+        self.restarts = 0
+        self.failure = None
+        self._settled.clear()
+        self._supervisor = asyncio.create_task(self._supervise(proc))
+        logger.info(f'World {self.key} starting' + (' headless' if self.headless else ''))
+
+    async def ready(self, timeout: Optional[float] = None) -> None:
+        """Wait until the world accepts spawn requests.
+
+        Args:
+            timeout: Seconds to wait (default: ready_timeout)
+
+        Raises:
+            RuntimeError: If the world isn't running, crashed or isn't ready within timeout
+        """
+        timeout = self.ready_timeout if timeout is None else timeout
+        service = f'/world/{self.name}/create'
+        if self.failure is not None and (self._supervisor is None or self._settled.is_set()):
+            raise RuntimeError(self.failure)
+        if self._supervisor is None:
+            # Not started by us (or already stopped), so the service is all there is to go by
+            if self.key not in await run.io_bound(world_processes.running) or not await self.bridge.wait_for_service(service, timeout):
+                raise RuntimeError(f'World {self.key} is not running')
+            return
+        try:
+            await asyncio.wait_for(self._settled.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f'World {self.key} not ready after {timeout}s')
+        if self.failure is not None:
+            raise RuntimeError(self.failure)
+
+    async def _supervise(self, proc: subprocess.Popen) -> None:
+        """Mark the world ready once its services are advertised, and restart it if it crashes."""
+        service = f'/world/{self.name}/create'
+        while True:
+            started = time.monotonic()
+            while proc.poll() is None and not await self.bridge.wait_for_service(service, timeout=1.0):
+                waited = time.monotonic() - started
+                if waited > 2 * self.ready_timeout:
+                    # Hung rather than slow, so it isn't left running without an owner
+                    await run.io_bound(world_processes.stop, self.key)
+                    self._fail(f'World {self.key} not ready after {2 * self.ready_timeout}s, stopped it')
+                    return
+                if waited > self.ready_timeout and self.failure is None:
+                    self._fail(f'World {self.key} not ready after {self.ready_timeout}s')
+            if proc.poll() is None:
+                # A slow world clears the failure it was reported with once it is ready
+                self.failure = None
+                logger.success(f'World {self.key} ready after {time.monotonic() - started:.1f}s')
+                self._settled.set()
+                while proc.poll() is None:
+                    await asyncio.sleep(1)
+
+            # The world went away without end_gz_proc, its models went with it
+            self._settled.clear()
+            self.clear_models()
+            if self.restarts >= self.max_restarts:
+                self._fail(f'World {self.key} exited with code {proc.returncode} after {self.restarts} restarts')
+                return
+            self.restarts += 1
+            logger.error(f'World {self.key} exited with code {proc.returncode}, restarting ({self.restarts}/{self.max_restarts})')
+            proc = world_processes.start(self.key, self.command(), self.env)
+
+    def clear_models(self) -> None:
+        """Forget every model, once Gazebo no longer has them."""
+        self.models = {}
+
+    def _fail(self, reason: str) -> None:
+        logger.error(reason)
+        self.failure = reason
+        self._settled.set()
 
     async def reset(self, name):
         running_world = get_running_worlds()
         if len(running_world) > 0:
-            self.end_gz_proc()
+            await self.end_gz_proc()
         self.name = name
-        self.models = {
-        
-        }
-        time.sleep(1)
+        self.clear_models()
         await self.run_world()
     
-    def end_gz_proc(self) -> None:
+    async def end_gz_proc(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            self._supervisor = None
         try:
-            KILL_GZ_CMD = f"pkill -f 'gz sim -r {WORLD_PATHS[self.name]}.world'"
             dead_world_models = {} 
             dead_world_models.update(self.models)
-            for model in dead_world_models.values(): 
-                model.kill_model()
-            self.models = {}
-            remove_gazebo_proc = subprocess.Popen(
-                KILL_GZ_CMD, 
-                shell=True, 
-                stdout=subprocess.PIPE
-            )
-        except subprocess.CalledProcessError as e:
+            await asyncio.gather(*(model.kill_model() for model in dead_world_models.values()))
+            self.clear_models()
+            await run.io_bound(world_processes.stop, self.key)
+        except subprocess.SubprocessError as e:
             logger.error(f"Error running command: {e}")
 
 class Model:
@@ -102,7 +400,8 @@ class Model:
         self.position = position
         self.daemon = daemon
         self.sys_id = int(self.daemon.env_get('MAVLINK_SYS_ID', 0))
-        self.sitl_port = 9002 + 10 * self.sys_id
+        lease = leases.get(self.name)
+        self.sitl_port = lease.fdm_port if lease is not None else 9002 + 10 * self.sys_id
         logger.debug(f"Model {self.name} of type {self.type} will use SITL port {self.sitl_port}")
 
         if self.position == None:
@@ -111,68 +410,173 @@ class Model:
             self.position[2] = self.position[2] + 0.3
 
 
+    async def render(self) -> Path:
+        """Get the SDF file for this model, rendering its xacro template if it has one."""
+        if (self.type == 'spiri_mu' or self.type == 'spiri_mu_no_gimbal'):
+            # Each robot gets its own render, shared with any robot using the same args
+            return await render_sdf(Path(self.path) / 'model.xacro.sdf', {'fdm_port_in': self.sitl_port})
+        return (Path(self.path) / 'model.sdf').absolute()
+
     async def launch_model(self) -> bool:
         """Launch the model in the Gazebo simulator."""
         logger.debug("adding model")
-        if (self.type == 'spiri_mu' or self.type == 'spiri_mu_no_gimbal'):
-            XACRO_CMD = [
-                "xacro",
-                f"fdm_port_in:={self.sitl_port}",
-                "model.xacro.sdf",
-                "-o",
-                "model.sdf",
-            ]
-            xacro_proc = subprocess.Popen(
-                XACRO_CMD,
-                cwd=f"{self.path}",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-            )
-            
-        ROS2_CMD = f"ros2 run ros_gz_sim create -world {self.parent.name} -file {self.path}/model.sdf -name {self.name} -x {self.position[0]} -y {self.position[1]} -z {self.position[2]}"        
-        ros2_gz_create_proc = subprocess.Popen(
-            ROS2_CMD.split(),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        out, err = ros2_gz_create_proc.communicate(timeout=3)
-        ros2_gz_create_proc.kill()
-        return True
+        sdf_file = await self.render()
+        return await self.parent.bridge.spawn(self.parent.name, self.name, str(sdf_file), self.position[:3])
+
+    async def kill_model(self):
+        removed = await self.parent.bridge.remove(self.parent.name, self.name)
+        if not removed:
+            logger.warning(f"Gazebo didn't confirm removing {self.name} from {self.parent.name}")
+        self.parent.models.pop(self.name, None)
+        return removed
+
+class ShardedWorld:
+    """One world file run as several Gazebo servers, with the robots spread across them.
+
+    Each server steps its own physics on its own core, so a fleet too large for
+    one physics loop to keep real time can still be simulated. Shard 0 is the
+    regular instance, shown in the GUI unless headless; the other shards are
+    isolated, always headless instances (partitions spirisdk_1 ... spirisdk_<n-1>).
+    Robots in different shards don't see each other in the simulation.
+
+    Has the same interface as World, so it can stand in for it.
+
+    Args:
+        name: World name, one of WORLD_PATHS
+        shards: Number of Gazebo servers (default: GZ_SHARDS)
+        policy: 'sys_id' puts a robot on shard sys_id % shards, 'load' on the
+            shard with the fewest robots (default: GZ_SHARD_POLICY)
+        headless: Run shard 0 without the GUI too (default: GZ_HEADLESS)
+    """
+
+    def __init__(self, name, shards: int = GZ_SHARDS, policy: str = GZ_SHARD_POLICY, headless: bool = GZ_HEADLESS):
+        if policy not in ('sys_id', 'load'):
+            raise ValueError(f"Unknown shard policy {policy}, expected 'sys_id' or 'load'")
+        self.policy = policy
+        self.shards = [World(name, headless=headless)]
+        self.shards += [World(name, headless=True, instance=instance) for instance in range(1, max(shards, 1))]
+
+    @property
+    def name(self) -> str:
+        return self.shards[0].name
+
+    def get_name(self) -> str:
+        return self.name
+
+    @property
+    def key(self) -> str:
+        return self.shards[0].key
+
+    @property
+    def headless(self) -> bool:
+        return self.shards[0].headless
+
+    @headless.setter
+    def headless(self, value: bool) -> None:
+        self.shards[0].headless = value
+
+    @property
+    def models(self) -> dict[str, 'Model']:
+        """Models of every shard, by robot name."""
+        return {name: model for shard in self.shards for name, model in shard.models.items()}
+
+    def clear_models(self) -> None:
+        """Forget the models of every shard, once Gazebo no longer has them."""
+        for shard in self.shards:
+            shard.clear_models()
+
+    def shard_of(self, robot_name: str) -> Optional[int]:
+        """Index of the shard a robot is in, or None if it isn't in the world."""
+        return next((index for index, shard in enumerate(self.shards) if robot_name in shard.models), None)
+
+    def shard_for(self, robot_name: str, loads: Optional[list[int]] = None) -> int:
+        """Index of the shard a robot goes to under the shard policy.
+
+        Args:
+            robot_name: Robot to place
+            loads: Robots per shard to balance against (default: the shards' current models)
+        """
+        index = self.shard_of(robot_name)
+        if index is not None:
+            return index
+        if self.policy == 'sys_id':
+            return int(daemons[robot_name].env_get('MAVLINK_SYS_ID', 0)) % len(self.shards)
+        loads = loads or [len(shard.models) for shard in self.shards]
+        return loads.index(min(loads))
+
+    async def prep_bot(self, model_name: str ='bot', model_type: str='spiri_mu_no_gimbal', ip: str='127.0.0.1'):
+        await self.shards[self.shard_for(model_name)].prep_bot(model_name, model_type, ip)
+
+    async def spawn_many(self, robot_names: list[str], layout: str = 'grid', spacing: float = 2.0) -> list[str]:
+        """Add several robots, with one create request per shard. See World.spawn_many.
+
+        A shard that fails doesn't stop the others, the robots added to them are
+        still returned.
+        """
+        loads = [len(shard.models) for shard in self.shards]
+        groups: list[list[str]] = [[] for _ in self.shards]
+        for name in robot_names:
+            index = self.shard_for(name, loads)
+            loads[index] += 1
+            groups[index].append(name)
+        targets = [(shard, group) for shard, group in zip(self.shards, groups) if group]
+        results = await asyncio.gather(*(shard.spawn_many(group, layout, spacing) for shard, group in targets), return_exceptions=True)
+        added = []
+        for (shard, group), result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to add {', '.join(group)} to {shard.key}: {result}")
+            else:
+                added += result
+        return added
+
+    async def remove_many(self, robot_names: list[str]) -> list[str]:
+        removed = await asyncio.gather(*(shard.remove_many(robot_names) for shard in self.shards))
+        return [name for names in removed for name in names]
+
+    async def run_world(self) -> None:
+        await asyncio.gather(*(shard.run_world() for shard in self.shards))
+
+    async def ready(self, timeout: Optional[float] = None) -> None:
+        await asyncio.gather(*(shard.ready(timeout) for shard in self.shards))
+
+    async def reset(self, name):
+        await self.end_gz_proc()
+        for shard in self.shards:
+            shard.name = name
+        await self.run_world()
+
+    async def end_gz_proc(self) -> None:
+        await asyncio.gather(*(shard.end_gz_proc() for shard in self.shards))
 
-    
-    def kill_model(self):
-        
-        # http://osrf-distributions.s3.amazonaws.com/gazebo/api/7.1.0/classgazebo_1_1physics_1_1Entity.html
-        ENTITY_TYPE_MODEL = 0x00000002
-        REQUEST_ARG = f"name: '{self.name}' type: {ENTITY_TYPE_MODEL}"
-        
-        GZ_SERVICE_CMD = [
-            "gz",
-            "service",
-            "-s",
-            f"/world/{self.parent.name}/remove",
-            "--reqtype",
-            "gz.msgs.Entity",
-            "--reptype",
-            "gz.msgs.Boolean",
-            "--timeout",
-            "5000",
-            "--req",
-            REQUEST_ARG
-        ]
-        remove_entity_proc = subprocess.Popen(
-            GZ_SERVICE_CMD,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        
-        out, err = remove_entity_proc.communicate(timeout=3)
-        remove_entity_proc.kill()
-        del self.parent.models[self.name]
 
 running_world = get_running_worlds()
 if len(running_world) > 0:
-    gz_world = World(running_world[0])
+    # Shards of an earlier run are found by their partition keys
+    gz_world = ShardedWorld(running_world[0].split('@')[0])
 else:
-    gz_world = World('empty_world')
\ No newline at end of file
+    gz_world = ShardedWorld('empty_world')
+
+
+# Isolated world instances running next to gz_world, by instance number
+isolated_worlds: dict[int, World] = {}
+
+async def launch_isolated_world(name: str, headless: bool = True, render_engine: str = GZ_RENDER_ENGINE) -> World:
+    """Start another world in its own partition, e.g. one per parallel simulation job.
+
+    Returns:
+        World: The new world, already starting; await world.ready() before spawning into it
+    """
+    used = {world.instance for world in all_worlds()}
+    instance = next(number for number in itertools.count(1) if number not in used)
+    world = isolated_worlds[instance] = World(name, headless=headless, render_engine=render_engine, instance=instance)
+    await world.run_world()
+    return world
+
+async def stop_isolated_world(world: World) -> None:
+    """Stop an isolated world and free its instance number."""
+    await world.end_gz_proc()
+    isolated_worlds.pop(world.instance, None)
+
+def all_worlds() -> list[World]:
+    """The shards of gz_world followed by every isolated world."""
+    return [*gz_world.shards, *isolated_worlds.values()]
@@ -0,0 +1,325 @@
+"""
+Async bridge to the Gazebo world services used to spawn and remove robots.
+
+Requests go over gz-transport, in order of preference:
+- in-process, when the gz-transport bindings can be imported
+- through one long-lived helper process running the system interpreter, which
+  usually has the bindings when the SDK's virtualenv doesn't (GZ_PYTHON)
+- through the `gz service` CLI, one process per request, as a last resort
+
+Worlds running in their own GZ_PARTITION get their own bridge from bridge_for(),
+which talks to them through the helper or the CLI with that partition set.
+
+Typical usage:
+    await gz_bridge.spawn("empty_world", "spiri_mu_1", "/path/to/model.sdf", (1, 0, 0.3))
+    await gz_bridge.spawn_many("empty_world", [("spiri_mu_2", "/path/to/model.sdf", (2, 0, 0.3)), ...])
+    await gz_bridge.remove("empty_world", "spiri_mu_1")
+    await bridge_for({"GZ_PARTITION": "spirisdk_1"}).spawn("empty_world", ...)
+"""
+
+import asyncio, itertools, json, os, subprocess
+
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+from spiriSdk.settings import GZ_PYTHON
+
+try:
+    from gz.msgs10.boolean_pb2 import Boolean
+    from gz.msgs10.entity_factory_pb2 import EntityFactory
+    from gz.msgs10.entity_factory_v_pb2 import EntityFactory_V
+    from gz.msgs10.entity_pb2 import Entity
+    from gz.transport13 import Node
+except ImportError:
+    Node = None
+
+HELPER_SCRIPT = Path(__file__).with_name("gz_bridge_helper.py")
+
+# Model name, absolute SDF path and x, y, z position of a model to spawn
+EntitySpec = Tuple[str, str, Sequence[float]]
+
+
+def _entity(name: str, sdf_file: str, position: Sequence[float]) -> dict:
+    x, y, z = (float(value) for value in position[:3])
+    return {"name": name, "sdf_filename": str(sdf_file), "position": [x, y, z]}
+
+
+class GzBridge:
+    """Serves spawn and remove requests for Gazebo worlds over one persistent connection.
+
+    Args:
+        timeout_ms: Timeout of each service request in milliseconds (default: 5000)
+        env: gz-transport environment of the worlds to talk to, e.g. GZ_PARTITION.
+            The in-process bindings read it once per process, so a bridge with
+            its own environment always uses the helper or the CLI.
+    """
+
+    def __init__(self, timeout_ms: int = 5000, env: Optional[Dict[str, str]] = None):
+        self.timeout_ms = timeout_ms
+        self.env = dict(env or {})
+        self.backend: Optional[str] = None
+        self._node = None
+        self._helper: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._stderr_reader: Optional[asyncio.Task] = None
+        # Last lines the helper wrote to stderr, to tell why it exited
+        self._stderr_tail: deque = deque(maxlen=20)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._lock = asyncio.Lock()
+
+    async def spawn(self, world: str, name: str, sdf_file: str, position: Sequence[float]) -> bool:
+        """Spawn a model from an SDF file into a world.
+
+        Args:
+            world: Name of the running world
+            name: Name of the new model
+            sdf_file: Absolute path of the model's SDF file
+            position: x, y, z of the model in the world
+
+        Returns:
+            bool: True if the world created the model
+        """
+        return await self._request("create", f"/world/{world}/create", **_entity(name, sdf_file, position))
+
+    async def spawn_many(self, world: str, entities: Sequence[EntitySpec]) -> bool:
+        """Spawn several models with a single create_multiple request.
+
+        Args:
+            world: Name of the running world
+            entities: Name, SDF file and position of each model
+
+        Returns:
+            bool: True if the world created the models
+        """
+        return await self._request(
+            "create_multiple",
+            f"/world/{world}/create_multiple",
+            name=", ".join(name for name, _, _ in entities),
+            entities=[_entity(*entity) for entity in entities],
+        )
+
+    async def remove(self, world: str, name: str) -> bool:
+        """Remove a model from a world.
+
+        Returns:
+            bool: True if the world removed the model
+        """
+        return await self._request("remove", f"/world/{world}/remove", name=name)
+
+    async def services(self) -> List[str]:
+        """Services currently advertised on the gz-transport network, empty if they can't be listed."""
+        backend = await self._backend()
+        try:
+            if backend == "in-process":
+                return list(await asyncio.to_thread(self._node.service_list))
+            if backend == "helper":
+                return (await self._call_helper({"op": "services"}))["services"]
+            proc = await asyncio.create_subprocess_exec(
+                "gz", "service", "--list",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=self._environ(),
+            )
+            out, _ = await asyncio.wait_for(proc.communicate(), timeout=self.timeout_ms / 1000 + 5)
+            return out.decode(errors="replace").split()
+        except Exception as e:
+            logger.debug(f"Listing Gazebo services failed: {e}")
+            return []
+
+    async def wait_for_service(self, service: str, timeout: float) -> bool:
+        """Wait until a service is advertised, e.g. a world's /create once the world has loaded.
+
+        Returns:
+            bool: True if the service showed up within timeout seconds
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        delay = 0.1
+        while True:
+            if service in await self.services():
+                return True
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 1.0)
+
+    async def close(self) -> None:
+        """Stop the helper process, if one is running."""
+        if self._helper is not None and self._helper.returncode is None:
+            self._helper.stdin.close()
+            try:
+                await asyncio.wait_for(self._helper.wait(), timeout=2)
+            except asyncio.TimeoutError:
+                self._helper.kill()
+        self._helper = None
+        self.backend = None
+
+    def _environ(self) -> Optional[Dict[str, str]]:
+        return {**os.environ, **self.env} if self.env else None
+
+    async def _request(self, op: str, service: str, **fields) -> bool:
+        backend = await self._backend()
+        try:
+            if backend == "in-process":
+                return await asyncio.to_thread(self._request_in_process, op, service, **fields)
+            if backend == "helper":
+                return await self._request_helper(op, service, **fields)
+            return await self._request_cli(op, service, **fields)
+        except Exception as e:
+            logger.error(f"Gazebo request {service} for {fields['name']} failed: {e}")
+            return False
+
+    async def _backend(self) -> str:
+        async with self._lock:
+            if self.backend == "helper" and (self._helper is None or self._helper.returncode is not None):
+                logger.warning("Gazebo bridge helper exited, restarting it")
+                self.backend = None
+            if self.backend is None:
+                if Node is not None and not self.env:
+                    self._node = self._node or Node()
+                    self.backend = "in-process"
+                elif await self._start_helper():
+                    self.backend = "helper"
+                else:
+                    logger.warning("gz-transport bindings not found, falling back to the gz service CLI")
+                    self.backend = "cli"
+                logger.info(f"Gazebo bridge using {self.backend} gz-transport" + (f" with {self.env}" if self.env else ""))
+            return self.backend
+
+    def _request_in_process(self, op: str, service: str, name: str, **fields) -> bool:
+        def fill(factory, entity: dict) -> None:
+            factory.sdf_filename = entity["sdf_filename"]
+            factory.name = entity["name"]
+            factory.pose.position.x, factory.pose.position.y, factory.pose.position.z = entity["position"]
+            factory.allow_renaming = False
+
+        if op == "create":
+            message = EntityFactory()
+            fill(message, {"name": name, **fields})
+        elif op == "create_multiple":
+            message = EntityFactory_V()
+            for entity in fields["entities"]:
+                fill(message.data.add(), entity)
+        else:
+            message = Entity()
+            message.name = name
+            message.type = Entity.MODEL
+        result, response = self._node.request(service, message, type(message), Boolean, self.timeout_ms)
+        return bool(result and response.data)
+
+    async def _start_helper(self) -> bool:
+        try:
+            self._helper = await asyncio.create_subprocess_exec(
+                GZ_PYTHON, "-u", str(HELPER_SCRIPT),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self._environ(),
+            )
+        except OSError as e:
+            logger.debug(f"Can't start Gazebo bridge helper with {GZ_PYTHON}: {e}")
+            return False
+        # Drained for the helper's whole life, gz-transport warnings would fill the pipe and block it
+        self._stderr_tail.clear()
+        self._stderr_reader = asyncio.create_task(self._drain_helper_stderr(self._helper))
+        # The helper exits straight away if the interpreter lacks the bindings
+        try:
+            await asyncio.wait_for(self._helper.wait(), timeout=1)
+            await self._stderr_reader
+            logger.debug(f"Gazebo bridge helper exited: {self._stderr_tail[-1] if self._stderr_tail else self._helper.returncode}")
+            self._helper = None
+            return False
+        except asyncio.TimeoutError:
+            pass
+        self._reader = asyncio.create_task(self._read_helper(self._helper))
+        return True
+
+    async def _drain_helper_stderr(self, helper: asyncio.subprocess.Process) -> None:
+        while True:
+            try:
+                raw_line = await helper.stderr.readline()
+            except ValueError:
+                # Line over the reader's limit, readline already dropped it
+                continue
+            if not raw_line:
+                return
+            line = raw_line.decode(errors="replace").strip()
+            if line:
+                self._stderr_tail.append(line)
+                logger.debug(f"Gazebo bridge helper: {line}")
+
+    async def _read_helper(self, helper: asyncio.subprocess.Process) -> None:
+        async for line in helper.stdout:
+            reply = json.loads(line)
+            future = self._pending.pop(reply["id"], None)
+            if future is not None and not future.done():
+                if reply.get("error"):
+                    future.set_exception(RuntimeError(reply["error"]))
+                else:
+                    future.set_result(reply)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Gazebo bridge helper exited"))
+        self._pending.clear()
+
+    async def _request_helper(self, op: str, service: str, **fields) -> bool:
+        reply = await self._call_helper({"op": op, "service": service, "timeout_ms": self.timeout_ms, **fields})
+        return reply["ok"]
+
+    async def _call_helper(self, request: dict) -> dict:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._helper.stdin.write((json.dumps({"id": request_id, **request}) + "\n").encode())
+        await self._helper.stdin.drain()
+        try:
+            return await asyncio.wait_for(future, timeout=self.timeout_ms / 1000 + 1)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _request_cli(self, op: str, service: str, name: str, **fields) -> bool:
+        def text(entity: dict) -> str:
+            x, y, z = entity["position"]
+            return f'sdf_filename: "{entity["sdf_filename"]}" name: "{entity["name"]}" pose: {{position: {{x: {x} y: {y} z: {z}}}}}'
+
+        if op == "create":
+            reqtype = "gz.msgs.EntityFactory"
+            request = text({"name": name, **fields})
+        elif op == "create_multiple":
+            reqtype = "gz.msgs.EntityFactory_V"
+            request = " ".join(f"data: {{{text(entity)}}}" for entity in fields["entities"])
+        else:
+            reqtype = "gz.msgs.Entity"
+            request = f"name: '{name}' type: MODEL"
+        proc = await asyncio.create_subprocess_exec(
+            "gz", "service", "-s", service,
+            "--reqtype", reqtype, "--reptype", "gz.msgs.Boolean",
+            "--timeout", str(self.timeout_ms), "--req", request,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self._environ(),
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout=self.timeout_ms / 1000 + 5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            raise subprocess.TimeoutExpired("gz service", self.timeout_ms / 1000)
+        return b"data: true" in out
+
+
+gz_bridge = GzBridge()
+_bridges: Dict[Tuple[Tuple[str, str], ...], GzBridge] = {}
+
+
+def bridge_for(env: Optional[Dict[str, str]] = None) -> GzBridge:
+    """The bridge for worlds running with a gz-transport environment, shared by all its callers."""
+    if not env:
+        return gz_bridge
+    key = tuple(sorted(env.items()))
+    if key not in _bridges:
+        _bridges[key] = GzBridge(gz_bridge.timeout_ms, env)
+    return _bridges[key]
@@ -0,0 +1,55 @@
+"""
+Long-lived gz-transport helper for interpreters that can't import the Gazebo bindings.
+
+The SDK's virtualenv usually can't see the gz-transport Python bindings installed
+by the system packages. This script runs under the system interpreter instead and
+serves spawn/remove requests and service listings read as JSON lines on stdin, answering each with a
+JSON line on stdout. It deliberately imports nothing from the SDK.
+"""
+
+import json, sys
+
+from gz.msgs10.boolean_pb2 import Boolean
+from gz.msgs10.entity_factory_pb2 import EntityFactory
+from gz.msgs10.entity_factory_v_pb2 import EntityFactory_V
+from gz.msgs10.entity_pb2 import Entity
+from gz.transport13 import Node
+
+
+def fill(factory, entity: dict) -> None:
+    factory.sdf_filename = entity["sdf_filename"]
+    factory.name = entity["name"]
+    factory.pose.position.x, factory.pose.position.y, factory.pose.position.z = entity["position"]
+    factory.allow_renaming = False
+
+
+def main() -> None:
+    node = Node()
+    for line in sys.stdin:
+        request = json.loads(line)
+        try:
+            if request["op"] == "services":
+                sys.stdout.write(json.dumps({"id": request["id"], "ok": True, "services": list(node.service_list())}) + "\n")
+                sys.stdout.flush()
+                continue
+            if request["op"] == "create":
+                message = EntityFactory()
+                fill(message, request)
+            elif request["op"] == "create_multiple":
+                message = EntityFactory_V()
+                for entity in request["entities"]:
+                    fill(message.data.add(), entity)
+            else:
+                message = Entity()
+                message.name = request["name"]
+                message.type = Entity.MODEL
+            result, response = node.request(request["service"], message, type(message), Boolean, request["timeout_ms"])
+            reply = {"id": request["id"], "ok": bool(result and response.data)}
+        except Exception as e:
+            reply = {"id": request["id"], "ok": False, "error": str(e)}
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""
+Persistent leases of MAVLink system IDs and SITL port blocks for robots.
+
+Every robot holds one lease: its system ID and a SITL instance number. The
+instance picks the robot's block of ports, ArduPilot's TCP ports 5760+10n
+inside its DinD and the FDM port 9002+10n Gazebo binds on the host. Instances
+default to the system ID, as they used to, but are moved when that block
+clashes with a reserved port or a host port that is already bound.
+
+Leases are kept in SDK_ROOT/cache/leases.json, so robots keep their ports
+across SDK restarts.
+
+Typical usage:
+    lease = leases.lease("spiri_mu_3", 3)
+    lease.env()          # {"MAVLINK_SYS_ID": "3", "SITL_INSTANCE": "3", ...}
+    lease.xacro_args()   # {"fdm_port_in": 9032}
+"""
+
+import json, os, socket, threading
+
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from loguru import logger
+
+from spiriSdk.settings import SDK_ROOT
+
+LEASES_FILE = SDK_ROOT / "cache" / "leases.json"
+
+MAX_SYS_ID = 254
+MAX_INSTANCE = 1000
+
+# Ports no robot's block may include: mavproxy's fixed tcpin and udpout ports,
+# and the gz-transport discovery ports of up to 32 Gazebo worlds
+RESERVED_PORTS = frozenset({5760, 14552, *range(10317, 10317 + 64)})
+
+
+@dataclass(frozen=True)
+class Lease:
+    """A robot's system ID and SITL instance."""
+
+    robot: str
+    sys_id: int
+    instance: int
+
+    @property
+    def ardupilot_port(self) -> int:
+        """ArduPilot's first TCP port, inside the robot's DinD."""
+        return 5760 + 10 * self.instance
+
+    @property
+    def fdm_port(self) -> int:
+        """UDP port of the Gazebo plugin exchanging FDM data with SITL, on the host."""
+        return 9002 + 10 * self.instance
+
+    def env(self) -> Dict[str, str]:
+        """Variables for the robot's config.env, used by its compose files."""
+        return {
+            "MAVLINK_SYS_ID": str(self.sys_id),
+            "SITL_INSTANCE": str(self.instance),
+            "ARDUPILOT_PORT": str(self.ardupilot_port),
+            "FDM_PORT": str(self.fdm_port),
+        }
+
+    def xacro_args(self) -> Dict[str, int]:
+        """Args for the robot's Gazebo model template."""
+        return {"fdm_port_in": self.fdm_port}
+
+
+def _blocks(instance: int) -> Iterable[int]:
+    """ArduPilot's TCP ports and the FDM ports of a SITL instance."""
+    return [*range(5760 + 10 * instance, 5770 + 10 * instance), *range(9002 + 10 * instance, 9012 + 10 * instance)]
+
+
+def _udp_port_free(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.bind(("", port))
+        except OSError:
+            return False
+    return True
+
+
+class LeaseAllocator:
+    """Hands out system IDs and SITL instances, at most one lease per robot.
+
+    Lookups and conflict checks are dict lookups. Safe to use from worker threads.
+
+    Args:
+        path: JSON file the leases are kept in (default: LEASES_FILE)
+    """
+
+    def __init__(self, path: Path = LEASES_FILE):
+        self.path = path
+        self._leases: Dict[str, Lease] = {}
+        self._sys_ids: Dict[int, str] = {}
+        self._instances: Dict[int, str] = {}
+        self._lock = threading.RLock()
+        self._load()
+
+    def get(self, robot: str) -> Optional[Lease]:
+        """The robot's lease, or None if it has none."""
+        return self._leases.get(robot)
+
+    def sys_id_free(self, sys_id: int, robot: Optional[str] = None) -> bool:
+        """Whether a system ID can be leased, optionally by a robot that may already hold it."""
+        return self._sys_ids.get(sys_id, robot) == robot
+
+    def lease(self, robot: str, sys_id: int) -> Lease:
+        """Lease a system ID and a SITL instance to a robot, or return the lease it already holds.
+
+        A robot that asks for another system ID gets a new lease, keeping its
+        instance if it can.
+
+        Raises:
+            ValueError: If the system ID is out of range or leased to another robot
+            RuntimeError: If no SITL instance is free
+        """
+        sys_id = int(sys_id)
+        with self._lock:
+            current = self._leases.get(robot)
+            if current is not None and current.sys_id == sys_id:
+                return current
+            if not 1 <= sys_id <= MAX_SYS_ID:
+                raise ValueError(f"System ID {sys_id} out of range 1-{MAX_SYS_ID}")
+            if not self.sys_id_free(sys_id, robot):
+                raise ValueError(f"System ID {sys_id} already leased to {self._sys_ids[sys_id]}")
+
+            if current is not None:
+                instance = current.instance
+                del self._sys_ids[current.sys_id]
+            else:
+                instance = self._free_instance(sys_id)
+            lease = self._leases[robot] = Lease(robot, sys_id, instance)
+            self._sys_ids[sys_id] = robot
+            self._instances[instance] = robot
+            self._save()
+        if instance != sys_id:
+            logger.info(f"{robot} got SITL instance {instance}, instance {sys_id} is taken or clashes with a port in use")
+        return lease
+
+    def release(self, robot: str) -> None:
+        """Return a robot's lease, e.g. once the robot is deleted."""
+        with self._lock:
+            if self._release(robot):
+                self._save()
+
+    def retain(self, robots: Iterable[str]) -> None:
+        """Release the leases of every robot not listed, e.g. robots deleted while the SDK was down."""
+        keep = set(robots)
+        with self._lock:
+            stale = [robot for robot in self._leases if robot not in keep]
+            for robot in stale:
+                logger.debug(f"Releasing lease of {robot}, the robot no longer exists")
+                self._release(robot)
+            if stale:
+                self._save()
+
+    def _release(self, robot: str) -> bool:
+        """Drop a robot's lease without saving, returning whether it had one."""
+        lease = self._leases.pop(robot, None)
+        if lease is None:
+            return False
+        self._sys_ids.pop(lease.sys_id, None)
+        self._instances.pop(lease.instance, None)
+        return True
+
+    def _free_instance(self, preferred: int) -> int:
+        candidates = [preferred, *(n for n in range(1, MAX_INSTANCE + 1) if n != preferred)]
+        for instance in candidates:
+            if instance in self._instances:
+                continue
+            if any(port in RESERVED_PORTS for port in _blocks(instance)):
+                continue
+            if not _udp_port_free(9002 + 10 * instance):
+                continue
+            return instance
+        raise RuntimeError(f"No free SITL instance below {MAX_INSTANCE}")
+
+    def _load(self) -> None:
+        try:
+            entries = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable leases file {self.path}: {e}")
+            return
+        for entry in entries:
+            lease = Lease(**entry)
+            self._leases[lease.robot] = lease
+            self._sys_ids[lease.sys_id] = lease.robot
+            self._instances[lease.instance] = lease.robot
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps([asdict(lease) for lease in self._leases.values()], indent=2))
+        tmp_path.replace(self.path)
+
+
+leases = LeaseAllocator()
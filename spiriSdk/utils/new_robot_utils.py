@@ -1,12 +1,16 @@
-import yaml, re, uuid, shutil, dotenv
+import yaml, uuid, shutil
 
 from nicegui import ui, run
 from pathlib import Path
 from loguru import logger
 
 from spiriSdk.docker.dindocker import DockerInDocker
-from spiriSdk.utils.daemon_utils import daemons, start_services, active_sys_ids
+from spiriSdk.docker.image_store import clone_store, remove_store, robot_type_of
+from spiriSdk.docker.status_cache import forget_daemon
+from spiriSdk.utils.daemon_utils import daemons, start_services, startup_progress, lease_robot
 from spiriSdk.utils.InputChecker import InputChecker
+from spiriSdk.utils.leases import leases
+from spiriSdk.utils.service_catalog import service_catalog
 
 ROOT_DIR = Path(__file__).parents[2].absolute()
 ROBOTS_DIR = ROOT_DIR / 'robots'
@@ -16,43 +20,27 @@ robots = [folder.name for folder in ROBOTS_DIR.iterdir() if folder.exists()]
 
 def ensure_options_yaml():
     robots = []
-    for folder in ROBOTS_DIR.iterdir():
-        if folder.exists():
-            robots.append(folder.name)  # Add to the robots list
-            options_path = folder / 'options.yaml'
-            if not options_path.exists():
-                # Create a default options.yaml file
-                services_path = folder / "services"
-                if not services_path.exists():
-                    ui.notify(f"Services folder not found under {folder}", type="error")
-                    continue
-                service_folders = [p for p in services_path.iterdir() if p.is_dir()]
-                if not service_folders:
-                    ui.notify(f"No service folders found under {services_path}", type="error")
-                    continue
-
-                compose_file = service_folders[0] / "docker-compose.yaml"
-                if not compose_file.exists():
-                    compose_file = service_folders[0] / "docker-compose.yml"
-                    if not compose_file.exists():
-                        ui.notify(f"{compose_file} not found!", type="error")
-                        continue
-        
-                compose_text = compose_file.read_text()
-                variables = set(re.findall(r'\$[{]?([A-Z_][A-Z0-9_]*)[}]?', compose_text))
-
-                default_options = {'x-spiri-options': {}}
-                for var in variables:
-                    logger.debug(f"Detected variable: {var}")
-                    if var not in default_options["x-spiri-options"]:
-                        default_options["x-spiri-options"][var] = {
-                            "type": "text",  # Default type (can be adjusted if needed)
-                            "value": 0,  # Default to spiri.env value if available
-                            "help-text": f"Auto-detected variable {var}"
-                        }
-
-                with open(options_path, 'w') as yaml_file:
-                    yaml.dump(default_options, yaml_file)
+    for robot_type in service_catalog.robot_types():
+        robots.append(robot_type)  # Add to the robots list
+        entry = service_catalog.robot_type(robot_type)
+        options_path = entry.path / 'options.yaml'
+        if entry.options is None:
+            # Create a default options.yaml file
+            if not entry.services:
+                ui.notify(f"No services with a docker-compose file found under {entry.path / 'services'}", type="error")
+                continue
+
+            default_options = {'x-spiri-options': {}}
+            for var in sorted(entry.variables):
+                logger.debug(f"Detected variable: {var}")
+                default_options["x-spiri-options"][var] = {
+                    "type": "text",  # Default type (can be adjusted if needed)
+                    "value": 0,  # Default to spiri.env value if available
+                    "help-text": f"Auto-detected variable {var}"
+                }
+
+            with open(options_path, 'w') as yaml_file:
+                yaml.dump(default_options, yaml_file)
 
     return robots
 
@@ -64,22 +52,27 @@ async def save_robot_config(robot_type, selected_options, dialog):
     folder_name = f"{robot_type}_{robot_id}"
     folder_path = ROOT_DIR / 'data' / folder_name
 
+    created = not folder_path.exists()
     folder_path.mkdir(parents=True, exist_ok=True)
     
     new_daemon = DockerInDocker(image_name="docker:dind", container_name=folder_name)
 
-    config_path = new_daemon.robot_env
-    dotenv.set_key(config_path, 'ROBOT_NAME', folder_name)
-    for key, value in selected_options.items():
-        if 'DESC' in key:
-            if value:
-                dotenv.set_key(config_path, key, value)
-        else:
-            dotenv.set_key(config_path, key, str(value))
+    # Empty descriptions are left out
+    config = {key: value for key, value in selected_options.items() if value or 'DESC' not in key}
+    new_daemon.config.update({'ROBOT_NAME': folder_name, **config})
+    if 'MAVLINK_SYS_ID' in selected_options:
+        try:
+            await run.io_bound(lease_robot, folder_name, int(robot_id))
+        except (ValueError, RuntimeError) as e:
+            logger.error(f"Can't lease a system ID and ports to {folder_name}: {e}")
+            ui.notify(f"Can't add {folder_name}: {e}", type='negative')
+            # Leave no half-made robot behind for the next start to pick up
+            if created:
+                shutil.rmtree(folder_path, ignore_errors=True)
+            return
     
     await run.io_bound(new_daemon.ensure_started)
     daemons[folder_name] = new_daemon
-    active_sys_ids.append(robot_id)
     
     dialog.close()  # Close the dialog after saving
 
@@ -90,30 +83,86 @@ async def save_robot_config(robot_type, selected_options, dialog):
     # ui.notify(f"Saved config.env and started daemon for {folder_name}")
     ui.notify(f"Robot {folder_name} added successfully!", type='positive')
 
+def clone_daemon_store(source: DockerInDocker, target: DockerInDocker):
+    """Clone a robot's image store, pausing the robot so the copy is consistent."""
+    container = source.container
+    paused = False
+    if container is not None:
+        container.reload()
+        if container.status == 'running':
+            container.pause()
+            paused = True
+    try:
+        clone_store(source.docker_store, target.docker_store)
+    finally:
+        if paused:
+            container.unpause()
+
+async def clone_robot(source_name: str, sys_id: int) -> str:
+    """Create a new robot with the configuration and images of an existing one."""
+    folder_name = f"{robot_type_of(source_name)}_{sys_id}"
+    if folder_name in daemons or not leases.sys_id_free(sys_id):
+        raise RuntimeError(f"System ID {sys_id} already in use")
+    logger.info(f"Cloning robot {source_name} to {folder_name}")
+
+    source = daemons[source_name]
+    folder_path = ROOT_DIR / 'data' / folder_name
+    folder_path.mkdir(parents=True)
+    new_daemon = None
+    cloned = False
+    try:
+        shutil.copy(source.robot_env, folder_path / 'config.env')
+
+        new_daemon = DockerInDocker(image_name="docker:dind", container_name=folder_name)
+        new_daemon.config.set('ROBOT_NAME', folder_name)
+        await run.io_bound(lease_robot, folder_name, sys_id)
+        await run.io_bound(clone_daemon_store, source, new_daemon)
+        cloned = True
+
+        await run.io_bound(new_daemon.ensure_started)
+    except Exception as e:
+        # Leave no half-made robot behind, so the system ID is free to try again
+        logger.error(f"Cloning {source_name} to {folder_name} failed, rolling back: {e}")
+        if new_daemon is not None:
+            await run.io_bound(new_daemon.cleanup)
+            if cloned:
+                try:
+                    await run.io_bound(remove_store, new_daemon.docker_store)
+                except RuntimeError as remove_error:
+                    logger.warning(remove_error)
+        await run.io_bound(leases.release, folder_name)
+        shutil.rmtree(folder_path, ignore_errors=True)
+        raise
+    daemons[folder_name] = new_daemon
+
+    from spiriSdk.utils.card_utils import displayCards
+    displayCards.refresh()
+    await start_services(folder_name)
+    logger.success(f"Robot {source_name} cloned to {folder_name}")
+    return folder_name
+
 async def delete_robot(robot_name: str) -> bool:
     logger.info(f"Deleting robot {robot_name}")
     robot_path = ROOT_DIR / 'data' / robot_name
     daemon = daemons.pop(robot_name)
+    startup_progress.pop(robot_name, None)
     from spiriSdk.utils.card_utils import displayCards
     displayCards.refresh()
+    await forget_daemon(robot_name)
     daemon.cleanup()
-    robot_sys = str(robot_name).rsplit('_', 1)
-    active_sys_ids.remove(int(robot_sys[1]))
+    leases.release(robot_name)
     if robot_path.exists():
         shutil.rmtree(robot_path)
     logger.success(f"Robot {robot_name} deleted successfully")
     return True
 
 def display_robot_options(robot_type: str, selected_options, options_container: ui.column, checker: InputChecker):
-    options_path = ROBOTS_DIR / robot_type / 'options.yaml'
-    if not options_path.exists():
+    options = service_catalog.options(robot_type)
+    if options is None:
         options_container.clear()
         with options_container:
             ui.label(f'No options.yaml found for {robot_type}')
         return
-
-    with open(options_path, 'r') as yaml_file:
-        options = yaml.safe_load(yaml_file)
     
     format_rules = {
         'Mavlink': 'MAVLink',
@@ -168,7 +217,7 @@ def display_robot_options(robot_type: str, selected_options, options_container:
                     validation={
                         'Field cannot be empty': lambda value: value,
                         'Value must be an integer between 1 and 254': lambda value, minVal=min_val, maxVal = max_val: str(value).isdigit() and float(value) >= minVal and float(value) <= maxVal,
-                        'System ID already in use': lambda value: int(value) not in active_sys_ids
+                        'System ID already in use': lambda value: leases.sys_id_free(int(value))
                     }
                 ).classes('w-full pb-1')
                 
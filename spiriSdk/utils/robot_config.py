@@ -0,0 +1,143 @@
+"""
+Cached access to robots' config.env files.
+
+Each config.env is parsed once and re-read only when its mtime changes, so
+reading a value costs a stat() call. Updates are batched into a single write
+to a temporary file that replaces config.env, so compose never sees a half
+written file. Every reader of the same file shares one RobotConfig.
+
+Typical usage:
+    config = config_for(DATA_DIR / "spiri_mu_3" / "config.env")
+    config.sys_id
+    config.update({"SIM_ADDRESS": "10.0.0.2", "GROUND_CONTROL_ADDRESS": "10.0.0.3"})
+"""
+
+import io, os, threading
+
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+from dotenv import dotenv_values
+from dotenv.parser import parse_stream
+
+
+def _quote(value: str) -> str:
+    """Quote a value the way dotenv.set_key does, so it reads back unchanged."""
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+class RobotConfig:
+    """One robot's config.env.
+
+    Safe to use from worker threads.
+
+    Args:
+        path: The config.env file
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._values: Dict[str, str] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.RLock()
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def values(self) -> Dict[str, str]:
+        """Every variable in the file.
+
+        Raises:
+            RuntimeError: If the file doesn't exist
+        """
+        with self._lock:
+            self._refresh()
+            return dict(self._values)
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """A variable's value, or default if it isn't set.
+
+        Raises:
+            RuntimeError: If the file doesn't exist
+        """
+        with self._lock:
+            self._refresh()
+            return self._values.get(key, default)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """A variable's value as an integer, or default if it isn't set or empty."""
+        value = self.get(key)
+        return int(value) if value else default
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.get("ROBOT_NAME")
+
+    @property
+    def sys_id(self) -> int:
+        return self.get_int("MAVLINK_SYS_ID")
+
+    @property
+    def description(self) -> Optional[str]:
+        """The robot's description, from the first non-empty *DESC* variable."""
+        return next((value for key, value in self.values().items() if "DESC" in key and value), None)
+
+    def set(self, key: str, value: Any) -> None:
+        """Set one variable, see update."""
+        self.update({key: value})
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        """Set several variables with one write, creating the file if needed.
+
+        Other variables, comments and the order of the lines are kept.
+
+        Args:
+            values: Variables to set, values are converted with str()
+        """
+        pending = {key: str(value) for key, value in values.items()}
+        with self._lock:
+            try:
+                original = self.path.read_text()
+            except FileNotFoundError:
+                original = ""
+
+            out = io.StringIO()
+            for mapping in parse_stream(io.StringIO(original)):
+                if mapping.key in pending:
+                    out.write(f"{mapping.key}={_quote(pending.pop(mapping.key))}\n")
+                else:
+                    out.write(mapping.original.string)
+            if pending and out.tell() and not out.getvalue().endswith("\n"):
+                out.write("\n")
+            for key, value in pending.items():
+                out.write(f"{key}={_quote(value)}\n")
+
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(out.getvalue())
+            tmp_path.replace(self.path)
+            self._stamp = None
+
+    def _refresh(self) -> None:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            raise RuntimeError(f"Config file {self.path} does not exist")
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            self._values = {key: value for key, value in dotenv_values(self.path).items() if value is not None}
+            self._stamp = stamp
+
+
+_configs: Dict[Path, RobotConfig] = {}
+_configs_lock = threading.Lock()
+
+
+def config_for(path: Path) -> RobotConfig:
+    """The shared RobotConfig of a config.env file."""
+    path = Path(path).absolute()
+    with _configs_lock:
+        if path not in _configs:
+            _configs[path] = RobotConfig(path)
+        return _configs[path]
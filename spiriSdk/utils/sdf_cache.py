@@ -0,0 +1,91 @@
+"""
+Content-addressed cache of SDF files rendered from xacro templates.
+
+Every render is stored under SDK_ROOT/cache/sdf, named after a hash of the
+template's content and the xacro args. Robots with the same args share one
+render, robots with different args never write to the same file, and a
+template edit changes the hash so stale renders are never used.
+
+Typical usage:
+    sdf_file = await render_sdf(template, {"fdm_port_in": 9012})
+"""
+
+import asyncio, hashlib, json, os
+import xml.etree.ElementTree as ET
+
+from pathlib import Path
+from typing import Any, Dict, Mapping
+from loguru import logger
+
+from spiriSdk.settings import SDK_ROOT
+
+SDF_CACHE_DIR = SDK_ROOT / "cache" / "sdf"
+
+_locks: Dict[str, asyncio.Lock] = {}
+
+
+def render_key(template: Path, args: Mapping[str, Any]) -> str:
+    """Hash identifying the render of a template with a set of xacro args."""
+    digest = hashlib.sha256(template.read_bytes())
+    digest.update(json.dumps({key: str(value) for key, value in args.items()}, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def validate_sdf(sdf_file: Path) -> None:
+    """Check that a rendered file is a complete SDF document with a model.
+
+    Raises:
+        RuntimeError: If the file isn't well-formed XML or holds no model
+    """
+    try:
+        root = ET.parse(sdf_file).getroot()
+    except ET.ParseError as e:
+        raise RuntimeError(f"Rendered SDF {sdf_file} is not valid XML: {e}")
+    if root.tag != "sdf" or root.find("model") is None:
+        raise RuntimeError(f"Rendered SDF {sdf_file} has no <sdf><model> element")
+
+
+async def render_sdf(template: Path, args: Mapping[str, Any]) -> Path:
+    """Render a xacro template, or reuse an earlier render with the same content and args.
+
+    Concurrent calls for the same render wait for one xacro run. The render is
+    written to a temporary file and only moved into the cache once validated.
+
+    Args:
+        template: The .xacro.sdf file
+        args: xacro args, e.g. {"fdm_port_in": 9012}
+
+    Returns:
+        Path: The rendered SDF file
+
+    Raises:
+        RuntimeError: If xacro fails or produces an invalid SDF
+    """
+    template = Path(template).absolute()
+    key = render_key(template, args)
+    target = SDF_CACHE_DIR / f"{key}.sdf"
+    if target.exists():
+        return target
+
+    async with _locks.setdefault(key, asyncio.Lock()):
+        if target.exists():
+            return target
+        SDF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_suffix(f".{os.getpid()}.tmp")
+        proc = await asyncio.create_subprocess_exec(
+            "xacro", *(f"{name}:={value}" for name, value in args.items()), str(template), "-o", str(tmp_path),
+            cwd=template.parent,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, err = await proc.communicate()
+        try:
+            if proc.returncode != 0:
+                raise RuntimeError(f"xacro failed for {template}: {err.decode(errors='replace').strip()}")
+            validate_sdf(tmp_path)
+            tmp_path.replace(target)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    logger.debug(f"Rendered {template.name} with {dict(args)} to {target}")
+    return target
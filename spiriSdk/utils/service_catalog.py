@@ -0,0 +1,226 @@
+"""
+In-memory catalog of robot types, their services and parsed compose files.
+
+Every robot start and every UI interaction used to walk robots/<type>/services
+and re-parse the compose files. The catalog parses each file once and re-reads
+it only when its mtime changes, so lookups cost a directory listing and a few
+stat() calls.
+
+Typical usage:
+    for service in service_catalog.services("spiri_mu"):
+        if service.autostart:
+            ...
+"""
+
+import re, threading, yaml
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+from loguru import logger
+
+from spiriSdk.settings import SDK_ROOT
+
+COMPOSE_FILE_NAMES = ("docker-compose.yaml", "docker-compose.yml")
+VARIABLE_PATTERN = re.compile(r'\$[{]?([A-Z_][A-Z0-9_]*)[}]?')
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+@dataclass
+class Service:
+    """One service folder of a robot type and its parsed compose file."""
+
+    name: str
+    compose_path: Path
+    compose: Dict[str, Any]
+    mtime: Optional[int]
+    autostart: bool = True
+    depends_on: List[str] = field(default_factory=list)
+    variables: Set[str] = field(default_factory=set)
+    images: Set[str] = field(default_factory=set)
+
+    @classmethod
+    def load(cls, compose_path: Path) -> "Service":
+        """Parse a compose file.
+
+        Raises:
+            OSError: If the file can't be read
+            yaml.YAMLError: If the file isn't valid YAML
+        """
+        mtime = _mtime(compose_path)
+        text = compose_path.read_text()
+        compose = yaml.safe_load(text) or {}
+        services = compose.get("services") or {}
+        depends_on = compose.get("x-spiri-sdk-depends-on") or []
+        return cls(
+            name=compose_path.parent.name,
+            compose_path=compose_path,
+            compose=compose,
+            mtime=mtime,
+            autostart=bool(compose.get("x-spiri-sdk-autostart", True)),
+            depends_on=[depends_on] if isinstance(depends_on, str) else [str(name) for name in depends_on],
+            variables=set(VARIABLE_PATTERN.findall(text)),
+            images={str(service["image"]) for service in services.values() if service and service.get("image")},
+        )
+
+
+@dataclass
+class RobotType:
+    """A folder under robots/ with its services and options."""
+
+    name: str
+    path: Path
+    services: Dict[str, Service] = field(default_factory=dict)
+    options: Optional[Dict[str, Any]] = None
+    options_mtime: Optional[int] = None
+
+    @property
+    def variables(self) -> Set[str]:
+        """Variables referenced by any of the robot type's compose files."""
+        return set().union(*(service.variables for service in self.services.values()))
+
+
+def startup_order(services: List[Service]) -> List[List[Service]]:
+    """Group services into levels that can each be started concurrently.
+
+    Every service comes after the services named in its x-spiri-sdk-depends-on.
+    Dependencies on services that aren't in the list are ignored.
+
+    Args:
+        services: Services to order
+
+    Returns:
+        List[List[Service]]: Levels in start order, services sorted by name within a level
+
+    Raises:
+        ValueError: If the dependencies form a cycle
+    """
+    known = {service.name for service in services}
+    dependencies: Dict[str, Set[str]] = {}
+    for service in services:
+        dependencies[service.name] = {name for name in service.depends_on if name in known and name != service.name}
+        for name in set(service.depends_on) - known:
+            logger.warning(f"{service.name} depends on unknown or disabled service {name}, ignoring")
+
+    pending = sorted(services, key=lambda service: service.name)
+    started: Set[str] = set()
+    levels: List[List[Service]] = []
+    while pending:
+        level = [service for service in pending if dependencies[service.name] <= started]
+        if not level:
+            raise ValueError(f"Dependency cycle between services {', '.join(service.name for service in pending)}")
+        started.update(service.name for service in level)
+        pending = [service for service in pending if service.name not in started]
+        levels.append(level)
+    return levels
+
+
+class ServiceCatalog:
+    """Robot types → services → parsed compose, invalidated by file mtimes.
+
+    Safe to use from worker threads.
+
+    Args:
+        robots_dir: Folder holding one sub-folder per robot type
+    """
+
+    def __init__(self, robots_dir: Path = SDK_ROOT / "robots"):
+        self.robots_dir = robots_dir
+        self._types: Dict[str, RobotType] = {}
+        self._robots_mtime: Optional[int] = None
+        self._missing: Set[Path] = set()
+        self._lock = threading.RLock()
+
+    def robot_types(self) -> List[str]:
+        """Names of all robot types, sorted."""
+        with self._lock:
+            self._refresh_types()
+            return sorted(self._types)
+
+    def robot_type(self, name: str) -> Optional[RobotType]:
+        """A robot type with up to date services and options, or None if it doesn't exist."""
+        with self._lock:
+            self._refresh_types()
+            robot_type = self._types.get(name)
+            if robot_type is not None:
+                self._refresh_services(robot_type)
+                self._refresh_options(robot_type)
+            return robot_type
+
+    def services(self, robot_type: str) -> List[Service]:
+        """Services of a robot type, sorted by name."""
+        entry = self.robot_type(robot_type)
+        if entry is None:
+            return []
+        return [entry.services[name] for name in sorted(entry.services)]
+
+    def options(self, robot_type: str) -> Optional[Dict[str, Any]]:
+        """Parsed options.yaml of a robot type, or None if it has none."""
+        entry = self.robot_type(robot_type)
+        return None if entry is None else entry.options
+
+    def images(self) -> Set[str]:
+        """Every image referenced by any robot type's services."""
+        return {image for name in self.robot_types() for service in self.services(name) for image in service.images}
+
+    def invalidate(self) -> None:
+        """Forget everything, e.g. after files were changed within the same mtime tick."""
+        with self._lock:
+            self._types.clear()
+            self._robots_mtime = None
+
+    def _refresh_types(self) -> None:
+        mtime = _mtime(self.robots_dir)
+        if mtime is not None and mtime == self._robots_mtime:
+            return
+        self._robots_mtime = mtime
+        found = {path.name: path for path in self.robots_dir.iterdir() if path.is_dir()} if mtime is not None else {}
+        for name in list(self._types):
+            if name not in found:
+                del self._types[name]
+        for name, path in found.items():
+            self._types.setdefault(name, RobotType(name=name, path=path))
+
+    def _refresh_services(self, robot_type: RobotType) -> None:
+        services_dir = robot_type.path / "services"
+        folders = sorted(path for path in services_dir.iterdir() if path.is_dir()) if services_dir.is_dir() else []
+        services = {}
+        for folder in folders:
+            compose_path = next((folder / name for name in COMPOSE_FILE_NAMES if (folder / name).exists()), None)
+            if compose_path is None:
+                if folder not in self._missing:
+                    self._missing.add(folder)
+                    logger.error(f"docker-compose file not found in {folder}. Skipping.")
+                continue
+            self._missing.discard(folder)
+            cached = robot_type.services.get(folder.name)
+            if cached is not None and cached.compose_path == compose_path and cached.mtime == _mtime(compose_path):
+                services[folder.name] = cached
+                continue
+            try:
+                services[folder.name] = Service.load(compose_path)
+            except (OSError, yaml.YAMLError) as e:
+                logger.error(f"Error reading {compose_path}: {e}")
+        robot_type.services = services
+
+    def _refresh_options(self, robot_type: RobotType) -> None:
+        options_path = robot_type.path / "options.yaml"
+        mtime = _mtime(options_path)
+        if mtime == robot_type.options_mtime:
+            return
+        robot_type.options_mtime = mtime
+        robot_type.options = None
+        if mtime is not None:
+            try:
+                robot_type.options = yaml.safe_load(options_path.read_text()) or {}
+            except (OSError, yaml.YAMLError) as e:
+                logger.error(f"Error reading {options_path}: {e}")
+
+
+service_catalog = ServiceCatalog()
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import tempfile
+import pytest
+from spiriSdk.docker.aiodindocker import AsyncDockerInDocker
+
+@pytest.fixture
+def sdk_root():
+    """Fixture that points SDK_ROOT at a temporary directory."""
+    temp_dir = tempfile.mkdtemp()
+    os.chmod(temp_dir, 0o777)
+    os.environ['SDK_ROOT'] = temp_dir
+    yield temp_dir
+    os.environ.pop('SDK_ROOT', None)
+
+def test_async_dind_lifecycle(sdk_root):
+    """Test starting, using and cleaning up a DinD container without blocking calls."""
+    async def lifecycle():
+        dind = AsyncDockerInDocker(registry_proxy=None)
+        await dind.ensure_started()
+        try:
+            assert dind.get_ip(), "Container should have an IP address"
+            assert list(dind.timings)[-2:] == ["socket", "ping"]
+
+            version = await dind.get_async_client().version()
+            assert version['Version'], "Should get Docker version info from the inner daemon"
+
+            await dind.inject_files({"/opt/spiri/test.txt": "hello"})
+            exit_code, output = await dind.exec("cat /opt/spiri/test.txt")
+            assert exit_code == 0
+            assert output.decode() == "hello"
+        finally:
+            await dind.cleanup()
+        assert dind.container is None
+
+    asyncio.run(lifecycle())
+
+def test_async_dind_concurrent_start(sdk_root):
+    """Test that several daemons can be started concurrently from one event loop."""
+    async def start_many():
+        fleet = [AsyncDockerInDocker(registry_proxy=None) for _ in range(3)]
+        try:
+            await asyncio.gather(*(dind.ensure_started() for dind in fleet))
+            for dind in fleet:
+                await dind.get_async_client().version()
+        finally:
+            await asyncio.gather(*(dind.cleanup() for dind in fleet))
+
+    asyncio.run(start_many())
+
+def test_async_dind_makes_no_blocking_client(sdk_root):
+    """Test that creating an async DinD doesn't connect to Docker through docker-py."""
+    assert AsyncDockerInDocker(registry_proxy=None).client is None
+
@@ -0,0 +1,17 @@
+import docker, pytest
+
+from benchmarks import lifecycle
+from spiriSdk.utils.leases import LeaseAllocator
+
+
+def test_fleet_system_ids_skip_used_and_wrap(tmp_path, monkeypatch):
+    allocator = LeaseAllocator(tmp_path / "leases.json")
+    allocator.lease("spiri_mu_2", 2)
+    monkeypatch.setattr(lifecycle, "leases", allocator)
+    container = docker.from_env().containers.run("docker:dind", name="spirisdk_spiri_mu_no_gimbal_253", detach=True)
+    try:
+        assert lifecycle.free_sys_ids(4, 252) == [252, 254, 1, 3]
+        with pytest.raises(ValueError, match="doesn't fit"):
+            lifecycle.free_sys_ids(253)
+    finally:
+        container.remove(force=True)
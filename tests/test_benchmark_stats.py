@@ -0,0 +1,26 @@
+import subprocess
+
+import pytest
+
+from benchmarks.stats import REPO_ROOT, compare, percentile, run_record, summarize
+
+
+def test_percentiles_interpolate_between_ranks():
+    samples = [0.4, 0.1, 0.3, 0.2]
+    assert percentile(samples, 50) == pytest.approx(0.25)
+    assert percentile(samples, 100) == 0.4
+    assert summarize(samples)["count"] == 4
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"a@1": {"p50": 1.0}, "b@1": {"p50": 0.001}, "c@1": {"p50": 1.0}}
+    results = {"a@1": {"p50": 1.5}, "b@1": {"p50": 0.003}, "d@1": {"p50": 9.0}}
+    assert compare(results, baseline, tolerance=0.2) == ["a@1 p50 1000.0ms -> 1500.0ms (+50%)"]
+
+
+def test_run_record_commit_outside_repository(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    head = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    assert run_record({}, {})["commit"] == head
@@ -0,0 +1,44 @@
+from spiriSdk.docker.compose_progress import ComposeProgress, parse_size
+
+def test_parse_size():
+    """Test conversion of docker's human readable sizes."""
+    assert parse_size("512B") == 512
+    assert parse_size("1.5kB") == 1500
+    assert parse_size("30.1MB") == 30_100_000
+    assert parse_size("nonsense") == 0
+
+def test_pull_progress():
+    """Test that layer progress is attributed to the pulling service and aggregated."""
+    progress = ComposeProgress(project="sim-core")
+
+    event = progress.parse("stderr", " ardupilot Pulling ")
+    assert (event.service, event.phase) == ("ardupilot", "pulling")
+
+    progress.parse("stderr", " 4f4fb700ef54 Pulling fs layer ")
+    event = progress.parse("stderr", " 4f4fb700ef54 Downloading [=====>      ]  10MB/40MB")
+    assert event.service == "ardupilot"
+    assert event.layer == "4f4fb700ef54"
+    assert (event.bytes_pulled, event.bytes_total) == (10_000_000, 40_000_000)
+    assert event.percent == 25.0
+
+    event = progress.parse("stderr", " 4f4fb700ef54 Download complete ")
+    assert event.percent == 100.0
+
+    event = progress.parse("stderr", " ✔ ardupilot Pulled ")
+    assert (event.service, event.phase, event.percent) == ("ardupilot", "pulled", 100.0)
+
+def test_container_progress():
+    """Test that container lines are mapped back to their compose service."""
+    progress = ComposeProgress(project="sim-core")
+
+    event = progress.parse("stderr", " Container sim-core-mavproxy-1  Started")
+    assert (event.service, event.phase) == ("mavproxy", "started")
+
+    event = progress.parse("stderr", " Network sim-core_default  Created")
+    assert (event.service, event.phase) == (None, "created")
+
+def test_unrecognised_line():
+    """Test that unknown output passes through untouched."""
+    event = ComposeProgress().parse("stdout", "some other output")
+    assert event.phase is None
+    assert str(event) == "stdout: some other output"
@@ -0,0 +1,48 @@
+import asyncio, docker, pytest
+
+from spiriSdk.docker.dindocker import DockerInDocker
+from spiriSdk.docker.image_store import robot_store_path
+from spiriSdk.utils import daemon_utils
+from spiriSdk.utils.daemon_utils import stop_all_robots
+
+def test_stop_all_robots(tmp_path, monkeypatch):
+    """Test that every robot's DinD is shut down and forgotten, robots without a container left alone."""
+    client = docker.from_env()
+    for sys_id in (7, 8, 9):
+        (tmp_path / str(sys_id)).mkdir()
+        (tmp_path / str(sys_id) / 'config.env').write_text(f'ROBOT_NAME=spiri_mu_{sys_id}\n')
+        daemon = DockerInDocker('docker:dind', f'spiri_mu_{sys_id}', robot_data_root=tmp_path / str(sys_id), docker_store=tmp_path / str(sys_id) / 'docker')
+        if sys_id != 9:
+            daemon.container = client.containers.run('docker:dind', name=f'spirisdk_spiri_mu_{sys_id}', detach=True)
+        monkeypatch.setitem(daemon_utils.daemons, f'spiri_mu_{sys_id}', daemon)
+    monkeypatch.setitem(daemon_utils.startup_progress, 'spiri_mu_7', 'starting services')
+
+    assert stop_all_robots() == 2
+    assert all(daemon_utils.daemons[f'spiri_mu_{sys_id}'].container is None for sys_id in (7, 8, 9))
+    assert 'spiri_mu_7' not in daemon_utils.startup_progress
+    assert client.containers.list(all=True, filters={'name': '^/?spirisdk_spiri_mu_'}) == []
+
+def test_failed_clone_is_rolled_back(tmp_path, monkeypatch):
+    """Test that a clone that can't start leaves no robot folder, lease or image store behind."""
+    from spiriSdk.utils import new_robot_utils
+    from spiriSdk.utils.leases import LeaseAllocator
+
+    allocator = LeaseAllocator(tmp_path / 'leases.json')
+    monkeypatch.setattr(daemon_utils, 'leases', allocator)
+    monkeypatch.setattr(new_robot_utils, 'leases', allocator)
+    (tmp_path / 'source' / 'docker' / 'image').mkdir(parents=True)
+    (tmp_path / 'source' / 'config.env').write_text('ROBOT_NAME=spiri_mu_249\n')
+    source = DockerInDocker('docker:dind', 'spiri_mu_249', robot_data_root=tmp_path / 'source', docker_store=tmp_path / 'source' / 'docker')
+    (source.docker_store / 'image' / 'layer').write_text('layer')
+    monkeypatch.setitem(daemon_utils.daemons, 'spiri_mu_249', source)
+
+    def ensure_started(self):
+        raise RuntimeError('Failed to start container: no space left on device')
+
+    monkeypatch.setattr(DockerInDocker, 'ensure_started', ensure_started)
+    with pytest.raises(RuntimeError, match='no space left'):
+        asyncio.run(new_robot_utils.clone_robot('spiri_mu_249', 250))
+    assert not (new_robot_utils.ROOT_DIR / 'data' / 'spiri_mu_250').exists()
+    assert allocator.get('spiri_mu_250') is None and allocator.sys_id_free(250)
+    assert not robot_store_path('spiri_mu_250').exists()
+    assert 'spiri_mu_250' not in daemon_utils.daemons
@@ -8,7 +8,7 @@ import docker
 from pathlib import Path
 from loguru import logger
 from spiriSdk.docker.dindocker import DockerInDocker, DockerRegistryProxy
-from spiriSdk.docker.dindocker import DockerInDocker, DockerRegistryProxy
+from spiriSdk.docker.dindocker import Container, shutdown_fleet
 
 def get_dind_containers(name_prefix="dind_"):
     """Helper to find any leftover dind containers from previous runs"""
@@ -156,12 +156,16 @@ def test_cacert_injection(dind):
     expected_cert = dind.registry_proxy.get_cacert()
     
     # Check the cert exists in the DinD container
-    result = dind.container.exec_run("cat /usr/local/share/ca-certificates/registry-ca.crt")
+    result = dind.container.exec_run("cat /usr/local/share/ca-certificates/registry-proxy-ca.crt")
     assert result.exit_code == 0, "Failed to read CA cert from DinD container"
     injected_cert = result.output.decode().strip()
     
     # Verify cert contents match
-    assert injected_cert == expected_cert, "CA cert in DinD container doesn't match proxy cert"
+    assert injected_cert == expected_cert.strip(), "CA cert in DinD container doesn't match proxy cert"
+
+    # Verify the proxy CA is part of the system trust bundle
+    result = dind.container.exec_run("cat /etc/ssl/certs/ca-certificates.crt")
+    assert expected_cert.strip() in result.output.decode(), "Proxy CA should be in the DinD trust bundle"
 
 def test_web_service(dind):
     """Test the web service exposed by the compose file."""
@@ -233,3 +237,51 @@ def test_socket_creation(dind):
     # Verify socket permissions (should be 666)
     host_perms = oct(socket_path.stat().st_mode)[-3:]
     assert host_perms == '666', f"Socket should have 666 permissions, got {host_perms}"
+
+def test_startup_timings(dind):
+    """Test that per-phase startup timings are recorded in order."""
+    phases = list(dind.timings)
+    assert phases[-2:] == ["socket", "ping"], f"Expected socket and ping phases, got {phases}"
+    elapsed = list(dind.timings.values())
+    assert elapsed == sorted(elapsed), "Phase timings should be monotonically increasing"
+
+def test_client_is_pooled(dind):
+    """Test that clients for the inner daemon are shared rather than rebuilt per call."""
+    assert dind.get_client() is dind.get_client(), "get_client should return the pooled client"
+
+def test_inject_files(dind):
+    """Test that several files are delivered in one call with their permissions."""
+    dind.inject_files(
+        {
+            "/opt/spiri/params/test.parm": "SYSID_THISMAV 7\n",
+            "/opt/spiri/certs/test.key": b"secret",
+        },
+        modes={"/opt/spiri/certs/test.key": 0o600},
+    )
+
+    result = dind.container.exec_run("cat /opt/spiri/params/test.parm")
+    assert result.exit_code == 0, f"Injected file should exist: {result.output.decode()}"
+    assert result.output.decode() == "SYSID_THISMAV 7\n"
+
+    result = dind.container.exec_run("stat -c %a /opt/spiri/params/test.parm /opt/spiri/certs/test.key")
+    assert result.output.decode().split() == ["644", "600"], "Injected files should keep their modes"
+
+def test_adopt_running_container(dind):
+    """Test that a new instance re-attaches to the running container instead of creating one."""
+    adopted = DockerInDocker(container_name=dind.container_name, registry_proxy=dind.registry_proxy)
+    assert adopted.adopt()
+    assert adopted.container.id == dind.container.id
+
+    other = DockerInDocker(container_name=dind.container_name[:-1], registry_proxy=dind.registry_proxy)
+    assert not other.adopt(), "Name lookup should not match on a prefix"
+
+def test_shutdown_fleet():
+    """Test that containers ignoring SIGTERM are killed once the shared deadline passes."""
+    fleet = [Container("alpine:latest", command=["sh", "-c", "trap '' TERM; sleep 300"], auto_remove=False) for _ in range(3)]
+    for container in fleet:
+        container.ensure_started()
+
+    elapsed = shutdown_fleet([container.container for container in fleet], timeout=2)
+    assert elapsed < 10, "Containers should be stopped concurrently, not one after another"
+    names = {container.name for container in docker.from_env().containers.list(all=True)}
+    assert not names & {f"spirisdk_{container.container_name}" for container in fleet}
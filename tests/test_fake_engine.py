@@ -0,0 +1,72 @@
+import asyncio, io, tarfile, time
+
+import aiodocker
+import docker
+import pytest
+
+from spiriSdk.docker.fake_engine import FakeEngine
+
+
+def test_dind_lifecycle_on_fake_engine(tmp_path):
+    async def lifecycle():
+        engine = FakeEngine(tmp_path / "docker.sock", latency=0.001, dind_containers=["sim-core-ardupilot-1"])
+        await engine.start()
+        client = await asyncio.to_thread(docker.DockerClient, base_url=engine.docker_host)
+        try:
+            since = time.time()
+            container = await asyncio.to_thread(
+                client.containers.run,
+                "docker:dind",
+                name="spirisdk_spiri_mu_1",
+                command=["--host=unix:///dind-sockets/spirisdk_spiri_mu_1.socket"],
+                volumes={str(tmp_path / "sockets"): {"bind": "/dind-sockets", "mode": "rw"}},
+                detach=True,
+                auto_remove=True,
+            )
+            listed = await asyncio.to_thread(client.containers.list, all=True, filters={"name": "^/?spirisdk_"})
+            assert [c.id for c in listed] == [container.id]
+            assert (await asyncio.to_thread(container.exec_run, ["chmod", "666", "/dind-sockets"])).exit_code == 0
+
+            archive = io.BytesIO()
+            with tarfile.open(fileobj=archive, mode="w") as tar:
+                info = tarfile.TarInfo("ca.crt")
+                info.size = 2
+                tar.addfile(info, io.BytesIO(b"ca"))
+            assert await asyncio.to_thread(container.put_archive, "/certs", archive.getvalue())
+            assert engine.containers[container.id].files == {"/certs/ca.crt": b"ca"}
+            assert (await asyncio.to_thread(container.exec_run, ["cat", "/certs/ca.crt"])).output == b"ca"
+
+            # The DinD's own engine answers on the host side of its socket
+            inner = aiodocker.Docker(url=f"unix://{tmp_path / 'sockets' / 'spirisdk_spiri_mu_1.socket'}")
+            assert [c["Names"] for c in await inner.containers.list()] == [["/sim-core-ardupilot-1"]]
+            await inner.close()
+
+            await asyncio.to_thread(container.stop)
+            events = await asyncio.to_thread(
+                lambda: [e["Action"] for e in client.events(since=since, until=time.time() + 0.2, decode=True, filters={"container": container.id})]
+            )
+            assert events == ["create", "start", "kill", "die", "stop", "destroy"]
+            assert not (tmp_path / "sockets" / "spirisdk_spiri_mu_1.socket").exists()
+        finally:
+            client.close()
+            await engine.stop()
+
+    asyncio.run(lifecycle())
+
+
+def test_fake_engine_injects_failures(tmp_path):
+    async def failing():
+        engine = FakeEngine(tmp_path / "docker.sock", failures={"containers.create": 1.0})
+        await engine.start()
+        client = aiodocker.Docker(url=engine.docker_host)
+        try:
+            with pytest.raises(aiodocker.DockerError) as error:
+                await client.containers.create({"Image": "docker:dind"}, name="spirisdk_spiri_mu_2")
+            assert error.value.status == 500
+            assert await client.containers.list(all=True) == []
+            assert engine.requests["containers.create"] == 1
+        finally:
+            await client.close()
+            await engine.stop()
+
+    asyncio.run(failing())
@@ -0,0 +1,163 @@
+import asyncio, time
+import pytest
+from pathlib import Path
+from spiriSdk.utils import gazebo_utils
+from spiriSdk.utils.gazebo_utils import Model, ShardedWorld, World, formation
+
+class FakeDaemon:
+    def __init__(self, sys_id: int):
+        self.sys_id = sys_id
+
+    def env_get(self, key, default=None):
+        return str(self.sys_id) if key == 'MAVLINK_SYS_ID' else default
+
+class FakeBridge:
+    """Records the requests a world sends to Gazebo, failing removes of the robots listed."""
+
+    def __init__(self, failing=()):
+        self.spawned = []
+        self.removed = []
+        self.failing = set(failing)
+
+    async def spawn_many(self, world, entities):
+        self.spawned.append(entities)
+        return True
+
+    async def remove(self, world, name):
+        self.removed.append(name)
+        return name not in self.failing
+
+@pytest.fixture
+def fleet(monkeypatch):
+    """Robots spiri_mu_1 to spiri_mu_6, and a world that answers without Gazebo."""
+    for sys_id in range(1, 7):
+        monkeypatch.setitem(gazebo_utils.daemons, f'spiri_mu_{sys_id}', FakeDaemon(sys_id))
+
+    async def render(self):
+        return Path(f'/tmp/{self.name}.sdf')
+
+    async def ready(self, timeout=None):
+        pass
+
+    monkeypatch.setattr(Model, 'render', render)
+    monkeypatch.setattr(World, 'ready', ready)
+    bridge = FakeBridge(failing={'spiri_mu_2'})
+    monkeypatch.setattr(World, 'bridge', property(lambda self: bridge))
+    return bridge
+
+def test_formation_clears_occupied_positions():
+    """Test that formations start past the robots already placed."""
+    assert formation(4) == [(0, 0), (2, 0), (0, 2), (2, 2)]
+    assert formation(2, occupied=[(0, 0, 0.3), (2, 2, 0.3)]) == [(0, 4), (2, 4)]
+    assert formation(2, 'line', 1.5, occupied=[(3, 0, 0.3)]) == [(4.5, 0.0), (6.0, 0.0)]
+
+def test_spawn_and_remove_many(fleet):
+    """Test that robots are spawned with one request, in sys_id order, without overlapping earlier ones."""
+    world = World('empty_world')
+
+    async def spawn_and_remove():
+        assert await world.spawn_many(['spiri_mu_3', 'spiri_mu_1']) == ['spiri_mu_1', 'spiri_mu_3']
+        assert await world.spawn_many(['spiri_mu_1', 'spiri_mu_2']) == ['spiri_mu_2']
+        assert await world.remove_many(['spiri_mu_1', 'spiri_mu_2', 'spiri_mu_6']) == ['spiri_mu_1']
+
+    asyncio.run(spawn_and_remove())
+    first, second = fleet.spawned
+    assert [(name, position) for name, _, position in first] == [('spiri_mu_1', [0, 0, 0.3]), ('spiri_mu_3', [2, 0, 0.3])]
+    assert [(name, position) for name, _, position in second] == [('spiri_mu_2', [0, 2, 0.3])]
+    assert sorted(fleet.removed) == ['spiri_mu_1', 'spiri_mu_2']
+    # A robot Gazebo didn't confirm removing is forgotten anyway
+    assert set(world.models) == {'spiri_mu_3'}
+
+def test_ready_reports_missing_gazebo(monkeypatch):
+    """Test that a world that couldn't start reports why, not just that it isn't running."""
+    def start(key, cmd, env=None):
+        raise FileNotFoundError(cmd[0])
+
+    monkeypatch.setattr(gazebo_utils.world_processes, 'start', start)
+    world = World('empty_world')
+
+    async def start_world():
+        await world.run_world()
+        with pytest.raises(RuntimeError, match='Gazebo is not installed'):
+            await world.ready(timeout=1)
+
+    asyncio.run(start_world())
+
+def test_shard_policies(fleet):
+    """Test that robots are placed by sys_id or on the least loaded shard, and stay where they are."""
+    by_sys_id = ShardedWorld('empty_world', shards=3, policy='sys_id')
+    assert [by_sys_id.shard_for(f'spiri_mu_{sys_id}') for sys_id in range(1, 7)] == [1, 2, 0, 1, 2, 0]
+
+    by_load = ShardedWorld('empty_world', shards=3, policy='load')
+    assert by_load.shard_for('spiri_mu_1', loads=[2, 0, 1]) == 1
+    asyncio.run(by_load.spawn_many([f'spiri_mu_{sys_id}' for sys_id in range(1, 6)]))
+    assert [len(shard.models) for shard in by_load.shards] == [2, 2, 1]
+    assert by_load.shard_for('spiri_mu_6') == 2
+    assert by_load.shard_for('spiri_mu_4') == by_load.shard_of('spiri_mu_4')
+
+    with pytest.raises(ValueError):
+        ShardedWorld('empty_world', policy='random')
+
+def test_sharded_spawn_survives_failed_shard(fleet, monkeypatch):
+    """Test that robots are still added to the other shards when one shard fails."""
+    async def ready(self, timeout=None):
+        if self.instance == 1:
+            raise RuntimeError(f'World {self.key} is not running')
+
+    monkeypatch.setattr(World, 'ready', ready)
+    world = ShardedWorld('empty_world', shards=3, policy='sys_id')
+    added = asyncio.run(world.spawn_many([f'spiri_mu_{sys_id}' for sys_id in range(1, 7)]))
+    assert added == ['spiri_mu_3', 'spiri_mu_6', 'spiri_mu_2', 'spiri_mu_5']
+    assert world.shards[1].models == {}
+
+    world.clear_models()
+    assert world.models == {}
+
+class SlowWorldBridge:
+    """Advertises a world's services once ready_after seconds have passed, or never if None."""
+
+    def __init__(self, ready_after=None):
+        self.started = time.monotonic()
+        self.ready_after = ready_after
+
+    async def wait_for_service(self, service, timeout=None):
+        await asyncio.sleep(0.05)
+        return self.ready_after is not None and time.monotonic() - self.started > self.ready_after
+
+def slow_world(monkeypatch, ready_after):
+    """A world that takes ready_after seconds to load, with a ready_timeout of 0.3s."""
+    bridge = SlowWorldBridge(ready_after)
+    monkeypatch.setattr(World, 'bridge', property(lambda self: bridge))
+    monkeypatch.setattr(World, 'command', lambda self: ['sleep', '30'])
+    return World('empty_world', ready_timeout=0.3, instance=7)
+
+def test_slow_world_recovers(monkeypatch):
+    """Test that a world missing ready_timeout is reported, then counts as ready once it loads."""
+    world = slow_world(monkeypatch, ready_after=0.45)
+
+    async def load():
+        await world.run_world()
+        try:
+            await asyncio.sleep(0.35)
+            with pytest.raises(RuntimeError, match='not ready after 0.3s'):
+                await world.ready(timeout=1)
+            await asyncio.sleep(0.25)
+            await world.ready(timeout=1)
+            assert world.failure is None
+        finally:
+            await world.end_gz_proc()
+
+    asyncio.run(load())
+
+def test_hung_world_is_stopped(monkeypatch):
+    """Test that a world still not ready after twice ready_timeout is stopped rather than left running."""
+    world = slow_world(monkeypatch, ready_after=None)
+
+    async def hang():
+        await world.run_world()
+        await asyncio.wait_for(world._supervisor, 5)
+        with pytest.raises(RuntimeError, match='stopped it'):
+            await world.ready(timeout=1)
+        assert world.key not in gazebo_utils.world_processes.running()
+
+    asyncio.run(hang())
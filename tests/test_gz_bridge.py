@@ -0,0 +1,56 @@
+import asyncio, sys
+
+from spiriSdk.utils import gz_bridge
+from spiriSdk.utils.gz_bridge import GzBridge
+
+# Speaks the helper's JSON lines protocol without gz-transport, after flooding stderr
+FAKE_HELPER = '''
+import json, sys
+for _ in range(20000):
+    sys.stderr.write("[Wrn] [Discovery.hh:1234] gz-transport warning padding the pipe\\n")
+sys.stderr.flush()
+for line in sys.stdin:
+    request = json.loads(line)
+    if request["op"] == "services":
+        reply = {"id": request["id"], "ok": True, "services": ["/world/empty_world/create"]}
+    else:
+        reply = {"id": request["id"], "ok": request["name"] != "missing"}
+    sys.stdout.write(json.dumps(reply) + "\\n")
+    sys.stdout.flush()
+'''
+
+def test_in_process_backend_preferred(monkeypatch):
+    """Test that the in-process bindings are used when they import, unless the bridge has its own environment."""
+    monkeypatch.setattr(gz_bridge, "Node", object)
+    assert asyncio.run(GzBridge()._backend()) == "in-process"
+    monkeypatch.setattr(gz_bridge, "GZ_PYTHON", "/nonexistent/python3")
+    assert asyncio.run(GzBridge(env={"GZ_PARTITION": "spirisdk_1"})._backend()) == "cli"
+
+def test_helper_backend(monkeypatch, tmp_path):
+    """Test requests through the helper, which keeps serving however much it writes to stderr."""
+    helper = tmp_path / "helper.py"
+    helper.write_text(FAKE_HELPER)
+    monkeypatch.setattr(gz_bridge, "Node", None)
+    monkeypatch.setattr(gz_bridge, "GZ_PYTHON", sys.executable)
+    monkeypatch.setattr(gz_bridge, "HELPER_SCRIPT", helper)
+
+    async def requests():
+        bridge = GzBridge(timeout_ms=2000)
+        try:
+            assert await bridge.spawn("empty_world", "spiri_mu_1", "/tmp/model.sdf", (1, 2, 0.3))
+            assert bridge.backend == "helper"
+            assert not await bridge.remove("empty_world", "missing")
+            assert await bridge.wait_for_service("/world/empty_world/create", timeout=2)
+        finally:
+            await bridge.close()
+
+    asyncio.run(requests())
+
+def test_cli_fallback_when_helper_exits(monkeypatch, tmp_path):
+    """Test that a helper exiting at once, e.g. without the bindings, makes the bridge fall back to the CLI."""
+    helper = tmp_path / "helper.py"
+    helper.write_text("raise SystemExit('No module named gz')\n")
+    monkeypatch.setattr(gz_bridge, "Node", None)
+    monkeypatch.setattr(gz_bridge, "GZ_PYTHON", sys.executable)
+    monkeypatch.setattr(gz_bridge, "HELPER_SCRIPT", helper)
+    assert asyncio.run(GzBridge()._backend()) == "cli"
@@ -0,0 +1,18 @@
+from spiriSdk.docker.image_store import clone_store
+
+def test_clone_keeps_images_only(tmp_path):
+    """Test that a clone gets the source's images but not its engine ID, containers or networks."""
+    source = tmp_path / "source"
+    for path in ("engine-id", "image/overlay2/imagedb/content/sha256/abc", "overlay2/abc/diff/bin",
+                 "containers/123/config.v2.json", "network/files/local-kv.db", "image/overlay2/layerdb/mounts/123/mount-id"):
+        (source / path).parent.mkdir(parents=True, exist_ok=True)
+        (source / path).write_text(path)
+
+    target = tmp_path / "target" / "docker"
+    assert clone_store(source, target) in ("reflink", "copy")
+    assert (target / "image/overlay2/imagedb/content/sha256/abc").read_text() == "image/overlay2/imagedb/content/sha256/abc"
+    assert (target / "overlay2/abc/diff/bin").exists()
+    for path in ("engine-id", "containers", "network", "image/overlay2/layerdb/mounts"):
+        assert not (target / path).exists()
+    # The source is left as it was
+    assert (source / "containers/123/config.v2.json").exists()
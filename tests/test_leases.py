@@ -0,0 +1,46 @@
+import socket
+
+import pytest
+
+from spiriSdk.utils.leases import LeaseAllocator
+
+
+def test_lease_is_persisted_and_reused(tmp_path):
+    allocator = LeaseAllocator(tmp_path / "leases.json")
+    lease = allocator.lease("spiri_mu_3", 3)
+    assert (lease.sys_id, lease.instance, lease.fdm_port) == (3, 3, 9032)
+    assert allocator.lease("spiri_mu_3", 3) is lease
+
+    reloaded = LeaseAllocator(tmp_path / "leases.json")
+    assert reloaded.get("spiri_mu_3") == lease
+    assert not reloaded.sys_id_free(3)
+    assert reloaded.sys_id_free(3, "spiri_mu_3")
+
+    with pytest.raises(ValueError):
+        reloaded.lease("spiri_mu_no_gimbal_3", 3)
+    reloaded.release("spiri_mu_3")
+    assert reloaded.lease("spiri_mu_no_gimbal_3", 3).instance == 3
+
+
+def test_lease_avoids_reserved_and_bound_ports(tmp_path):
+    allocator = LeaseAllocator(tmp_path / "leases.json")
+    # 9002 + 10 * 132 is a gz-transport discovery port
+    assert allocator.lease("spiri_mu_132", 132).instance != 132
+
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("", 9002 + 10 * 7))
+        lease = allocator.lease("spiri_mu_7", 7)
+    assert lease.instance != 7
+    assert len({allocator.get(robot).instance for robot in ("spiri_mu_132", "spiri_mu_7")}) == 2
+
+
+def test_retain_releases_unlisted_robots(tmp_path):
+    allocator = LeaseAllocator(tmp_path / "leases.json")
+    for sys_id in (1, 2, 3):
+        allocator.lease(f"spiri_mu_{sys_id}", sys_id)
+    allocator.retain(["spiri_mu_2"])
+    assert allocator.get("spiri_mu_1") is None and allocator.get("spiri_mu_3") is None
+
+    reloaded = LeaseAllocator(tmp_path / "leases.json")
+    assert [robot for robot in ("spiri_mu_1", "spiri_mu_2", "spiri_mu_3") if reloaded.get(robot)] == ["spiri_mu_2"]
+    assert reloaded.sys_id_free(1) and reloaded.sys_id_free(3)
@@ -0,0 +1,69 @@
+import asyncio, io, requests, time
+
+from pathlib import Path
+from spiriSdk.docker import registry_warmup
+from spiriSdk.docker.registry_warmup import CACHE_STATUS_HEADER, DOCKER_HUB, RegistryWarmup, WarmupReport, compose_images, parse_image_reference
+
+def test_parse_image_reference():
+    """Test that image references are split the way the Docker CLI resolves them."""
+    assert parse_image_reference("ghcr.io/spiri-robotics/ardupilot:spiri-master") == ("ghcr.io", "spiri-robotics/ardupilot", "spiri-master")
+    assert parse_image_reference("alpine") == (DOCKER_HUB, "library/alpine", "latest")
+    assert parse_image_reference("rpardini/docker-registry-proxy:0.6.5") == (DOCKER_HUB, "rpardini/docker-registry-proxy", "0.6.5")
+    assert parse_image_reference("localhost:5000/tools/app@sha256:abc") == ("localhost:5000", "tools/app", "sha256:abc")
+
+def test_compose_images(tmp_path):
+    """Test that images are collected once across robot types and unresolved ones are skipped."""
+    for robot_type in ("spiri_mu", "spiri_mu_no_gimbal"):
+        service_dir = tmp_path / robot_type / "services" / "sim-core"
+        service_dir.mkdir(parents=True)
+        (service_dir / "docker-compose.yaml").write_text(
+            "services:\n"
+            "  ardupilot:\n    image: ghcr.io/spiri-robotics/ardupilot:spiri-master\n"
+            "  custom:\n    image: example/app:${SPIRI_UNSET_TAG_FOR_TEST}\n"
+        )
+    assert compose_images(tmp_path) == {"ghcr.io/spiri-robotics/ardupilot:spiri-master"}
+
+def test_hit_ratio():
+    """Test the cache hit ratio of a report."""
+    assert WarmupReport().hit_ratio == 0.0
+    assert WarmupReport(hits=3, misses=1).hit_ratio == 0.75
+
+def test_cached_blobs_are_not_downloaded():
+    """Test that a blob the proxy reports as cached is only checked with a HEAD request."""
+    warmup = RegistryWarmup("http://proxy:3128", Path("ca.crt"))
+    requests_made = []
+
+    def request(method, registry, repository, path, count=True, **kwargs):
+        requests_made.append((method, path))
+        response = requests.Response()
+        response.status_code = 200
+        response.headers[CACHE_STATUS_HEADER] = "HIT" if path.endswith("cached") else "MISS"
+        response.raw = io.BytesIO(b"layer")
+        return response
+
+    warmup._request = request
+    warmup._get = lambda *args, **kwargs: request("GET", *args, **kwargs)
+    warmup._fetch_blob(DOCKER_HUB, "library/alpine", "sha256:cached")
+    warmup._fetch_blob(DOCKER_HUB, "library/alpine", "sha256:new")
+    assert requests_made == [("HEAD", "blobs/sha256:cached"), ("HEAD", "blobs/sha256:new"), ("GET", "blobs/sha256:new")]
+    assert (warmup.report.blobs, warmup.report.hits, warmup.report.bytes_fetched) == (2, 1, 5)
+
+def test_robots_wait_for_warmup(monkeypatch):
+    """Test that waiting robots resume once the warm-up finishes, and give up on one that takes too long."""
+    monkeypatch.setattr(registry_warmup, "_warmup", None)
+    def warm(duration):
+        time.sleep(duration)
+
+    async def wait_for(duration, timeout):
+        monkeypatch.setattr(registry_warmup, "warm_registry_proxy", lambda: warm(duration))
+        registry_warmup.start_warmup()
+        assert registry_warmup.warmup_pending()
+        started = time.monotonic()
+        await registry_warmup.wait_for_warmup(timeout)
+        return registry_warmup.warmup_pending(), time.monotonic() - started
+
+    pending, waited = asyncio.run(wait_for(0.3, timeout=5))
+    assert not pending and 0.25 < waited < 2
+    pending, waited = asyncio.run(wait_for(0.5, timeout=0.1))
+    assert pending and waited < 0.4
+
@@ -0,0 +1,26 @@
+from nicegui import Client
+from nicegui.page import page
+
+from spiriSdk.docker.dindocker import DockerInDocker
+from spiriSdk.utils import daemon_utils
+from spiriSdk.utils.card_utils import RobotCard
+
+def test_queued_robot_card_renders(tmp_path, monkeypatch):
+    """Test that a robot still waiting for its DinD gets a card, shown as off with its progress."""
+    (tmp_path / 'config.env').write_text('ROBOT_NAME=spiri_mu_9\n')
+    daemon = DockerInDocker('docker:dind', 'spiri_mu_9', robot_data_root=tmp_path)
+    monkeypatch.setitem(daemon_utils.daemons, 'spiri_mu_9', daemon)
+    monkeypatch.setitem(daemon_utils.startup_progress, 'spiri_mu_9', 'queued')
+
+    with Client(page('/'), request=None):
+        card = RobotCard('spiri_mu_9', daemon)
+        try:
+            card.render()
+            assert card.label_status.text == 'Queued'
+            assert not card.on and card.ip == ''
+
+            daemon_utils.startup_progress['spiri_mu_9'] = 'failed: no space left on device'
+            card.update_status()
+            assert not card.on
+        finally:
+            card.destroy()
@@ -0,0 +1,30 @@
+import os
+
+from spiriSdk.utils.robot_config import RobotConfig, config_for
+
+
+def test_update_is_one_write_keeping_other_lines(tmp_path):
+    path = tmp_path / "config.env"
+    path.write_text("# robot settings\nROBOT_NAME='spiri_mu_3'\nMAVLINK_SYS_ID='3'")
+    config = RobotConfig(path)
+
+    config.update({"MAVLINK_SYS_ID": 4, "ROBOT_DESC": "it's a 'test' \\ robot", "SIM_ADDRESS": "10.0.0.2"})
+
+    assert path.read_text().startswith("# robot settings\nROBOT_NAME='spiri_mu_3'\nMAVLINK_SYS_ID='4'\n")
+    assert config.sys_id == 4
+    assert config.description == "it's a 'test' \\ robot"
+    assert RobotConfig(path).values() == config.values()
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_external_edits_are_picked_up(tmp_path):
+    path = tmp_path / "config.env"
+    config = config_for(path)
+    assert config_for(tmp_path / "." / "config.env") is config
+
+    config.set("MAVLINK_SYS_ID", 3)
+    assert config.get("MAVLINK_SYS_ID") == "3"
+    path.write_text("MAVLINK_SYS_ID='12'\n")
+    os.utime(path, ns=(1, 1))
+    assert config.get_int("MAVLINK_SYS_ID") == 12
+    assert config.get("ROBOT_NAME", "unnamed") == "unnamed"
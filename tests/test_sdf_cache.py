@@ -0,0 +1,26 @@
+import asyncio, shutil
+import pytest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from spiriSdk.utils import sdf_cache
+from spiriSdk.utils.sdf_cache import render_key, render_sdf
+
+TEMPLATE = Path(__file__).parents[1] / "robots" / "spiri_mu" / "models" / "spiri_mu" / "model.xacro.sdf"
+
+def test_render_key():
+    """Test that renders are keyed by both the template content and the args."""
+    assert render_key(TEMPLATE, {"fdm_port_in": 9012}) == render_key(TEMPLATE, {"fdm_port_in": "9012"})
+    assert render_key(TEMPLATE, {"fdm_port_in": 9012}) != render_key(TEMPLATE, {"fdm_port_in": 9022})
+
+@pytest.mark.skipif(shutil.which("xacro") is None, reason="xacro is not installed")
+def test_concurrent_renders(monkeypatch, tmp_path):
+    """Test that concurrent spawns get one validated render per set of args."""
+    monkeypatch.setattr(sdf_cache, "SDF_CACHE_DIR", tmp_path)
+
+    async def render_many():
+        return await asyncio.gather(*(render_sdf(TEMPLATE, {"fdm_port_in": port}) for port in (9012, 9012, 9022)))
+
+    first, second, third = asyncio.run(render_many())
+    assert first == second != third
+    assert first.parent == tmp_path
+    assert ET.parse(first).getroot().find("model/plugin/fdm_port_in").text == "9012"
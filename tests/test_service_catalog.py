@@ -0,0 +1,58 @@
+import os
+import pytest
+from spiriSdk.utils.service_catalog import ServiceCatalog, startup_order
+
+COMPOSE = """x-spiri-sdk-autostart: {autostart}
+services:
+  ardupilot:
+    image: ghcr.io/spiri-robotics/ardupilot:spiri-master
+    command: sim_vehicle.py -I$MAVLINK_SYS_ID --sim-address=${{SIM_ADDRESS}}
+"""
+
+def write(path, text, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+def test_catalog_parses_services(tmp_path):
+    """Test that every service folder is indexed, whichever compose file name it uses."""
+    write(tmp_path / "spiri_mu" / "services" / "sim-core" / "docker-compose.yaml", COMPOSE.format(autostart=True))
+    write(tmp_path / "spiri_mu" / "services" / "extras" / "docker-compose.yml", COMPOSE.format(autostart=False))
+    (tmp_path / "spiri_mu" / "services" / "empty").mkdir()
+    catalog = ServiceCatalog(tmp_path)
+
+    assert catalog.robot_types() == ["spiri_mu"]
+    services = {service.name: service for service in catalog.services("spiri_mu")}
+    assert set(services) == {"sim-core", "extras"}
+    assert services["sim-core"].autostart and not services["extras"].autostart
+    assert services["extras"].variables == {"MAVLINK_SYS_ID", "SIM_ADDRESS"}
+    assert catalog.images() == {"ghcr.io/spiri-robotics/ardupilot:spiri-master"}
+    assert catalog.options("spiri_mu") is None
+
+def test_catalog_invalidation(tmp_path):
+    """Test that cached entries are reused until the file's mtime changes."""
+    compose_path = tmp_path / "spiri_mu" / "services" / "sim-core" / "docker-compose.yaml"
+    write(compose_path, COMPOSE.format(autostart=True), mtime=1_000_000)
+    catalog = ServiceCatalog(tmp_path)
+    first = catalog.services("spiri_mu")[0]
+    assert catalog.services("spiri_mu")[0] is first
+
+    write(compose_path, COMPOSE.format(autostart=False), mtime=2_000_000)
+    assert not catalog.services("spiri_mu")[0].autostart
+
+    write(tmp_path / "spiri_mu" / "options.yaml", "x-spiri-options: {}\n")
+    assert catalog.options("spiri_mu") == {"x-spiri-options": {}}
+
+def test_startup_order(tmp_path):
+    """Test that services start after the services they declare a dependency on."""
+    for name, depends_on in (("sim-core", "[]"), ("mavros", "[sim-core]"), ("video", "[]"), ("mission", "[mavros, video, missing]")):
+        write(tmp_path / "spiri_mu" / "services" / name / "docker-compose.yaml", f"x-spiri-sdk-depends-on: {depends_on}\nservices: {{}}\n")
+    catalog = ServiceCatalog(tmp_path)
+
+    levels = startup_order(catalog.services("spiri_mu"))
+    assert [[service.name for service in level] for level in levels] == [["sim-core", "video"], ["mavros"], ["mission"]]
+
+    write(tmp_path / "spiri_mu" / "services" / "sim-core" / "docker-compose.yaml", "x-spiri-sdk-depends-on: mission\nservices: {}\n", mtime=3_000_000)
+    with pytest.raises(ValueError):
+        startup_order(catalog.services("spiri_mu"))
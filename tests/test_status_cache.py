@@ -0,0 +1,65 @@
+import aiodocker, asyncio
+
+from spiriSdk.docker.dindocker import Container
+from spiriSdk.docker.status_cache import ContainerStates
+
+def test_status_follows_events():
+    """Test that the cache is seeded once and then tracks a container through its lifecycle."""
+    async def follow():
+        states = ContainerStates(name_prefix="spirisdk_")
+        states.start()
+        container = Container("alpine:latest", command=["sleep", "300"])
+        name = f"spirisdk_{container.container_name}"
+        try:
+            async def seeded():
+                while not states.ready:
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(seeded(), timeout=30)
+            assert states.status(name) is None
+
+            await asyncio.to_thread(container.ensure_started)
+            await asyncio.sleep(1)
+            assert states.status(name) == "running"
+            assert states.counts()["running"] >= 1
+
+            await asyncio.to_thread(container.container.remove, force=True)
+            await asyncio.sleep(1)
+            assert states.status(name) is None
+        finally:
+            await states.stop()
+
+    asyncio.run(follow())
+
+
+def test_event_before_stream_connects(monkeypatch):
+    """Test that a container started after the listing but before the event stream connects is still seen."""
+    run_events = aiodocker.docker.DockerEvents.run
+    started = asyncio.Event()
+
+    async def late_run(self, **params):
+        await started.wait()
+        await run_events(self, **params)
+
+    monkeypatch.setattr(aiodocker.docker.DockerEvents, "run", late_run)
+
+    async def follow():
+        states = ContainerStates(name_prefix="spirisdk_")
+        states.start()
+        container = Container("alpine:latest", command=["sleep", "300"])
+        name = f"spirisdk_{container.container_name}"
+        try:
+            async def seeded():
+                while not states.ready:
+                    await asyncio.sleep(0.1)
+
+            await asyncio.wait_for(seeded(), timeout=30)
+            await asyncio.to_thread(container.ensure_started)
+            started.set()
+            await asyncio.sleep(1)
+            assert states.status(name) == "running"
+        finally:
+            await states.stop()
+            await asyncio.to_thread(container.container.remove, force=True)
+
+    asyncio.run(follow())
@@ -0,0 +1,57 @@
+import shutil
+
+from pathlib import Path
+from typing import Optional
+from spiriSdk.utils.gazebo_utils import WorldProcesses, _scan_proc
+
+def fake_process(proc_root, pid: int, pgid: int, args: list[str], env: Optional[dict[str, str]] = None):
+    """Add a process to a fake procfs tree, with an environment if env is given."""
+    process_dir = proc_root / str(pid)
+    process_dir.mkdir()
+    (process_dir / 'cmdline').write_bytes('\0'.join(args).encode() + b'\0')
+    (process_dir / 'stat').write_text(f"{pid} ({args[0]} sim) S 1 {pgid} {pgid} 0 -1")
+    if env is not None:
+        (process_dir / 'environ').write_bytes(b''.join(f'{key}={value}'.encode() + b'\0' for key, value in env.items()))
+
+def live_group_members(pgid: int) -> list[int]:
+    """Processes of a process group that haven't exited, zombies left to an init that doesn't reap excluded."""
+    members = []
+    for stat_path in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            state, _, group = stat_path.read_text().rsplit(')', 1)[1].split()[:3]
+        except OSError:
+            continue
+        if int(group) == pgid and state != 'Z':
+            members.append(int(stat_path.parent.name))
+    return members
+
+def test_scan_finds_gz_sim_worlds(tmp_path):
+    """Test that only gz sim processes are found, with their process group and world name."""
+    fake_process(tmp_path, 100, 100, ['gz', 'sim', '-r', '/sdk/worlds/empty_world/worlds/empty_world.world'])
+    fake_process(tmp_path, 101, 100, ['ruby', '/usr/bin/gz', 'sim', '-g'])
+    fake_process(tmp_path, 200, 200, ['python', 'empty_world.world'])
+    fake_process(tmp_path, 300, 250, ['gz', 'sim', '-s', '-r', 'citadel_hill.world'])
+    (tmp_path / 'self').mkdir()
+    assert sorted(_scan_proc(tmp_path)) == [(100, 100, 'empty_world'), (300, 250, 'citadel_hill')]
+
+def test_scan_keys_partitioned_worlds(tmp_path):
+    """Test that worlds running in a GZ_PARTITION are keyed like World.key, so they can be adopted again."""
+    fake_process(tmp_path, 100, 100, ['gz', 'sim', '-r', 'empty_world.world'], env={'PATH': '/usr/bin'})
+    fake_process(tmp_path, 200, 200, ['gz', 'sim', '-s', '-r', 'empty_world.world'], env={'GZ_PARTITION': 'spirisdk_1', 'PATH': '/usr/bin'})
+    processes = WorldProcesses(ttl=0, proc_root=tmp_path)
+    assert processes.running() == ['empty_world', 'empty_world@spirisdk_1']
+
+def test_tracked_worlds_start_and_stop(tmp_path):
+    """Test that SDK-started worlds are listed by key, hide their own gz processes and stop as a group."""
+    processes = WorldProcesses(ttl=0, proc_root=tmp_path)
+    proc = processes.start('empty_world@spirisdk_1', ['sh', '-c', 'sleep 30 & wait'])
+    fake_process(tmp_path, proc.pid + 1, proc.pid, ['gz', 'sim', 'empty_world.world'])
+    fake_process(tmp_path, 400, 400, ['gz', 'sim', 'citadel_hill.world'])
+    assert processes.running() == ['empty_world@spirisdk_1', 'citadel_hill']
+
+    processes.stop('empty_world@spirisdk_1', timeout=5)
+    assert proc.poll() is not None
+    # The whole process group went down, sleep included
+    assert live_group_members(proc.pid) == []
+    shutil.rmtree(tmp_path / str(proc.pid + 1))
+    assert processes.running() == ['citadel_hill']